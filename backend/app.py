@@ -7,24 +7,41 @@ in financial transaction networks using graph theory and behavioral analysis.
 
 ENDPOINTS:
 - POST /upload              → Upload CSV file
-- POST /analyze             → Analyze transactions (after upload)
+- POST /analyze             → Start analysis job (after upload)
+- GET  /jobs/<job_id>       → Analysis job status and progress
+- DELETE /jobs/<job_id>     → Cancel analysis job
 - GET  /results             → Get analysis results
 - GET  /download-json       → Download JSON report
 - GET  /health              → Health check
+
+Each upload returns an analysis_id; /analyze, /results and /download-json
+take it (JSON body or query string) to address that analysis; it is
+required.
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import os
-import io
-import json
+import inspect
+import math
+import shutil
 import traceback
 from datetime import datetime
 
 from services.analysis_engine import (
+    GRAPH_ENGINES,
     run_complete_analysis,
     prepare_visualization_data
 )
+from services.detector_pool import DETECTOR_EXECUTORS
+from services.pipeline import save_and_hash
+from services.result_cache import ResultCache
+from services.result_store import ResultStore
+from services.analysis_jobs import JobManager
+from services.json_stream import stream_json, gzip_chunks
+from services.results_index import (
+    ALL_PATTERNS, SORT_ORDERS, build_results_index, score_page, ring_detail, account_detail
+)
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -37,34 +54,375 @@ CORS(app, resources={
 UPLOAD_FOLDER = os.path.join(os.path.dirname(__file__), "uploads")
 ALLOWED_EXTENSIONS = {"csv"}
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+RESULT_CACHE_FOLDER = os.path.join(os.path.dirname(__file__), "result_cache")
+MAX_RESULT_CACHE_SIZE = 500 * 1024 * 1024  # 500MB
+RESULT_STORE_FOLDER = os.path.join(os.path.dirname(__file__), "result_store")
+MAX_RESULT_STORE_MEMORY = 256 * 1024 * 1024  # 256MB, the rest spills to disk
+ANALYSIS_TTL_SECONDS = 24 * 60 * 60  # analyses idle for a day are dropped
+ANALYSIS_WORKERS = 2  # analyses running at once
+MAX_PENDING_ANALYSES = 8  # analyses waiting for a worker before /analyze returns 429
 
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+# /results query parameters; any of them switches to a paginated page
+RESULTS_QUERY_ARGS = (
+    "view", "limit", "cursor", "order", "pattern", "min_score", "max_score", "ring", "account"
+)
+RESULTS_VIEWS = ("accounts", "rings")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+
+
+def _positive_int(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) \
+            or not math.isfinite(value) or value != int(value) or value < 1:
+        raise ValueError("must be a positive integer")
+    return int(value)
+
+
+def _positive_number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float)) \
+            or not math.isfinite(value) or value <= 0:
+        raise ValueError("must be a positive number")
+    return float(value)
+
+
+def _optional_positive_number(value):
+    return None if value is None else _positive_number(value)
+
+
+def _optional_positive_int(value):
+    return None if value is None else _positive_int(value)
+
+
+def _optional_worker_count(value):
+    if value == 0 and not isinstance(value, bool):
+        return 0  # one per CPU
+    try:
+        return _optional_positive_int(value)
+    except ValueError:
+        raise ValueError("must be a non-negative integer (0 = one per CPU)")
+
+
+def _boolean(value):
+    if not isinstance(value, bool):
+        raise ValueError("must be true or false")
+    return value
 
-# Global analysis cache
-analysis_cache = {
-    "results": None,
-    "json_output": None,
-    "viz_data": None,
-    "uploaded_file": None
+
+def _graph_engine(value):
+    if value not in GRAPH_ENGINES:
+        raise ValueError(f"must be one of: {', '.join(GRAPH_ENGINES)}")
+    return value
+
+
+def _detector_executor(value):
+    if value not in DETECTOR_EXECUTORS:
+        raise ValueError(f"must be one of: {', '.join(DETECTOR_EXECUTORS)}")
+    return value
+
+
+# run_complete_analysis parameters accepted in the /analyze JSON body, with
+# the check that validates and normalizes each value
+ANALYZE_OPTIONS = {
+    "graph_engine": _graph_engine,
+    "temporal_cycles": _boolean,
+    "cycle_window_hours": _positive_number,
+    "cycle_deadline_seconds": _optional_positive_number,
+    "fan_threshold": _positive_int,
+    "smurfing_window_hours": _positive_number,
+    "shell_threshold": _positive_int,
+    "shell_hop_limit": _positive_int,
+    "detector_executor": _detector_executor,
+    "detector_workers": _optional_positive_int,
+    "cycle_workers": _optional_worker_count
 }
 
+# Value run_complete_analysis uses for each option left out of the request
+ANALYZE_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(run_complete_analysis).parameters.items()
+    if name in ANALYZE_OPTIONS
+}
+
+os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+
+# Finished analyses keyed by (file hash, parameters), shared across uploads;
+# omitted options are keyed as their defaults
+result_cache = ResultCache(RESULT_CACHE_FOLDER, MAX_RESULT_CACHE_SIZE, ANALYZE_DEFAULTS)
+
+
+
+def remove_upload(analysis_id, record):
+    """Delete the uploaded file of an expired analysis."""
+    shutil.rmtree(os.path.join(UPLOAD_FOLDER, analysis_id), ignore_errors=True)
+
+
+# Analyses by ID: upload metadata and, once analyzed, the served results
+result_store = ResultStore(
+    MAX_RESULT_STORE_MEMORY,
+    ANALYSIS_TTL_SECONDS,
+    RESULT_STORE_FOLDER,
+    on_expire=remove_upload
+)
+
+# Background analysis jobs on a bounded pool
+analysis_jobs = JobManager(ANALYSIS_WORKERS, MAX_PENDING_ANALYSES)
+
 
 def allowed_file(filename):
     """Check if file has allowed extension."""
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def parse_analyze_options(options):
+    """
+    Validate and normalize /analyze parameters.
+    
+    Values are normalized (e.g. 8.0 -> 8 for integer options) so equal
+    settings share a result cache key.
+    
+    Args:
+        options (dict): Parameters from the JSON body
+    
+    Returns:
+        dict: run_complete_analysis keyword arguments
+    
+    Raises:
+        ValueError: On an unknown parameter or an invalid value
+    """
+    unknown = sorted(set(options) - set(ANALYZE_OPTIONS))
+    if unknown:
+        raise ValueError(f"Unsupported: {', '.join(unknown)} (expected any of: {', '.join(ANALYZE_OPTIONS)})")
+    
+    params = {}
+    for name, value in options.items():
+        try:
+            params[name] = ANALYZE_OPTIONS[name](value)
+        except ValueError as e:
+            raise ValueError(f"{name} {e} (got {value!r})")
+    return params
+
+
+def requested_analysis(options=None):
+    """
+    Analysis addressed by the current request.
+    
+    The ID is read from the JSON body (options), then the query string.
+    There is no default: every client names the analysis /upload opened
+    for it.
+    
+    Args:
+        options (dict): Parsed JSON body, if any
+    
+    Returns:
+        tuple: (analysis_id, record) - analysis_id is None if the request
+            has none; record is None for missing, unknown or expired IDs
+    """
+    analysis_id = (options or {}).get("analysis_id") or request.args.get("analysis_id")
+    if analysis_id is None:
+        return None, None
+    return analysis_id, result_store.get(analysis_id)
+
+
+def missing_analysis_response(analysis_id):
+    """
+    400 for a request without analysis_id, 404 for an unknown one.
+    
+    Args:
+        analysis_id (str): ID from requested_analysis
+    
+    Returns:
+        tuple: (response, status)
+    """
+    if analysis_id is None:
+        return jsonify({
+            "error": "Missing analysis_id",
+            "details": "Pass the analysis_id returned by /upload"
+        }), 400
+    return jsonify({
+        "error": "Unknown analysis",
+        "details": f"Analysis '{analysis_id}' does not exist or has expired; upload the file again"
+    }), 404
+
+
+def streamed_json(fields, indent=False, download_name=None):
+    """
+    Response streaming a JSON object built by stream_json.
+    
+    The body is gzip-compressed on the fly when the client accepts it.
+    
+    Args:
+        fields (list): (key, value, stream) tuples (see stream_json)
+        indent (bool): Pretty-print the document
+        download_name (str): Serve as an attachment with this file name
+    
+    Returns:
+        Response: Streaming application/json response
+    """
+    chunks = stream_json(fields, indent=indent)
+    headers = {"Vary": "Accept-Encoding"}
+    if "gzip" in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    if download_name:
+        headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    return Response(chunks, mimetype="application/json", headers=headers)
+
+
+def run_analysis_job(analysis_id, filepath, file_hash, options, cache_key, progress):
+    """
+    Background job: analyze an upload and store the served results.
+    
+    Args:
+        analysis_id (str): Analysis to attach the results to
+        filepath (str): Uploaded CSV
+        file_hash (str): SHA-256 of the upload
+        options (dict): run_complete_analysis parameters
+        cache_key (str): Result cache key of (file_hash, options)
+        progress (callable): Job progress callback
+    
+    Returns:
+        dict: summary, cycle_search and complete (False for partial
+            results) of the analysis
+    """
+    print(f"\n{'='*70}")
+    print(f"STARTING ANALYSIS {analysis_id}")
+    print(f"{'='*70}")
+    
+    analysis = run_complete_analysis(filepath, file_hash=file_hash, progress=progress, **options)
+    
+    # Prepare visualization data
+    progress("visualization", "Preparing visualization data...")
+    viz_data = prepare_visualization_data(
+        analysis["G"],
+        analysis["df"],
+        analysis["all_rings"],
+        analysis["suspicious_accounts"]
+    )
+    
+    # Everything the endpoints serve, without the graph and frame, plus the
+    # indexes paginated /results queries are answered from
+    results = {
+        "all_rings": analysis["all_rings"],
+        "suspicious_accounts": analysis["suspicious_accounts"],
+        "final_json": analysis["final_json"],
+        "cycle_search": analysis["cycle_search"],
+        "complete": analysis["complete"],
+        "viz_data": viz_data,
+        "index": build_results_index(analysis["all_rings"], analysis["suspicious_accounts"])
+    }
+    
+    # Partial results (a detector failed, cycle search timed out) are kept
+    # for this analysis but never reused for the same file and parameters
+    if results["complete"]:
+        result_cache.put(cache_key, results)
+    
+    record = result_store.get(analysis_id)
+    if record is not None:
+        result_store.put(analysis_id, dict(record, results=results))
+    
+    print(f"{'='*70}")
+    print(f"ANALYSIS COMPLETE {analysis_id}")
+    print(f"{'='*70}\n")
+    
+    return {
+        "summary": results["final_json"]["summary"],
+        "cycle_search": results["cycle_search"],
+        "complete": results["complete"]
+    }
+
+
+def query_results(analysis_id, results):
+    """
+    Answer a paginated or per-item /results query from the results index.
+    
+    Query parameters:
+    - ring=<ring_id>: that ring with its member accounts expanded
+    - account=<account_id>: that account with the rings it belongs to
+    - otherwise a page of view=accounts (default, by suspicion_score) or
+      view=rings (by risk_score), filtered by pattern (ring pattern type,
+      e.g. cycle) and min_score/max_score, in order=desc (default) or asc,
+      limit items (default 50, at most 1000) starting at cursor (the
+      next_cursor of the previous page)
+    
+    Args:
+        analysis_id (str): Analysis queried
+        results (dict): Its stored results
+    
+    Returns:
+        tuple: (JSON response, status code)
+    """
+    args = request.args
+    index = results["index"]
+    
+    if "ring" in args:
+        ring = ring_detail(index, results["all_rings"], results["suspicious_accounts"], args["ring"])
+        if ring is None:
+            return jsonify({
+                "error": "Unknown ring",
+                "details": f"No ring '{args['ring']}' in this analysis"
+            }), 404
+        return jsonify({"analysis_id": analysis_id, "ring": ring}), 200
+    
+    if "account" in args:
+        account = account_detail(index, results["suspicious_accounts"], args["account"],
+                                 all_rings=results["all_rings"])
+        if account is None:
+            return jsonify({
+                "error": "Unknown account",
+                "details": f"Account '{args['account']}' is neither flagged nor in a ring"
+            }), 404
+        return jsonify({"analysis_id": analysis_id, "account": account}), 200
+    
+    view = args.get("view", "accounts")
+    order = args.get("order", "desc")
+    try:
+        limit = int(args.get("limit", DEFAULT_PAGE_SIZE))
+        offset = int(args.get("cursor", 0))
+        min_score = float(args["min_score"]) if "min_score" in args else None
+        max_score = float(args["max_score"]) if "max_score" in args else None
+        if view not in RESULTS_VIEWS:
+            raise ValueError(f"view must be one of: {', '.join(RESULTS_VIEWS)}")
+        if order not in SORT_ORDERS:
+            raise ValueError(f"order must be one of: {', '.join(SORT_ORDERS)}")
+        if limit < 1 or offset < 0:
+            raise ValueError("limit must be positive and cursor non-negative")
+    except ValueError as e:
+        return jsonify({
+            "error": "Invalid query",
+            "details": str(e)
+        }), 400
+    
+    limit = min(limit, MAX_PAGE_SIZE)
+    items = results["suspicious_accounts"] if view == "accounts" else results["all_rings"]
+    page, total, next_offset = score_page(
+        index[view], items, pattern=args.get("pattern", ALL_PATTERNS),
+        min_score=min_score, max_score=max_score, order=order, offset=offset, limit=limit
+    )
+    
+    return jsonify({
+        "analysis_id": analysis_id,
+        "view": view,
+        "items": page,
+        "total": total,
+        "limit": limit,
+        "next_cursor": None if next_offset is None else str(next_offset)
+    }), 200
+
+
 # ============================================================================
 # ENDPOINTS
 # ============================================================================
 
 @app.route("/", methods=["GET"])
 def health():
-    """Health check endpoint."""
+    """Health check endpoint, with result store occupancy and active jobs."""
     return jsonify({
         "status": "ok",
         "service": "Money Muling Detection Engine",
         "version": "1.0.0",
+        "result_store": result_store.stats(),
+        "active_jobs": analysis_jobs.active(),
         "timestamp": datetime.now().isoformat()
     }), 200
 
@@ -117,25 +475,27 @@ def upload_file():
                 "details": f"Maximum size is {MAX_FILE_SIZE / 1024 / 1024}MB"
             }), 413
         
-        # Save file
-        filename = file.filename
-        filepath = os.path.join(UPLOAD_FOLDER, filename)
-        
-        # Remove old files to avoid conflicts
-        for old_file in os.listdir(UPLOAD_FOLDER):
-            old_path = os.path.join(UPLOAD_FOLDER, old_file)
-            try:
-                os.remove(old_path)
-            except:
-                pass
+        # Save file into the new analysis' own folder
+        filename = os.path.basename(file.filename)
+        analysis_id = result_store.new_id()
+        os.makedirs(os.path.join(UPLOAD_FOLDER, analysis_id))
+        filepath = os.path.join(UPLOAD_FOLDER, analysis_id, filename)
         
-        file.save(filepath)
-        analysis_cache["uploaded_file"] = filepath
+        # Hash while streaming to disk: the digest keys the result cache
+        file_hash, _ = save_and_hash(file.stream, filepath)
+        result_store.put(analysis_id, {
+            "filename": filename,
+            "file_path": filepath,
+            "file_hash": file_hash,
+            "results": None
+        })
         
         return jsonify({
             "message": "File uploaded successfully",
+            "analysis_id": analysis_id,
             "filename": filename,
             "file_size": file_size,
+            "file_hash": file_hash,
             "upload_time": datetime.now().isoformat()
         }), 200
         
@@ -153,6 +513,17 @@ def analyze():
     
     Requires: File must be uploaded first via /upload
     
+    JSON body with the analysis_id returned by /upload and, optionally,
+    analysis parameters (see ANALYZE_OPTIONS), e.g.
+    {"analysis_id": "...", "fan_threshold": 8}.
+    Results are cached on disk by (file hash, parameters); a repeated
+    analysis is answered from the cache right away.
+    
+    Otherwise the analysis runs as a background job and the response
+    carries its job_id; poll GET /jobs/<job_id> for progress. With
+    "wait": true in the body the request blocks until the job finishes and
+    answers like a cache hit.
+    
     Pipeline:
     1. Load and validate transactions
     2. Build transaction network graph
@@ -162,18 +533,36 @@ def analyze():
     
     Returns:
     - 200: Analysis complete (even if no fraud detected)
-    - 400: No file uploaded
+    - 202: Analysis job queued
+    - 400: Missing analysis_id or invalid parameter
+    - 404: Unknown or expired analysis_id
+    - 429: Analysis queue full, retry later
     - 500: Analysis error
     """
     try:
-        # Check if file is uploaded
-        if analysis_cache["uploaded_file"] is None:
+        options = request.get_json(silent=True) or {}
+        if not isinstance(options, dict):
+            return jsonify({
+                "error": "Invalid analysis parameters",
+                "details": "The request body must be a JSON object"
+            }), 400
+        
+        options = dict(options)
+        analysis_id, record = requested_analysis(options)
+        options.pop("analysis_id", None)
+        wait = bool(options.pop("wait", False))
+        try:
+            options = parse_analyze_options(options)
+        except ValueError as e:
             return jsonify({
-                "error": "No file uploaded",
-                "details": "Please upload a CSV file first using /upload"
+                "error": "Invalid analysis parameters",
+                "details": str(e)
             }), 400
         
-        filepath = analysis_cache["uploaded_file"]
+        if record is None:
+            return missing_analysis_response(analysis_id)
+        
+        filepath = record["file_path"]
         
         if not os.path.exists(filepath):
             return jsonify({
@@ -181,33 +570,59 @@ def analyze():
                 "details": "File may have been deleted"
             }), 400
         
-        # Run analysis
-        print(f"\n{'='*70}")
-        print("STARTING ANALYSIS")
-        print(f"{'='*70}")
+        file_hash = record["file_hash"]
+        cache_key = result_cache.key(file_hash, options)
+        results = result_cache.get(cache_key)
+        cached = results is not None
         
-        results = run_complete_analysis(filepath)
+        if cached:
+            print(f"\n✓ Analysis served from result cache ({cache_key[:12]})\n")
+            
+            # Keep results with the analysis
+            result_store.put(analysis_id, dict(record, results=results))
+            
+            return jsonify({
+                "message": "Analysis completed successfully",
+                "analysis_id": analysis_id,
+                "summary": results["final_json"]["summary"],
+                "cycle_search": results["cycle_search"],
+                "cached": True,
+                "timestamp": datetime.now().isoformat()
+            }), 200
         
-        # Prepare visualization data
-        viz_data = prepare_visualization_data(
-            results["G"],
-            results["df"],
-            results["all_rings"],
-            results["suspicious_accounts"]
-        )
+        job = analysis_jobs.submit(analysis_id, lambda progress: run_analysis_job(
+            analysis_id, filepath, file_hash, options, cache_key, progress))
+        if job is None:
+            return jsonify({
+                "error": "Server busy",
+                "details": f"{analysis_jobs.active()} analyses are running or queued; retry later"
+            }), 429
         
-        # Cache results
-        analysis_cache["results"] = results
-        analysis_cache["json_output"] = results["final_json"]
-        analysis_cache["viz_data"] = viz_data
+        if not wait:
+            return jsonify({
+                "message": "Analysis started",
+                "analysis_id": analysis_id,
+                "job_id": job.job_id,
+                "status_url": f"/jobs/{job.job_id}",
+                "cached": False,
+                "timestamp": datetime.now().isoformat()
+            }), 202
         
-        print(f"{'='*70}")
-        print("ANALYSIS COMPLETE")
-        print(f"{'='*70}\n")
+        job.wait()
+        if job.state != "done":
+            return jsonify({
+                "error": "Analysis failed",
+                "details": job.error,
+                "job_id": job.job_id
+            }), 500
         
         return jsonify({
             "message": "Analysis completed successfully",
-            "summary": results["final_json"]["summary"],
+            "analysis_id": analysis_id,
+            "job_id": job.job_id,
+            "summary": job.result["summary"],
+            "cycle_search": job.result["cycle_search"],
+            "cached": False,
             "timestamp": datetime.now().isoformat()
         }), 200
         
@@ -222,6 +637,35 @@ def analyze():
         }), 500
 
 
+@app.route("/jobs/<job_id>", methods=["GET", "DELETE"])
+@app.route("/api/jobs/<job_id>", methods=["GET", "DELETE"])
+def analysis_job(job_id):
+    """
+    Status of an analysis job (GET) or cancel it (DELETE).
+    
+    Status fields: status (queued, running, done, failed, cancelled), stage
+    (current "[k/6]" step title), step/total_steps, percent, elapsed_seconds,
+    error, and result (summary and cycle_search) once done. A running job
+    stops at its next stage boundary after a cancel.
+    
+    Returns:
+    - 200: Job status
+    - 404: Unknown job
+    """
+    if request.method == "DELETE":
+        job = analysis_jobs.cancel(job_id)
+    else:
+        job = analysis_jobs.get(job_id)
+    
+    if job is None:
+        return jsonify({
+            "error": "Unknown job",
+            "details": f"Job '{job_id}' does not exist or has been forgotten"
+        }), 404
+    
+    return jsonify(job.snapshot()), 200
+
+
 @app.route("/results", methods=["GET"])
 def get_results():
     """
@@ -233,12 +677,24 @@ def get_results():
     - rings: Detected fraud rings
     - accounts: Suspicious accounts with scores
     
+    The response is streamed element by element (gzip if accepted) rather
+    than built as one document.
+    
+    Query: analysis_id (required). Any of
+    RESULTS_QUERY_ARGS instead returns one page or item (see query_results).
+    
     Returns:
     - 200: Results (may be empty if analysis not run)
+    - 400: Missing analysis_id or invalid page query
+    - 404: Unknown or expired analysis_id, ring or account
     - 500: Error
     """
     try:
-        if analysis_cache["results"] is None:
+        analysis_id, record = requested_analysis()
+        if record is None:
+            return missing_analysis_response(analysis_id)
+        
+        if record["results"] is None:
             print("⚠️ No analysis results in cache")
             return jsonify({
                 "nodes": [],
@@ -248,8 +704,11 @@ def get_results():
                 "message": "No analysis results available yet"
             }), 200
         
-        results = analysis_cache["results"]
-        viz_data = analysis_cache["viz_data"]
+        results = record["results"]
+        if any(arg in request.args for arg in RESULTS_QUERY_ARGS):
+            return query_results(analysis_id, results)
+        
+        viz_data = results["viz_data"]
         
         # Debug logging
         print(f"\n📊 /results endpoint called")
@@ -258,19 +717,19 @@ def get_results():
         print(f"   - Viz nodes: {len(viz_data['nodes'])}")
         print(f"   - Viz edges: {len(viz_data['edges'])}")
         
-        response_data = {
-            "nodes": viz_data["nodes"],
-            "edges": viz_data["edges"],
-            "rings": results["all_rings"],
-            "accounts": results["suspicious_accounts"],
-            "summary": results["final_json"]["summary"],
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        print(f"✅ Sending response with {len(response_data['accounts'])} accounts")
-        print(f"   First 3 accounts: {response_data['accounts'][:3] if response_data['accounts'] else 'None'}\n")
+        accounts = results["suspicious_accounts"]
+        print(f"✅ Sending response with {len(accounts)} accounts")
+        print(f"   First 3 accounts: {accounts[:3] if accounts else 'None'}\n")
         
-        return jsonify(response_data), 200
+        return streamed_json([
+            ("analysis_id", analysis_id, False),
+            ("nodes", viz_data["nodes"], True),
+            ("edges", viz_data["edges"], True),
+            ("rings", results["all_rings"], True),
+            ("accounts", accounts, True),
+            ("summary", results["final_json"]["summary"], False),
+            ("timestamp", datetime.now().isoformat(), False)
+        ]), 200
         
     except Exception as e:
         return jsonify({
@@ -284,31 +743,32 @@ def download_json():
     """
     Download complete analysis report as JSON file.
     
-    Format: RIFT 2026 specification
+    Format: RIFT 2026 specification, streamed (gzip if accepted)
+    
+    Query: analysis_id (required)
     
     Returns:
     - 200: JSON file attachment
-    - 400: No results available
+    - 400: Missing analysis_id or no results available
+    - 404: Unknown or expired analysis_id
     - 500: Error
     """
     try:
-        if analysis_cache["json_output"] is None:
+        analysis_id, record = requested_analysis()
+        if record is None:
+            return missing_analysis_response(analysis_id)
+        
+        if record["results"] is None:
             return jsonify({
                 "error": "No analysis results available",
                 "details": "Please run analysis first"
             }), 400
         
-        # Create JSON string
-        json_str = json.dumps(analysis_cache["json_output"], indent=2)
-        json_bytes = json_str.encode("utf-8")
-        
-        # Create file-like object
-        json_io = io.BytesIO(json_bytes)
-        
-        return send_file(
-            json_io,
-            mimetype="application/json",
-            as_attachment=True,
+        # Stream the report's arrays element by element
+        final_json = record["results"]["final_json"]
+        return streamed_json(
+            [(key, value, isinstance(value, list)) for key, value in final_json.items()],
+            indent=True,
             download_name=f"fraud_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         ), 200
         
@@ -0,0 +1,46 @@
+"""Synthetic transaction frames shared by the benchmarks and tests
+
+Each benchmark draws its own graph shape (background flow, planted cycles or
+shell chains) as arrays of account codes; transactions_frame turns those
+into a transaction DataFrame with account IDs, random amounts and random
+timestamps, the same way for all of them.
+"""
+
+import numpy as np
+import pandas as pd
+
+START = pd.Timestamp("2026-01-01")
+
+
+def account_ids(n_accounts):
+    """Account ID per account code: ACC_00000000, ACC_00000001, ..."""
+    return np.array([f"ACC_{i:08d}" for i in range(n_accounts)], dtype=object)
+
+
+def transactions_frame(senders, receivers, n_accounts, rng, span_hours=90 * 24,
+                       min_amount=10, max_amount=10000):
+    """
+    Transaction DataFrame for edges given as account codes.
+    
+    Args:
+        senders (np.ndarray): Sender account code per transaction
+        receivers (np.ndarray): Receiver account code per transaction
+        n_accounts (int): Number of account codes
+        rng (np.random.Generator): Source of amounts and timestamps
+        span_hours (float): Timestamps are uniform over this many hours from START
+        min_amount (float): Smallest amount
+        max_amount (float): Largest amount
+    
+    Returns:
+        pd.DataFrame: transaction_id, sender_id, receiver_id, amount, timestamp
+    """
+    ids = account_ids(n_accounts)
+    n_rows = len(senders)
+    return pd.DataFrame({
+        "transaction_id": [f"TXN_{i:09d}" for i in range(n_rows)],
+        "sender_id": ids[senders],
+        "receiver_id": ids[receivers],
+        "amount": rng.uniform(min_amount, max_amount, n_rows).round(2),
+        "timestamp": START + pd.to_timedelta(
+            rng.integers(0, int(span_hours * 3600), n_rows), unit="s")
+    })
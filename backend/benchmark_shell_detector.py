@@ -0,0 +1,199 @@
+#!/usr/bin/env python
+"""Benchmark: chain-compression shell detection vs the per-pair shortest-path version
+
+Usage:
+    python benchmark_shell_detector.py [--sizes 10000,100000,1000000]
+                                       [--chains 500] [--legacy-max-nodes 100000]
+
+Builds random transaction graphs (about 4 out-edges per account) and plants
+source -> 2-4 shells -> destination chains (at most one per
+ACCOUNTS_PER_CHAIN accounts, so small sizes plant fewer than --chains).
+Reports runtime and how many planted chains each implementation recovers. The legacy version runs one
+BFS per predecessor x successor pair of every shell, so it is only timed up
+to --legacy-max-nodes.
+"""
+
+import argparse
+import sys
+import time
+from collections import deque
+sys.path.insert(0, '.')
+
+import numpy as np
+
+from benchmark_common import account_ids, transactions_frame
+from services.account_index import AccountIndex, encode_accounts
+from services.graph_builder import build_csr_graph
+from services.shell_detector import calculate_shell_network_risk, detect_shell_networks
+
+
+def legacy_detect_shell_networks(G, shell_threshold=3, hop_limit=5):
+    """The per-pair shortest-path detector that chain compression replaced."""
+    shell_networks = []
+    ring_id_counter = 1
+    processed_paths = set()
+    
+    potential_shells = set()
+    for node in G.nodes():
+        in_degree = G.in_degree(node)
+        out_degree = G.out_degree(node)
+        total_degree = in_degree + out_degree
+        if 2 <= total_degree <= 4 and in_degree > 0 and out_degree > 0:
+            potential_shells.add(node)
+    
+    for shell_account in potential_shells:
+        predecessors = list(G.predecessors(shell_account))
+        successors = list(G.successors(shell_account))
+        
+        for source in predecessors:
+            for target in successors:
+                if source == target:
+                    continue
+                
+                path = _shortest_path(G, source, target)
+                
+                if path is not None and len(path) >= 4 and shell_account in path:
+                    intermediates = path[1:-1]
+                    shell_count = sum(1 for acc in intermediates if acc in potential_shells)
+                    
+                    if shell_count >= 1:
+                        path_key = tuple(path)
+                        if path_key not in processed_paths:
+                            risk_score = calculate_shell_network_risk(
+                                G, path, intermediates, potential_shells
+                            )
+                            shell_networks.append({
+                                "ring_id": f"SHELL_{ring_id_counter:03d}",
+                                "pattern_type": "shell",
+                                "member_accounts": path,
+                                "shell_accounts": intermediates,
+                                "source_account": path[0],
+                                "destination_account": path[-1],
+                                "path_length": len(path),
+                                "intermediary_count": len(intermediates),
+                                "risk_score": risk_score
+                            })
+                            ring_id_counter += 1
+                            processed_paths.add(path_key)
+    
+    return shell_networks
+
+
+def _shortest_path(G, source, target):
+    """Unweighted BFS shortest path (legacy helper)."""
+    parents = {source: None}
+    queue = deque([source])
+    
+    while queue:
+        node = queue.popleft()
+        for succ in G.successors(node):
+            if succ in parents:
+                continue
+            parents[succ] = node
+            if succ == target:
+                path = [target]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                return path[::-1]
+            queue.append(succ)
+    
+    return None
+
+
+# Accounts per planted chain at most: up to 4 shells each, so shells stay
+# within a quarter of the accounts and the background flow keeps the rest
+ACCOUNTS_PER_CHAIN = 16
+
+
+def make_transactions(n_accounts, n_chains, seed=42):
+    """
+    Random background flow plus planted shell chains.
+    
+    n_chains is capped at n_accounts // ACCOUNTS_PER_CHAIN, so the shells
+    (up to 4 per chain) never take more than a quarter of the accounts.
+    
+    Returns:
+        tuple: (transactions DataFrame, list of planted chains as account ID lists)
+    
+    Raises:
+        Exception: If n_accounts is too small to plant a single chain
+    """
+    if n_accounts < ACCOUNTS_PER_CHAIN:
+        raise Exception(f"Need at least {ACCOUNTS_PER_CHAIN} accounts to plant a shell chain, got {n_accounts}")
+    n_chains = min(n_chains, n_accounts // ACCOUNTS_PER_CHAIN)
+    
+    rng = np.random.default_rng(seed)
+    n_shells = n_chains * 4
+    n_regular = n_accounts - n_shells
+    
+    n_rows = n_regular * 4
+    senders = rng.integers(0, n_regular, n_rows)
+    receivers = rng.integers(0, n_regular, n_rows)
+    
+    planted = []
+    next_shell = n_regular
+    chain_senders, chain_receivers = [], []
+    for _ in range(n_chains):
+        n_hops = rng.integers(2, 5)
+        shells = list(range(next_shell, next_shell + n_hops))
+        next_shell += n_hops
+        chain = [int(rng.integers(0, n_regular))] + shells + [int(rng.integers(0, n_regular))]
+        planted.append(chain)
+        chain_senders.extend(chain[:-1])
+        chain_receivers.extend(chain[1:])
+    
+    senders = np.concatenate([senders, chain_senders])
+    receivers = np.concatenate([receivers, chain_receivers])
+    keep = senders != receivers
+    senders, receivers = senders[keep], receivers[keep]
+    
+    df = transactions_frame(senders, receivers, n_accounts, rng)
+    ids = account_ids(n_accounts)
+    return df, [ids[chain].tolist() for chain in planted]
+
+
+def recall(rings, planted, labels):
+    """Fraction of planted chains reported exactly."""
+    found = {tuple(labels[r["member_accounts"]]) for r in rings}
+    return sum(tuple(chain) in found for chain in planted) / len(planted)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--chains", type=int, default=500)
+    parser.add_argument("--legacy-max-nodes", type=int, default=100_000)
+    args = parser.parse_args()
+    
+    sizes = [int(s) for s in args.sizes.split(",")]
+    if min(sizes) < ACCOUNTS_PER_CHAIN:
+        parser.error(f"--sizes must be at least {ACCOUNTS_PER_CHAIN} accounts each (room for one shell chain)")
+    
+    print(f"{'accounts':>10} {'edges':>10} {'chains':>7} {'legacy (s)':>11} {'rings':>7} {'recall':>7} "
+          f"{'chains (s)':>11} {'rings':>7} {'recall':>7}")
+    print("-" * 86)
+    
+    for n_accounts in sizes:
+        df, planted = make_transactions(n_accounts, args.chains)
+        G = build_csr_graph(encode_accounts(df, AccountIndex()))
+        labels = np.asarray(G.graph["account_ids"], dtype=object)
+        
+        t0 = time.time()
+        rings = detect_shell_networks(G, shell_threshold=3, hop_limit=5)
+        chain_time = time.time() - t0
+        new = f"{chain_time:>11.2f} {len(rings):>7,} {recall(rings, planted, labels):>7.1%}"
+        
+        if n_accounts <= args.legacy_max_nodes:
+            t0 = time.time()
+            legacy_rings = legacy_detect_shell_networks(G, shell_threshold=3, hop_limit=5)
+            legacy_time = time.time() - t0
+            legacy = (f"{legacy_time:>11.2f} {len(legacy_rings):>7,} "
+                      f"{recall(legacy_rings, planted, labels):>7.1%}")
+        else:
+            legacy = f"{'skipped':>11} {'-':>7} {'-':>7}"
+        
+        print(f"{n_accounts:>10,} {G.number_of_edges():>10,} {len(planted):>7,} {legacy} {new}")
+
+
+if __name__ == "__main__":
+    main()
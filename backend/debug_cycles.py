@@ -7,6 +7,7 @@ sys.path.insert(0, '.')
 import pandas as pd
 from services.csv_processor import load_transactions
 from services.graph_builder import build_transaction_graph
+from services.account_index import account_labels
 import networkx as nx
 
 # Load data
@@ -16,6 +17,7 @@ print(f"Loaded {len(df)} transactions")
 # Build graph
 G = build_transaction_graph(df)
 print(f"Graph: {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
+labels = account_labels(G)
 
 # Find cycles
 cycles_3 = []
@@ -46,7 +48,7 @@ try:
             elif cycle_len == 5:
                 cycles_5.append(cycle)
             
-            print(f"Cycle-{cycle_len}: {' → '.join(cycle)} → {cycle[0]}")
+            print(f"Cycle-{cycle_len}: {' → '.join(labels[cycle])} → {labels[cycle[0]]}")
             
             if len(seen) >= 20:  # Show first 20
                 break
@@ -0,0 +1,185 @@
+"""
+Account ID interning.
+
+Account IDs are mapped once at ingest to dense int32 codes (0..n-1, in order
+of first appearance). Transaction frames carry them as pandas categoricals
+whose codes are the account codes, and the graph, metrics, detectors and
+scorer all key on the codes. Codes are turned back into ID strings only at
+the JSON boundary (decode_rings / decode_accounts).
+"""
+
+import numpy as np
+import pandas as pd
+
+# Ring fields that hold a single account / a list of accounts
+RING_ACCOUNT_FIELDS = ("hub_account", "source_account", "destination_account")
+RING_ACCOUNT_LIST_FIELDS = ("member_accounts", "shell_accounts")
+
+
+class AccountIndex:
+    """
+    Growable account ID <-> int32 code table.
+    
+    Codes are stable once assigned, so chunks encoded earlier stay valid as
+    later chunks add new accounts.
+    """
+    
+    def __init__(self):
+        self._codes = {}  # account_id -> code
+        self._ids = []    # code -> account_id
+        self._categories = None
+    
+    def __len__(self):
+        return len(self._ids)
+    
+    @property
+    def ids(self):
+        """
+        pd.Index of account IDs, position = code.
+        
+        Built on first use and again only after new accounts were added, so
+        wrap the codes once the table is complete rather than per chunk.
+        """
+        if self._categories is None or len(self._categories) != len(self._ids):
+            self._categories = pd.Index(self._ids, dtype=object)
+        return self._categories
+    
+    def encode(self, values):
+        """
+        Intern account IDs and return their codes.
+        
+        Only the distinct values of the input are hashed into the table; the
+        per-row mapping is a single array take.
+        
+        Args:
+            values (array-like): Normalized account ID strings
+        
+        Returns:
+            np.ndarray: int32 codes, same shape as values
+        """
+        values = np.asarray(values, dtype=object)
+        positions, uniques = pd.factorize(values.ravel())
+        
+        lookup = np.empty(len(uniques), dtype=np.int32)
+        for i, account_id in enumerate(uniques):
+            code = self._codes.get(account_id)
+            if code is None:
+                code = len(self._ids)
+                self._codes[account_id] = code
+                self._ids.append(account_id)
+            lookup[i] = code
+        
+        return lookup[positions].reshape(values.shape)
+    
+    def categorical(self, codes):
+        """Wrap codes as a categorical over the current ID table."""
+        return pd.Categorical.from_codes(codes, categories=self.ids)
+
+
+def encode_accounts(df, account_index):
+    """
+    Replace sender_id/receiver_id with categoricals of interned account codes.
+    
+    IDs are stringified and stripped once here, so no later stage needs to
+    normalize them again. Sender and receiver of each row are interned in
+    that order, so codes follow first appearance in the file.
+    
+    Args:
+        df (pd.DataFrame): Transactions with raw sender_id/receiver_id
+        account_index (AccountIndex): Table to intern into
+    
+    Returns:
+        pd.DataFrame: Frame with categorical account columns
+    """
+    df = intern_accounts(df, account_index)
+    return df.assign(
+        sender_id=account_index.categorical(df["sender_id"].to_numpy()),
+        receiver_id=account_index.categorical(df["receiver_id"].to_numpy())
+    )
+
+
+def intern_accounts(df, account_index):
+    """
+    Replace sender_id/receiver_id with their int32 account codes.
+    
+    Used for chunked ingest: the chunks share account_index and are wrapped
+    as categoricals once, over the final ID table, after the last chunk
+    (see encode_accounts for the single-frame case).
+    
+    Args:
+        df (pd.DataFrame): Transactions with raw sender_id/receiver_id
+        account_index (AccountIndex): Table to intern into
+    
+    Returns:
+        pd.DataFrame: Frame with int32 account code columns
+    """
+    pairs = np.column_stack([
+        df["sender_id"].astype(str).str.strip().to_numpy(dtype=object),
+        df["receiver_id"].astype(str).str.strip().to_numpy(dtype=object)
+    ])
+    codes = account_index.encode(pairs)
+    
+    return df.assign(sender_id=codes[:, 0], receiver_id=codes[:, 1])
+
+
+def is_encoded(df):
+    """True if the account columns already carry interned codes."""
+    return (isinstance(df["sender_id"].dtype, pd.CategoricalDtype)
+            and isinstance(df["receiver_id"].dtype, pd.CategoricalDtype))
+
+
+def account_codes(df, column):
+    """Account codes of an encoded column as an int32 array."""
+    return df[column].cat.codes.to_numpy().astype(np.int32, copy=False)
+
+
+def account_labels(G):
+    """
+    Account ID lookup for a transaction graph.
+    
+    Args:
+        G: Transaction graph built by graph_builder
+    
+    Returns:
+        np.ndarray: Object array of account IDs indexed by code
+    """
+    return np.asarray(G.graph["account_ids"], dtype=object)
+
+
+def decode_rings(rings, labels):
+    """
+    Turn account codes in ring dicts back into account ID strings.
+    
+    Args:
+        rings (list): Rings keyed on account codes
+        labels (np.ndarray): Account IDs indexed by code (account_labels)
+    
+    Returns:
+        list: New ring dicts with account IDs
+    """
+    decoded = []
+    for ring in rings:
+        ring = dict(ring)
+        for field in RING_ACCOUNT_FIELDS:
+            if field in ring:
+                ring[field] = labels[ring[field]]
+        for field in RING_ACCOUNT_LIST_FIELDS:
+            if field in ring:
+                ring[field] = labels[ring[field]].tolist()
+        decoded.append(ring)
+    return decoded
+
+
+def decode_accounts(accounts, labels):
+    """
+    Turn account codes in scored account dicts back into account ID strings.
+    
+    Args:
+        accounts (list): Suspicious accounts keyed on account codes
+        labels (np.ndarray): Account IDs indexed by code (account_labels)
+    
+    Returns:
+        list: New account dicts with account IDs
+    """
+    return [dict(account, account_id=labels[account["account_id"]])
+            for account in accounts]
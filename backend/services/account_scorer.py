@@ -20,14 +20,18 @@ FINAL SCORE INTERPRETATION:
 """
 
 from collections import defaultdict
-import statistics
+import numpy as np
+from services.graph_features import graph_features
 
 def generate_suspicious_accounts(rings, G, df, metrics):
     """
     Generate list of suspicious accounts with detailed scoring.
     
+    Accounts are identified by their interned account codes throughout;
+    analysis_engine decodes them to ID strings for output.
+    
     Args:
-        rings (list): List of detected fraud rings (cycles, smurfing, shells)
+        rings (list): List of detected fraud rings (cycles, smurfing, shells, structuring)
         G (networkx.DiGraph): Transaction graph
         df (pd.DataFrame): Original transaction data
         metrics (dict): Account metrics from graph_builder
@@ -44,8 +48,6 @@ def generate_suspicious_accounts(rings, G, df, metrics):
         pattern_type = ring.get("pattern_type", "unknown")
         
         for account in ring.get("member_accounts", []):
-            account = str(account).strip()
-            
             if account not in account_ring_membership:
                 suspicious_accounts[account] = {
                     "account_id": account,
@@ -66,8 +68,6 @@ def generate_suspicious_accounts(rings, G, df, metrics):
         risk_score = ring.get("risk_score", 50.0)
         
         for account in ring.get("member_accounts", []):
-            account = str(account).strip()
-            
             if account not in suspicious_accounts:
                 continue
             
@@ -87,9 +87,7 @@ def generate_suspicious_accounts(rings, G, df, metrics):
                 )
     
     # Step 3: Calculate final suspicion scores
-    for account_id, account_data in suspicious_accounts.items():
-        account = str(account_id).strip()
-        
+    for account, account_data in suspicious_accounts.items():
         # Base score from pattern involvement
         pattern_scores = list(account_data["pattern_scores"].values())
         if pattern_scores:
@@ -108,7 +106,7 @@ def generate_suspicious_accounts(rings, G, df, metrics):
         # Final score (capped at 100)
         final_score = min(100.0, base_score + behavioral_adjustment)
         
-        suspicious_accounts[account_id]["suspicion_score"] = round(final_score, 2)
+        suspicious_accounts[account]["suspicion_score"] = round(final_score, 2)
     
     # Step 4: Convert to list and sort by suspicion score (descending)
     result = list(suspicious_accounts.values())
@@ -142,6 +140,10 @@ def get_pattern_description(ring):
         path_length = ring.get("path_length", "3")
         return f"shell_network_depth_{path_length}"
     
+    elif pattern_type == "structuring":
+        threshold = ring.get("threshold", 10000)
+        return f"structuring_below_{threshold:g}"
+    
     else:
         return f"{pattern_type}"
 
@@ -157,7 +159,7 @@ def calculate_behavioral_adjustment(account, metrics, G):
     4. Statistical anomalies (unusual patterns = higher risk)
     
     Args:
-        account (str): Account ID
+        account (int): Account code
         metrics (dict): Account metrics
         G (networkx.DiGraph): Transaction graph
         
@@ -218,12 +220,12 @@ def calculate_network_statistics(G):
     Returns:
         dict: Network statistics
     """
-    degrees = [G.degree(n) for n in G.nodes()]
+    degrees = graph_features(G).nodes["degree"]
     
     return {
-        "mean_degree": statistics.mean(degrees) if degrees else 0,
-        "median_degree": statistics.median(degrees) if degrees else 0,
-        "stdev_degree": statistics.stdev(degrees) if len(degrees) > 1 else 0,
-        "total_nodes": len(G.nodes()),
-        "total_edges": len(G.edges())
+        "mean_degree": float(np.mean(degrees)) if len(degrees) else 0,
+        "median_degree": float(np.median(degrees)) if len(degrees) else 0,
+        "stdev_degree": float(np.std(degrees, ddof=1)) if len(degrees) > 1 else 0,
+        "total_nodes": G.number_of_nodes(),
+        "total_edges": G.number_of_edges()
     }
@@ -6,208 +6,334 @@ Coordinates all detection engines and produces final output.
 import time
 import os
 from services.csv_processor import load_transactions
-from services.graph_builder import build_transaction_graph, get_account_metrics
+from services.account_index import account_labels, decode_rings, decode_accounts
+from services.graph_builder import build_transaction_graph, build_csr_graph, get_account_metrics
+from services.graph_features import graph_features
 from services.cycle_detector import detect_cycles
+from services.ring_consolidator import consolidate_cycles_to_rings
 from services.smurfing_detector import detect_smurfing
 from services.shell_detector import detect_shell_networks
+from services.structuring_detector import detect_structuring
+from services.detector_pool import DETECTOR_EXECUTORS
+from services.pipeline import Pipeline, PipelineCancelled, Stage, file_digest
 from services.account_scorer import generate_suspicious_accounts, calculate_network_statistics
 from services.json_generator import generate_final_json
 
 UPLOAD_FOLDER = "uploads"
 
-def run_complete_analysis(file_path):
+GRAPH_ENGINES = ("networkx", "csr")
+
+
+def run_complete_analysis(file_path, chunksize=None, max_memory_mb=None, graph_engine="networkx",
+                          cycle_workers=None, temporal_cycles=False, cycle_window_hours=72,
+                          cycle_deadline_seconds=30, detector_executor="serial", detector_workers=None,
+                          fan_threshold=10, smurfing_window_hours=72, shell_threshold=3, shell_hop_limit=5,
+                          file_hash=None, stage_cache=None, progress=None):
     """
     Execute complete money muling detection analysis.
     
-    Pipeline:
-    1. Load and validate CSV
-    2. Build transaction graph
-    3. Run all detection algorithms (cycles, smurfing, shells)
-    4. Aggregate rings and calculate suspicion scores
-    5. Generate JSON output
+    Pipeline (ANALYSIS_PIPELINE, a DAG of cached stages):
+    1. load: Load and validate CSV
+    2. graph: Build transaction graph
+    3. metrics: Per-account metrics and network statistics
+    4. cycles, smurfing, shells, structuring: Detection algorithms
+    5. rings, score: Aggregate rings and calculate suspicion scores
+    6. output: Generate JSON output
+    
+    With a stage_cache, every stage's output is cached under a hash of the
+    file contents and the parameters it depends on, so re-running with e.g.
+    a different fan_threshold only recomputes smurfing, rings, score and
+    output. The cache holds graphs and frames, so it lives as long as the
+    caller keeps it; by default (None) nothing outlives the run.
+    
+    progress(stage, title) is called as each stage starts (title carries
+    the "[k/6]" step); raising PipelineCancelled from it aborts the run.
+    
+    Passing chunksize or max_memory_mb switches stage 1 to streaming
+    ingestion: the CSV is read and normalized chunk by chunk, so raw CSV
+    text is never held for the whole file. max_memory_mb sizes those chunks;
+    it is not a ceiling on the analysis, which keeps every valid
+    transaction for the graph.
+    
+    graph_engine="csr" builds the array-backed CSRGraph instead of a
+    networkx.DiGraph; every detector runs on either.
+    
+    cycle_workers > 1 runs the cycle search on that many worker processes
+    (0 = one per CPU), split by strongly connected component.
+    temporal_cycles=True only reports cycles whose hops happen in time
+    order within cycle_window_hours. Cycle search stops after
+    cycle_deadline_seconds and keeps the cycles found so far.
+    
+    The detectors only read the graph, so detector_executor can run them
+    concurrently: "thread", "process", or "auto" (the pure-Python cycle
+    search in a worker process, the NumPy/pandas-heavy detectors on
+    threads). Wall time for stage 4 then approaches that of the slowest
+    detector. "serial" (default) runs them one after another in-process.
     
     Args:
         file_path (str): Path to uploaded CSV file
+        chunksize (int): Rows per ingestion chunk (default: whole file)
+        max_memory_mb (float): Working-set budget of one ingestion chunk
+        graph_engine (str): "networkx" (default) or "csr"
+        cycle_workers (int): Processes for cycle detection (default: in-process)
+        temporal_cycles (bool): Require time-respecting cycles (default False)
+        cycle_window_hours (float): Window for temporal cycles (default 72)
+        cycle_deadline_seconds (float): Time limit for cycle search (default
+            30, None = no limit)
+        detector_executor (str): "serial" (default), "thread", "process" or "auto"
+        detector_workers (int): Workers per detector pool (default: one per detector)
+        fan_threshold (int): Smurfing counterparty threshold (default 10)
+        smurfing_window_hours (float): Smurfing aggregation window (default 72)
+        shell_threshold (int): Max transactions for a shell account (default 3)
+        shell_hop_limit (int): Max shell chain length in hops (default 5)
+        file_hash (str): SHA-256 of the file if already known (default:
+            hashed here)
+        stage_cache (StageCache): Stage output cache shared by the runs it
+            is passed to (default: no caching)
+        progress (callable): Stage start callback (see Pipeline.run)
         
     Returns:
         dict: Complete analysis results with:
-            - G (networkx.DiGraph): Transaction graph
+            - G (networkx.DiGraph or CSRGraph): Transaction graph keyed on account codes
             - df (pd.DataFrame): Processed transactions
             - all_rings (list): All detected fraud rings
             - suspicious_accounts (list): Flagged accounts with scores
             - final_json (dict): RIFT-spec JSON output
+            - cycle_search (dict): Cycle search coverage (see detect_cycles stats)
+            - detector_timings (dict): Wall time in seconds per detector
+                (0 when served from the stage cache)
+            - stages (dict): Per-stage {"cached", "seconds", "error", "complete"}
+            - complete (bool): False if a detector failed or cycle search
+                timed out (such results are not kept in stage_cache)
             - network_stats (dict): Network statistics
             
     Raises:
+        PipelineCancelled: If progress cancelled the run
         Exception: If any stage fails with descriptive message
     """
     
     start_time = time.time()
     
+    if graph_engine not in GRAPH_ENGINES:
+        raise Exception(f"Unknown graph engine '{graph_engine}' (expected one of: {', '.join(GRAPH_ENGINES)})")
+    if detector_executor not in DETECTOR_EXECUTORS:
+        raise Exception(f"Unknown detector executor '{detector_executor}' (expected one of: {', '.join(DETECTOR_EXECUTORS)})")
+    
     try:
-        # Stage 1: Load CSV
-        print("[1/6] Loading and validating CSV...")
-        df = load_transactions(file_path)
-        print(f"     ✓ Loaded {len(df)} transactions")
-        
-        # Stage 2: Build graph
-        print("[2/6] Building transaction network...")
-        G = build_transaction_graph(df)
-        print(f"     ✓ Created graph with {G.number_of_nodes()} nodes, {G.number_of_edges()} edges")
-        
-        # Stage 3: Calculate metrics
-        print("[3/6] Analyzing account metrics...")
-        metrics = get_account_metrics(G, df)
-        network_stats = calculate_network_statistics(G)
-        print(f"     ✓ Calculated metrics for {len(metrics)} accounts")
-        
-        # Stage 4: Run detection algorithms
-        print("[4/6] Detecting fraud patterns...")
-        
-        # Cycle detection with timeout
-        print("     - Detecting circular fund routing...")
-        try:
-            # Bounded cycle detection: limit successors to avoid combinatorial explosion
-            cycles = detect_cycles(G, min_length=3, max_length=5, max_successors=10)
-            print(f"       Found {len(cycles)} cycles")
-        except Exception as e:
-            print(f"       ⚠ Cycle detection error: {str(e)[:50]}")
-            cycles = []
-        
-        # Consolidate cycles into cycle-level fraud rings to avoid explosion
-        # Group cycles that share accounts into a single ring (preserves accuracy)
-        def consolidate_cycles_to_rings(cycles_list):
-            import networkx as _nx
-            rings_out = []
-            if not cycles_list:
-                return rings_out
-
-            # Build an undirected graph connecting accounts that appear together in any cycle
-            C = _nx.Graph()
-            for c in cycles_list:
-                members = list(c.get('member_accounts', c.get('member_accounts', [])))
-                for i in range(len(members)):
-                    C.add_node(members[i])
-                    for j in range(i+1, len(members)):
-                        C.add_edge(members[i], members[j])
-
-            components = list(_nx.connected_components(C))
-            ring_counter = 1
-            # For each connected component, aggregate cycle info
-            for comp in components:
-                comp_nodes = sorted(list(comp))
-                # gather cycles that intersect this comp
-                related_cycles = [c for c in cycles_list if any(a in comp for a in c.get('member_accounts', []))]
-                # compute ring risk as max of member cycle risk (fallback to 75)
-                max_risk = 0.0
-                for rc in related_cycles:
-                    try:
-                        max_risk = max(max_risk, float(rc.get('risk_score', 0)))
-                    except Exception:
-                        continue
-
-                rings_out.append({
-                    'ring_id': f'RING_C_{ring_counter:03d}',
-                    'member_accounts': comp_nodes,
-                    'pattern_type': 'cycle',
-                    'risk_score': round(max_risk if max_risk>0 else 80.0, 2)
-                })
-                ring_counter += 1
-
-            return rings_out
-
-        # Replace raw cycles list with consolidated cycle rings
-        consolidated_cycle_rings = consolidate_cycles_to_rings(cycles)
-        print(f"       Consolidated cycles into {len(consolidated_cycle_rings)} cycle rings")
-        # Smurfing detection
-        print("     - Detecting smurfing patterns...")
-        try:
-            smurfing = detect_smurfing(G, df, fan_threshold=10, time_window_hours=72)
-            print(f"       Found {len(smurfing)} smurfing patterns")
-        except Exception as e:
-            print(f"       ⚠ Smurfing detection error: {str(e)[:50]}")
-            smurfing = []
-        
-        # Shell network detection with timeout
-        print("     - Detecting shell networks...")
-        try:
-            shells = detect_shell_networks(G, shell_threshold=3, hop_limit=5)
-            print(f"       Found {len(shells)} shell networks")
-        except Exception as e:
-            print(f"       ⚠ Shell detection error: {str(e)[:50]}")
-            shells = []
-        
-        # Combine all rings - use consolidated cycles instead of raw cycles
-        all_rings = consolidated_cycle_rings + smurfing + shells
-        print(f"     ✓ Total rings detected: {len(all_rings)}")
+        params = {
+            "file_path": file_path,
+            "file_hash": file_hash or file_digest(file_path),
+            "chunksize": chunksize,
+            "max_memory_mb": max_memory_mb,
+            "graph_engine": graph_engine,
+            "cycle_workers": cycle_workers,
+            "temporal_cycles": temporal_cycles,
+            "cycle_window_hours": cycle_window_hours,
+            "cycle_deadline_seconds": cycle_deadline_seconds,
+            "fan_threshold": fan_threshold,
+            "smurfing_window_hours": smurfing_window_hours,
+            "shell_threshold": shell_threshold,
+            "shell_hop_limit": shell_hop_limit,
+            "start_time": start_time
+        }
+        if detector_executor != "serial":
+            print(f"     Detectors run concurrently ({detector_executor})")
         
-        # Stage 5: Score suspicious accounts
-        print("[5/6] Calculating suspicion scores...")
-        stage5_start = time.time()
-        suspicious_accounts = generate_suspicious_accounts(all_rings, G, df, metrics)
-        stage5_time = time.time() - stage5_start
-        print(f"     ✓ Flagged {len(suspicious_accounts)} suspicious accounts ({stage5_time:.2f}s)")
+        outputs, report = ANALYSIS_PIPELINE.run(
+            params, ["graph", "metrics", "cycles", "output"], cache=stage_cache,
+            executor=detector_executor, max_workers=detector_workers, progress=progress
+        )
         
-        # Stage 6: Generate JSON output
-        print("[6/6] Generating output...")
-        stage6_start = time.time()
-        final_json = generate_final_json(G, df, all_rings, suspicious_accounts, start_time)
-        stage6_time = time.time() - stage6_start
-        print(f"     ✓ Complete in {final_json['summary']['processing_time_seconds']}s (json gen: {stage6_time:.2f}s)")
+        G = outputs["graph"]
+        output = outputs["output"]
         
         return {
             "G": G,
-            "df": df,
-            "all_rings": all_rings,
-            "suspicious_accounts": suspicious_accounts,
-            "final_json": final_json,
-            "network_stats": network_stats,
-            "metrics": metrics
+            # Keep the (sender, receiver, timestamp)-sorted frame that backs the
+            # graph's transaction index rather than a second copy in file order
+            "df": G.graph["transactions"].frame,
+            "all_rings": output["all_rings"],
+            "suspicious_accounts": output["suspicious_accounts"],
+            "final_json": output["final_json"],
+            "network_stats": outputs["metrics"]["network_stats"],
+            "metrics": outputs["metrics"]["metrics"],
+            "cycle_search": outputs["cycles"][1],
+            "detector_timings": {name: round(report[name]["seconds"], 3) for name in DETECTOR_STAGES if name in report},
+            "stages": report,
+            "complete": report["output"]["complete"]
         }
         
+    except PipelineCancelled:
+        raise
     except Exception as e:
         elapsed = round(time.time() - start_time, 2)
         raise Exception(f"Analysis failed after {elapsed}s: {str(e)}")
 
 
+# ----------------------------------------------------------------------
+# Stages: function(params, *inputs), module-level so they can be pickled
+# into detector worker processes
+# ----------------------------------------------------------------------
+
+def _load_stage(params):
+    return load_transactions(params["file_path"], params["chunksize"], params["max_memory_mb"])
+
+
+def _graph_stage(params, df):
+    G = build_csr_graph(df) if params["graph_engine"] == "csr" else build_transaction_graph(df)
+    # Degree/volume/edge statistics shared by metrics, detectors and scorer
+    graph_features(G).nodes
+    return G
+
+
+def _metrics_stage(params, G):
+    return {
+        "metrics": get_account_metrics(G, G.graph["transactions"].frame),
+        "network_stats": calculate_network_statistics(G)
+    }
+
+
+def _cycles_stage(params, G):
+    # Exhaustive bounded-length search over SCCs, capped by a per-component
+    # work budget and a wall-clock deadline (partial results on timeout).
+    # Stats are returned rather than filled in place so they survive a
+    # worker process.
+    stats = {}
+    cycles = detect_cycles(G, min_length=3, max_length=5, stats=stats,
+                           workers=params["cycle_workers"], temporal=params["temporal_cycles"],
+                           time_window_hours=params["cycle_window_hours"],
+                           deadline_seconds=params["cycle_deadline_seconds"])
+    return cycles, stats
+
+
+def _smurfing_stage(params, G):
+    return detect_smurfing(G, fan_threshold=params["fan_threshold"],
+                           time_window_hours=params["smurfing_window_hours"])
+
+
+def _shells_stage(params, G):
+    return detect_shell_networks(G, shell_threshold=params["shell_threshold"],
+                                 hop_limit=params["shell_hop_limit"])
+
+
+def _structuring_stage(params, G):
+    # Amounts just under reporting thresholds
+    return detect_structuring(G)
+
+
+def _rings_stage(params, cycles, smurfing, shells, structuring, G):
+    # Replace raw cycles list with consolidated cycle rings (cycles sharing accounts merge)
+    cycle_rings = consolidate_cycles_to_rings(cycles[0], account_labels(G))
+    return {
+        "cycle_rings": len(cycle_rings),
+        "all_rings": cycle_rings + smurfing + shells + structuring
+    }
+
+
+def _score_stage(params, rings, G, metrics):
+    return generate_suspicious_accounts(rings["all_rings"], G, G.graph["transactions"].frame,
+                                        metrics["metrics"])
+
+
+def _output_stage(params, rings, suspicious_accounts, G):
+    # JSON boundary: turn account codes back into account IDs
+    labels = account_labels(G)
+    all_rings = decode_rings(rings["all_rings"], labels)
+    suspicious_accounts = decode_accounts(suspicious_accounts, labels)
+    final_json = generate_final_json(G, G.graph["transactions"].frame, all_rings,
+                                     suspicious_accounts, params["start_time"])
+    return {"all_rings": all_rings, "suspicious_accounts": suspicious_accounts, "final_json": final_json}
+
+
+def _cycles_summary(result, seconds):
+    cycles, stats = result
+    lines = [f"       Found {len(cycles)} cycles ({seconds:.2f}s)"]
+    if stats["timed_out"]:
+        lines.append(f"       ⚠ Cycle search deadline reached: {stats['coverage']:.1%} of start accounts covered")
+    elif stats["truncated_components"]:
+        lines.append(f"       ⚠ Work budget hit in {stats['truncated_components']} components")
+    return "\n".join(lines)
+
+
+DETECTOR_STAGES = ("cycles", "smurfing", "shells", "structuring")
+
+ANALYSIS_PIPELINE = Pipeline([
+    Stage("load", _load_stage, params=("file_hash",),
+          title="[1/6] Loading and validating CSV...",
+          summary=lambda df, seconds: f"     ✓ Loaded {len(df)} transactions",
+          # Only feeds the graph stage, which holds the sorted copy
+          cache=False),
+    Stage("graph", _graph_stage, inputs=("load",), params=("graph_engine",),
+          title="[2/6] Building transaction network...",
+          summary=lambda G, seconds: f"     ✓ Created graph with {G.number_of_nodes()} nodes, {G.number_of_edges()} edges"),
+    Stage("metrics", _metrics_stage, inputs=("graph",),
+          title="[3/6] Analyzing account metrics...",
+          summary=lambda metrics, seconds: f"     ✓ Calculated metrics for {len(metrics['metrics'])} accounts"),
+    Stage("cycles", _cycles_stage, inputs=("graph",),
+          params=("temporal_cycles", "cycle_window_hours", "cycle_deadline_seconds"),
+          title="     - Detecting circular fund routing...", summary=_cycles_summary,
+          group="detectors", preferred_executor="process", isolated=True, fallback=([], {}),
+          # A search stopped by the deadline is not the full answer for these params
+          complete=lambda result: not result[1].get("timed_out")),
+    Stage("smurfing", _smurfing_stage, inputs=("graph",), params=("fan_threshold", "smurfing_window_hours"),
+          title="     - Detecting smurfing patterns...",
+          summary=lambda rings, seconds: f"       Found {len(rings)} smurfing patterns ({seconds:.2f}s)",
+          group="detectors", isolated=True, fallback=[]),
+    Stage("shells", _shells_stage, inputs=("graph",), params=("shell_threshold", "shell_hop_limit"),
+          title="     - Detecting shell networks...",
+          summary=lambda rings, seconds: f"       Found {len(rings)} shell networks ({seconds:.2f}s)",
+          group="detectors", isolated=True, fallback=[]),
+    Stage("structuring", _structuring_stage, inputs=("graph",),
+          title="     - Detecting structuring...",
+          summary=lambda rings, seconds: f"       Found {len(rings)} structuring patterns ({seconds:.2f}s)",
+          group="detectors", isolated=True, fallback=[]),
+    Stage("rings", _rings_stage, inputs=DETECTOR_STAGES + ("graph",),
+          summary=lambda rings, seconds: (f"       Consolidated cycles into {rings['cycle_rings']} cycle rings\n"
+                                          f"     ✓ Total rings detected: {len(rings['all_rings'])}")),
+    Stage("score", _score_stage, inputs=("rings", "graph", "metrics"),
+          title="[5/6] Calculating suspicion scores...",
+          summary=lambda accounts, seconds: f"     ✓ Flagged {len(accounts)} suspicious accounts ({seconds:.2f}s)"),
+    # Reports processing time for this run, so it is never served from the cache
+    Stage("output", _output_stage, inputs=("rings", "score", "graph"),
+          title="[6/6] Generating output...",
+          summary=lambda output, seconds: (f"     ✓ Complete in {output['final_json']['summary']['processing_time_seconds']}s "
+                                           f"(json gen: {seconds:.2f}s)"),
+          cache=False)
+], group_titles={"detectors": "[4/6] Detecting fraud patterns..."})
+
+
 def prepare_visualization_data(G, df, all_rings, suspicious_accounts):
     """
     Prepare data for frontend graph visualization.
     
     Args:
-        G (networkx.DiGraph): Transaction graph
+        G (networkx.DiGraph): Transaction graph (keyed on account codes)
         df (pd.DataFrame): Transaction data
-        all_rings (list): Detected fraud rings
-        suspicious_accounts (list): Flagged accounts
+        all_rings (list): Detected fraud rings (account IDs)
+        suspicious_accounts (list): Flagged accounts (account IDs)
         
     Returns:
         dict: Visualization data with nodes and edges
     """
+    labels = account_labels(G)
     
-    # Build set of suspicious account IDs
-    suspicious_ids = {str(acc["account_id"]).strip() 
-                     for acc in suspicious_accounts}
+    # Suspicion score by account ID (first entry wins, as in the list order)
+    suspicion_scores = {}
+    for acc in suspicious_accounts:
+        suspicion_scores.setdefault(acc["account_id"], acc["suspicion_score"])
     
     # Build set of accounts in fraud rings
     ring_account_ids = set()
     for ring in all_rings:
-        for acc in ring.get("member_accounts", []):
-            ring_account_ids.add(str(acc).strip())
+        ring_account_ids.update(ring.get("member_accounts", []))
     
     # Nodes
     nodes = []
     for node in G.nodes():
-        node_str = str(node).strip()
-        is_suspicious = node_str in suspicious_ids
+        node_str = labels[node]
+        is_suspicious = node_str in suspicion_scores
         is_in_ring = node_str in ring_account_ids
-        
-        # Find suspicion score if available
-        suspicion_score = 0.0
-        if is_suspicious:
-            for acc in suspicious_accounts:
-                if str(acc["account_id"]).strip() == node_str:
-                    suspicion_score = acc["suspicion_score"]
-                    break
+        suspicion_score = suspicion_scores.get(node_str, 0.0)
         
         nodes.append({
             "id": node_str,
@@ -221,8 +347,8 @@ def prepare_visualization_data(G, df, all_rings, suspicious_accounts):
     edges = []
     edge_id = 0
     for u, v in G.edges():
-        u_str = str(u).strip()
-        v_str = str(v).strip()
+        u_str = labels[u]
+        v_str = labels[v]
         
         edge_data = G[u][v]
         
@@ -0,0 +1,212 @@
+"""
+Background analysis jobs.
+
+/analyze hands the analysis to a JobManager and returns a job ID at once
+instead of running the pipeline inside the request. Jobs run on a bounded
+thread pool (the pipeline's heavy lifting is NumPy/pandas, and cycle search
+can still use its own worker processes). Each job records the pipeline step
+it is in - the "[k/6]" stage titles - so clients can poll its progress.
+
+Admission control: at most max_workers jobs run and max_pending more wait
+in the queue; submit() refuses work beyond that instead of letting the
+backlog grow without bound.
+
+Cancelling a queued job removes it from the queue. A running job is
+cancelled cooperatively: its progress callback raises PipelineCancelled at
+the next stage boundary, so a detector already running finishes first.
+"""
+
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from services.pipeline import PipelineCancelled
+
+JOB_STATES = ("queued", "running", "done", "failed", "cancelled")
+
+# Step number and count in stage titles such as "[3/6] Analyzing ..."
+STEP_PATTERN = re.compile(r"\[(\d+)/(\d+)\]")
+
+
+class AnalysisJob:
+    """State and progress of one background analysis."""
+    
+    def __init__(self, job_id, analysis_id):
+        """
+        Args:
+            job_id (str): Job ID
+            analysis_id (str): Analysis the job belongs to
+        """
+        self.job_id = job_id
+        self.analysis_id = analysis_id
+        self.state = "queued"
+        self.stage = None
+        self.step = 0
+        self.total_steps = None
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+    
+    def progress(self, name, title):
+        """
+        Pipeline progress callback: record the stage, honour cancellation.
+        
+        Raises:
+            PipelineCancelled: If the job was cancelled
+        """
+        if self._cancel.is_set():
+            raise PipelineCancelled(f"Job {self.job_id} cancelled")
+        
+        if title:
+            self.stage = title.strip()
+            match = STEP_PATTERN.search(title)
+            if match:
+                self.step, self.total_steps = int(match.group(1)), int(match.group(2))
+    
+    def wait(self, timeout=None):
+        """Block until the job has finished; returns False on timeout."""
+        return self._finished.wait(timeout)
+    
+    @property
+    def finished(self):
+        return self.state in ("done", "failed", "cancelled")
+    
+    def snapshot(self):
+        """
+        JSON-serializable status of the job.
+        
+        Returns:
+            dict: job_id, analysis_id, status, stage, step, total_steps,
+                percent, elapsed_seconds (since submission), error and
+                result (once done)
+        """
+        if self.state == "done":
+            percent = 100
+        elif self.total_steps:
+            # Steps completed before the current one
+            percent = round(100 * (self.step - 1) / self.total_steps)
+        else:
+            percent = 0
+        
+        end = self.finished_at or time.time()
+        return {
+            "job_id": self.job_id,
+            "analysis_id": self.analysis_id,
+            "status": self.state,
+            "stage": self.stage,
+            "step": self.step,
+            "total_steps": self.total_steps,
+            "percent": percent,
+            "elapsed_seconds": round(end - self.created_at, 2),
+            "error": self.error,
+            "result": self.result
+        }
+
+
+class JobManager:
+    """Bounded pool of background analysis jobs."""
+    
+    def __init__(self, max_workers=2, max_pending=8, max_finished=100):
+        """
+        Args:
+            max_workers (int): Jobs running at the same time
+            max_pending (int): Jobs allowed to wait for a worker
+            max_finished (int): Finished jobs kept for status queries
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def submit(self, analysis_id, function):
+        """
+        Queue an analysis.
+        
+        Args:
+            analysis_id (str): Analysis the job belongs to
+            function (callable): function(progress) -> JSON-serializable
+                result; must pass progress on to run_complete_analysis
+        
+        Returns:
+            AnalysisJob: The queued job, or None if the pool is saturated
+        """
+        with self._lock:
+            if self._active() >= self.max_workers + self.max_pending:
+                return None
+            
+            job = AnalysisJob(uuid.uuid4().hex, analysis_id)
+            self._jobs[job.job_id] = job
+            self._prune()
+            job.future = self._pool.submit(self._run, job, function)
+            return job
+    
+    def get(self, job_id):
+        """Job by ID, or None if unknown (or pruned)."""
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def cancel(self, job_id):
+        """
+        Cancel a queued or running job.
+        
+        Returns:
+            AnalysisJob: The job (state "cancelled" if it had not started
+                yet; a running job changes state at its next stage), or None
+                if unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+        
+        job._cancel.set()
+        if job.future.cancel():
+            self._finish(job, "cancelled", error="Cancelled before it started")
+        return job
+    
+    def active(self):
+        """Number of queued and running jobs."""
+        with self._lock:
+            return self._active()
+    
+    def _active(self):
+        """active() for callers already holding the lock."""
+        return sum(1 for job in self._jobs.values() if not job.finished)
+    
+    def _run(self, job, function):
+        if job._cancel.is_set():
+            self._finish(job, "cancelled", error="Cancelled before it started")
+            return
+        
+        job.state = "running"
+        job.started_at = time.time()
+        try:
+            result = function(job.progress)
+        except PipelineCancelled:
+            self._finish(job, "cancelled", error=f"Cancelled during: {job.stage}")
+        except Exception as e:
+            self._finish(job, "failed", error=str(e))
+        else:
+            job.result = result
+            self._finish(job, "done")
+    
+    def _finish(self, job, state, error=None):
+        job.state = state
+        job.error = error
+        job.finished_at = time.time()
+        job._finished.set()
+    
+    def _prune(self):
+        """Forget the oldest finished jobs beyond max_finished."""
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
@@ -0,0 +1,181 @@
+"""
+Array-backed transaction graph.
+
+CSRGraph stores the aggregated transaction network as NumPy arrays instead of
+networkx's nested dicts: forward and reverse CSR adjacency over dense account
+codes plus one array per edge attribute. It implements the small part of the
+networkx.DiGraph API that the detectors, metrics and scorer use, so it can be
+passed anywhere a transaction graph is expected.
+
+Memory is roughly 60 bytes per edge and 16 bytes per node, against several
+hundred bytes per edge for networkx.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CSRGraph:
+    """
+    Immutable directed graph in compressed sparse row form.
+    
+    Nodes are account codes 0..n-1. Edges are sorted by (source, target), so
+    edge e of node u lives at indptr[u] <= e < indptr[u + 1] and its
+    attributes are amount[e], count[e], first_ts[e], last_ts[e] and
+    txn_start[e] (offset of its run in the TransactionIndex).
+    """
+    
+    def __init__(self, n_nodes, sources, targets, amount, count, first_ts, last_ts,
+                 account_ids=None, txn_start=None):
+        """
+        Args:
+            n_nodes (int): Number of nodes (codes are 0..n_nodes-1)
+            sources (array-like): Edge source codes
+            targets (array-like): Edge target codes
+            amount (array-like): Total amount per edge
+            count (array-like): Transaction count per edge
+            first_ts (array-like): First transaction time per edge
+            last_ts (array-like): Last transaction time per edge
+            account_ids (pd.Index): Account IDs indexed by code
+            txn_start (array-like): Offset of each edge's run in the
+                TransactionIndex (optional)
+        """
+        sources = np.asarray(sources, dtype=np.int32)
+        targets = np.asarray(targets, dtype=np.int32)
+        order = np.lexsort((targets, sources))
+        
+        self.sources = sources[order]
+        self.indices = targets[order]
+        self.indptr = _indptr(self.sources, n_nodes)
+        
+        self.amount = np.asarray(amount, dtype=np.float64)[order]
+        self.count = np.asarray(count, dtype=np.int64)[order]
+        self.first_ts = np.asarray(first_ts, dtype="datetime64[ns]")[order]
+        self.last_ts = np.asarray(last_ts, dtype="datetime64[ns]")[order]
+        self.txn_start = None if txn_start is None else np.asarray(txn_start, dtype=np.int64)[order]
+        
+        # Reverse adjacency: predecessors of v and the forward edge ids
+        reverse = np.lexsort((self.sources, self.indices))
+        self.rev_indices = self.sources[reverse]
+        self.rev_edges = reverse.astype(np.int64)
+        self.rev_indptr = _indptr(self.indices[reverse], n_nodes)
+        
+        self.graph = {"account_ids": account_ids}
+    
+    # ------------------------------------------------------------------
+    # Size
+    # ------------------------------------------------------------------
+    
+    def number_of_nodes(self):
+        return len(self.indptr) - 1
+    
+    def number_of_edges(self):
+        return len(self.indices)
+    
+    def __len__(self):
+        return self.number_of_nodes()
+    
+    def __contains__(self, node):
+        return 0 <= node < self.number_of_nodes()
+    
+    def __iter__(self):
+        return iter(range(self.number_of_nodes()))
+    
+    # ------------------------------------------------------------------
+    # Traversal
+    # ------------------------------------------------------------------
+    
+    def nodes(self):
+        """All node codes."""
+        return range(self.number_of_nodes())
+    
+    def edges(self):
+        """Iterate (source, target) pairs in CSR order."""
+        return zip(self.sources.tolist(), self.indices.tolist())
+    
+    def successors(self, node):
+        return self.indices[self.indptr[node]:self.indptr[node + 1]].tolist()
+    
+    def predecessors(self, node):
+        return self.rev_indices[self.rev_indptr[node]:self.rev_indptr[node + 1]].tolist()
+    
+    def out_degree(self, node=None):
+        """Out-degree of one node, or an array for all nodes."""
+        if node is None:
+            return np.diff(self.indptr)
+        return int(self.indptr[node + 1] - self.indptr[node])
+    
+    def in_degree(self, node=None):
+        """In-degree of one node, or an array for all nodes."""
+        if node is None:
+            return np.diff(self.rev_indptr)
+        return int(self.rev_indptr[node + 1] - self.rev_indptr[node])
+    
+    def degree(self, node=None):
+        """Total degree of one node, or an array for all nodes."""
+        if node is None:
+            return self.in_degree() + self.out_degree()
+        return self.in_degree(node) + self.out_degree(node)
+    
+    # ------------------------------------------------------------------
+    # Edge lookup
+    # ------------------------------------------------------------------
+    
+    def edge_index(self, u, v):
+        """Position of edge u -> v in the edge arrays, or -1 if absent."""
+        if not (0 <= u < self.number_of_nodes()):
+            return -1
+        start, end = self.indptr[u], self.indptr[u + 1]
+        pos = start + np.searchsorted(self.indices[start:end], v)
+        if pos < end and self.indices[pos] == v:
+            return int(pos)
+        return -1
+    
+    def has_edge(self, u, v):
+        return self.edge_index(u, v) >= 0
+    
+    def edge_data(self, edge):
+        """Attribute dict for an edge position, in networkx edge format."""
+        data = {
+            "amount": float(self.amount[edge]),
+            "count": int(self.count[edge]),
+            "timestamp_first": pd.Timestamp(self.first_ts[edge]),
+            "timestamp_last": pd.Timestamp(self.last_ts[edge])
+        }
+        if self.txn_start is not None:
+            data["txn_start"] = int(self.txn_start[edge])
+        return data
+    
+    def __getitem__(self, u):
+        """G[u][v] -> edge attribute dict, as with networkx."""
+        return _Adjacency(self, u)
+
+
+class _Adjacency:
+    """Successor view of one node supporting G[u][v] and `v in G[u]`."""
+    
+    def __init__(self, G, u):
+        self._G = G
+        self._u = u
+    
+    def __getitem__(self, v):
+        edge = self._G.edge_index(self._u, v)
+        if edge < 0:
+            raise KeyError(v)
+        return self._G.edge_data(edge)
+    
+    def __contains__(self, v):
+        return self._G.has_edge(self._u, v)
+    
+    def __iter__(self):
+        return iter(self._G.successors(self._u))
+    
+    def __len__(self):
+        return self._G.out_degree(self._u)
+
+
+def _indptr(sorted_keys, n_nodes):
+    """CSR row pointer for keys already sorted ascending."""
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sorted_keys, minlength=n_nodes), out=indptr[1:])
+    return indptr
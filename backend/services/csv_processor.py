@@ -1,15 +1,65 @@
 import pandas as pd
 from datetime import datetime
+from services.account_index import AccountIndex, intern_accounts
 
-def load_transactions(file_path):
+# Rows per chunk when streaming without an explicit memory budget
+DEFAULT_CHUNK_ROWS = 100_000
+
+# Normalizing a chunk briefly holds the raw frame plus parsed timestamp/amount
+# columns and the filtered copy, so budget a few times the raw chunk size
+CHUNK_WORKING_SET_FACTOR = 4
+
+# Flexible column mapping for common variations
+COLUMN_MAP = {
+    "sender": "sender_id",
+    "sender_account": "sender_id",
+    "from_account": "sender_id",
+    "from": "sender_id",
+    "source": "sender_id",
+    "receiver": "receiver_id",
+    "receiver_account": "receiver_id",
+    "to_account": "receiver_id",
+    "to": "receiver_id",
+    "destination": "receiver_id",
+    "date": "timestamp",
+    "time": "timestamp",
+    "transaction_date": "timestamp",
+    "txn_id": "transaction_id",
+    "tx_id": "transaction_id",
+    "id": "transaction_id"
+}
+
+REQUIRED_COLUMNS = ["sender_id", "receiver_id", "amount", "timestamp"]
+
+# Identifier columns, always read as text: inferring their type per chunk
+# would turn the same numeric ID into "1" in one chunk and "1.0" in another
+# (a chunk with a missing value is parsed as float)
+ID_COLUMNS = ["transaction_id", "sender_id", "receiver_id"]
+
+
+def load_transactions(file_path, chunksize=None, max_memory_mb=None):
     """
     Load and validate CSV file with flexible column mapping.
     
     Expected columns: sender_id, receiver_id, amount, timestamp
     Handles common variations in naming conventions.
     
+    When chunksize or max_memory_mb is given the file is read in fixed-size
+    chunks (see iter_transaction_chunks): raw text is parsed and filtered one
+    chunk at a time, and the normalized chunks are assembled column by
+    column. The result still holds every valid transaction (the graph is
+    built from all of them), so max_memory_mb bounds the parsing working set
+    of a chunk, not the memory used by the whole load.
+    
+    Account IDs are interned at ingest: sender_id/receiver_id come back as
+    categoricals whose codes are dense int32 account codes (see
+    services.account_index).
+    
     Args:
         file_path (str): Path to CSV file
+        chunksize (int): Rows per chunk (default: read whole file at once)
+        max_memory_mb (float): Working-set budget of one chunk, used to size
+            chunks (see estimate_chunk_rows)
         
     Returns:
         pd.DataFrame: Validated and processed transaction data
@@ -17,39 +67,150 @@ def load_transactions(file_path):
     Raises:
         Exception: If required columns are missing
     """
+    account_index = AccountIndex()
+    chunks = iter_transaction_chunks(file_path, chunksize, max_memory_mb, account_index)
+    
+    return concat_transaction_chunks(chunks, account_index)
+
+
+def concat_transaction_chunks(chunks, account_index):
+    """
+    Assemble normalized chunks into one frame, column by column.
+    
+    Each chunk is split into its columns as it arrives and not kept as a
+    frame. Every column is then concatenated on its own and its parts
+    released before the next, so the parsed chunks and the assembled frame
+    overlap by one column rather than in full.
+    
+    The chunks carry int32 account codes; the account columns become
+    categoricals once, over the final ID table of account_index.
+    
+    Args:
+        chunks (iterable): Chunks from iter_transaction_chunks
+        account_index (AccountIndex): Table the chunks were interned into
+        
+    Returns:
+        pd.DataFrame: All transactions
+    """
+    parts = {}
+    rows = 0
+    for chunk in chunks:
+        for column in chunk.columns:
+            parts.setdefault(column, []).append(chunk[column].reset_index(drop=True))
+        rows += len(chunk)
+    
+    df = pd.DataFrame(index=pd.RangeIndex(rows))
+    for column in list(parts):
+        column_parts = parts.pop(column)
+        values = column_parts[0] if len(column_parts) == 1 else pd.concat(column_parts, ignore_index=True)
+        if column in ("sender_id", "receiver_id"):
+            values = account_index.categorical(values.to_numpy())
+        df[column] = values
+        del column_parts, values
+    
+    return df
+
+
+def iter_transaction_chunks(file_path, chunksize=None, max_memory_mb=None, account_index=None):
+    """
+    Stream a transaction CSV as normalized DataFrame chunks.
+    
+    Each chunk has its columns mapped, timestamps and amounts parsed and
+    invalid rows dropped before the next chunk is read, so the raw text of
+    only one chunk is in memory at a time. Callers that keep the chunks
+    still hold all the normalized rows.
+    
+    Args:
+        file_path (str): Path to CSV file
+        chunksize (int): Rows per chunk (default: whole file, or derived
+            from max_memory_mb when given)
+        max_memory_mb (float): Working-set budget of one chunk, used to size
+            chunks
+        account_index (AccountIndex): Table to intern account IDs into
+            (default: a new table shared by all chunks of this file)
+        
+    Yields:
+        pd.DataFrame: Normalized, non-empty transaction chunks whose
+            sender_id/receiver_id are int32 codes into account_index
+        
+    Raises:
+        Exception: If the file cannot be read, columns are missing or no
+            valid transactions remain
+    """
+    if chunksize is None and max_memory_mb is not None:
+        chunksize = estimate_chunk_rows(file_path, max_memory_mb)
+    
+    if account_index is None:
+        account_index = AccountIndex()
+    
+    row_offset = 0
+    valid_rows = 0
+    
+    for raw_chunk in _read_csv_chunks(file_path, chunksize):
+        raw_rows = len(raw_chunk)
+        chunk = normalize_transactions(raw_chunk, row_offset)
+        row_offset += raw_rows
+        
+        if len(chunk) > 0:
+            valid_rows += len(chunk)
+            yield intern_accounts(chunk, account_index)
+    
+    if valid_rows == 0:
+        raise Exception("No valid transactions found after processing")
+
+
+def estimate_chunk_rows(file_path, max_memory_mb, sample_rows=1000):
+    """
+    Derive a chunk size (rows) whose parsing working set fits a budget.
+    
+    The budget covers one chunk while it is read and normalized (the raw
+    frame, parsed columns and the filtered copy), not the normalized rows
+    kept from earlier chunks.
+    
+    Args:
+        file_path (str): Path to CSV file
+        max_memory_mb (float): Working-set budget of one chunk in megabytes
+        sample_rows (int): Rows read to estimate the in-memory row size
+        
+    Returns:
+        int: Rows per chunk
+    """
     try:
-        df = pd.read_csv(file_path)
+        sample = pd.read_csv(file_path, nrows=sample_rows)
     except Exception as e:
         raise Exception(f"Failed to read CSV file: {str(e)}")
     
-    # Flexible column mapping for common variations
-    column_map = {
-        "sender": "sender_id",
-        "sender_account": "sender_id",
-        "from_account": "sender_id",
-        "from": "sender_id",
-        "source": "sender_id",
-        "receiver": "receiver_id",
-        "receiver_account": "receiver_id",
-        "to_account": "receiver_id",
-        "to": "receiver_id",
-        "destination": "receiver_id",
-        "date": "timestamp",
-        "time": "timestamp",
-        "transaction_date": "timestamp",
-        "txn_id": "transaction_id",
-        "tx_id": "transaction_id",
-        "id": "transaction_id"
-    }
+    if len(sample) == 0:
+        return DEFAULT_CHUNK_ROWS
     
+    bytes_per_row = sample.memory_usage(index=True, deep=True).sum() / len(sample)
+    budget_bytes = max_memory_mb * 1024 * 1024
+    
+    return max(1000, int(budget_bytes / (bytes_per_row * CHUNK_WORKING_SET_FACTOR)))
+
+
+def normalize_transactions(df, row_offset=0):
+    """
+    Map column names, parse types and drop invalid rows of a raw frame.
+    
+    Args:
+        df (pd.DataFrame): Raw CSV rows
+        row_offset (int): Number of raw rows before this frame in the file,
+            used to keep auto-generated transaction IDs unique across chunks
+        
+    Returns:
+        pd.DataFrame: Normalized transactions (may be empty)
+        
+    Raises:
+        Exception: If required columns are missing or values cannot be parsed
+    """
     # Normalize column names (lowercase)
     df.columns = df.columns.str.lower().str.strip()
     
     # Apply column mapping
-    df = df.rename(columns=column_map)
+    df = df.rename(columns=COLUMN_MAP)
     
     # Verify required columns
-    REQUIRED_COLUMNS = ["sender_id", "receiver_id", "amount", "timestamp"]
     missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     
     if missing:
@@ -57,7 +218,9 @@ def load_transactions(file_path):
     
     # Auto-generate transaction_id if missing
     if "transaction_id" not in df.columns:
-        df["transaction_id"] = [f"TXN_{i:06d}" for i in range(1, len(df) + 1)]
+        df["transaction_id"] = [
+            f"TXN_{i:06d}" for i in range(row_offset + 1, row_offset + len(df) + 1)
+        ]
     
     # Parse timestamp
     try:
@@ -71,13 +234,44 @@ def load_transactions(file_path):
     except Exception as e:
         raise Exception(f"Invalid amount values: {str(e)}")
     
-    # Remove rows with missing critical values
-    df = df.dropna(subset=["sender_id", "receiver_id", "amount", "timestamp"])
+    # Remove rows with missing critical values and self-transfers in a single
+    # filtered copy (money muling requires different accounts)
+    valid = df[REQUIRED_COLUMNS].notna().all(axis=1)
+    valid &= df["sender_id"] != df["receiver_id"]
     
-    # Validate that sender != receiver (money muling requires different accounts)
-    df = df[df["sender_id"] != df["receiver_id"]]
+    return df.loc[valid]
+
+
+def _read_csv_chunks(file_path, chunksize):
+    """Yield raw CSV chunks, wrapping reader errors consistently."""
+    try:
+        dtype = _id_column_dtypes(file_path)
+        if chunksize is None:
+            df = pd.read_csv(file_path, dtype=dtype)
+        else:
+            reader = pd.read_csv(file_path, chunksize=chunksize, dtype=dtype)
+    except Exception as e:
+        raise Exception(f"Failed to read CSV file: {str(e)}")
     
-    if len(df) == 0:
-        raise Exception("No valid transactions found after processing")
+    if chunksize is None:
+        yield df
+        return
     
-    return df
+    with reader:
+        while True:
+            try:
+                chunk = next(reader)
+            except StopIteration:
+                return
+            except Exception as e:
+                raise Exception(f"Failed to read CSV file: {str(e)}")
+            yield chunk
+
+
+def _id_column_dtypes(file_path):
+    """read_csv dtype reading every raw column that maps to an ID column as text."""
+    header = pd.read_csv(file_path, nrows=0).columns
+    return {
+        name: str for name in header
+        if COLUMN_MAP.get(str(name).lower().strip(), str(name).lower().strip()) in ID_COLUMNS
+    }
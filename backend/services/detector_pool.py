@@ -0,0 +1,76 @@
+"""
+Concurrent detector execution.
+
+Detectors only read the graph and the transaction frame, so they can run
+side by side. run_detectors submits each one to the executor that suits it -
+a process pool for pure-Python, CPU-bound searches, a thread pool for
+detectors whose heavy lifting happens in NumPy/pandas with the GIL released -
+and collects every result with its own wall time. A detector that raises
+does not take the others down: its exception is returned in place of a
+result.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# "auto" uses each task's preferred executor
+DETECTOR_EXECUTORS = ("serial", "thread", "process", "auto")
+
+
+def run_detectors(tasks, executor="serial", max_workers=None):
+    """
+    Run detector tasks and collect their results, timings and errors.
+    
+    Process workers receive pickled copies of the task's arguments, so
+    results must be returned rather than written into shared objects.
+    
+    Args:
+        tasks (list): (name, function, preferred) tuples; function takes no
+            arguments (e.g. a functools.partial) and preferred is "process"
+            or "thread", used when executor="auto"
+        executor (str): "serial" (in order, in-process), "thread",
+            "process" or "auto"
+        max_workers (int): Workers per pool (default: one per task)
+    
+    Returns:
+        dict: name -> {"result", "seconds", "error"} in task order; result is
+            None and error the exception when the detector failed
+    """
+    if executor not in DETECTOR_EXECUTORS:
+        raise Exception(f"Unknown detector executor '{executor}' (expected one of: {', '.join(DETECTOR_EXECUTORS)})")
+    
+    if executor == "serial":
+        return {name: _timed(function) for name, function, _ in tasks}
+    
+    pools = {}
+    futures = {}
+    try:
+        for name, function, preferred in tasks:
+            kind = preferred if executor == "auto" else executor
+            if kind not in pools:
+                pool_class = ProcessPoolExecutor if kind == "process" else ThreadPoolExecutor
+                pools[kind] = pool_class(max_workers=max_workers or len(tasks))
+            futures[name] = pools[kind].submit(_timed, function)
+        
+        return {name: _collect(future) for name, future in futures.items()}
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+
+
+def _timed(function):
+    """Call function, returning its result or exception and its wall time."""
+    start = time.time()
+    try:
+        result, error = function(), None
+    except Exception as e:
+        result, error = None, e
+    return {"result": result, "seconds": time.time() - start, "error": error}
+
+
+def _collect(future):
+    """Result of a submitted _timed call; pool failures count as detector errors."""
+    try:
+        return future.result()
+    except Exception as e:
+        return {"result": None, "seconds": 0.0, "error": e}
@@ -1,13 +1,29 @@
 import networkx as nx
-from collections import defaultdict
+import numpy as np
+import pandas as pd
+from collections.abc import Mapping
+from services.account_index import AccountIndex, encode_accounts, is_encoded, account_codes
+from services.csr_graph import CSRGraph
+from services.graph_features import graph_features, invalidate_features
+from services.transaction_index import TransactionIndex, sort_transactions
+from services.window_activity import DEFAULT_WINDOWS_HOURS, window_label
 
 def build_transaction_graph(df):
     """
     Build a directed graph from transaction data.
     
-    Nodes = account IDs
+    Nodes = account codes (dense ints interned at ingest); the code -> ID
+            table is kept in G.graph["account_ids"]
     Edges = money flow (sender -> receiver) with amount and timestamp metadata
     
+    Edge aggregates come from one groupby over (sender, receiver) (see
+    aggregate_edges) and are bulk-loaded with add_edges_from, so the cost
+    per transaction is vectorized pandas work rather than a Python loop.
+    
+    Individual transactions are not stored on edges: each edge has a
+    "txn_start" offset into the shared TransactionIndex kept in
+    G.graph["transactions"] (see attach_transaction_index).
+    
     Args:
         df (pd.DataFrame): Transaction data with sender_id, receiver_id, amount, timestamp
         
@@ -16,75 +32,233 @@ def build_transaction_graph(df):
     """
     G = nx.DiGraph()
     
-    for _, row in df.iterrows():
-        sender = str(row["sender_id"]).strip()
-        receiver = str(row["receiver_id"]).strip()
-        amount = float(row["amount"])
-        timestamp = row["timestamp"]
-        txn_id = row.get("transaction_id", "")
-        
-        # Add edge with metadata
-        if G.has_edge(sender, receiver):
-            # Aggregate if edge exists
-            G[sender][receiver]["amount"] += amount
-            G[sender][receiver]["count"] += 1
-            G[sender][receiver]["transactions"].append({
-                "id": txn_id,
-                "amount": amount,
-                "timestamp": timestamp.isoformat()
-            })
-        else:
-            # Create new edge
-            G.add_edge(
-                sender,
-                receiver,
-                amount=amount,
-                count=1,
-                transactions=[{
-                    "id": txn_id,
-                    "amount": amount,
-                    "timestamp": timestamp.isoformat()
-                }],
-                timestamp_first=timestamp,
-                timestamp_last=timestamp
-            )
+    if not is_encoded(df):
+        df = encode_accounts(df, AccountIndex())
+    
+    G.graph["account_ids"] = df["sender_id"].cat.categories
+    
+    senders = account_codes(df, "sender_id")
+    receivers = account_codes(df, "receiver_id")
+    
+    # Nodes in order of first appearance (sender before receiver per row)
+    G.add_nodes_from(pd.unique(np.column_stack([senders, receivers]).ravel()).tolist())
+    
+    edges = aggregate_edges(senders, receivers, df["amount"], df["timestamp"])
+    
+    G.add_edges_from(
+        (u, v, {
+            "amount": amount,
+            "count": count,
+            "timestamp_first": first,
+            "timestamp_last": last
+        })
+        for u, v, amount, count, first, last in zip(
+            edges["sender"].tolist(),
+            edges["receiver"].tolist(),
+            edges["amount"].tolist(),
+            edges["count"].tolist(),
+            edges["timestamp_first"].tolist(),
+            edges["timestamp_last"].tolist()
+        )
+    )
+    
+    attach_transaction_index(G, df)
     
     return G
 
 
-def get_account_metrics(G, df):
+def attach_transaction_index(G, df):
     """
-    Calculate in-degree, out-degree, and other metrics for each account.
+    Sort the transactions once and point every edge at its run.
+    
+    Sets G.graph["transactions"] to a TransactionIndex over the sorted frame
+    and a "txn_start" attribute on every edge; the run length is the edge's
+    "count".
     
     Args:
-        G (nx.DiGraph): Transaction graph
-        df (pd.DataFrame): Original transaction data
+        G (nx.DiGraph): Graph built from exactly these transactions
+        df (pd.DataFrame): Encoded transaction data
         
     Returns:
-        dict: Account metrics keyed by account_id
+        pd.DataFrame: The sorted frame backing the index, which callers
+            should keep instead of df so the data is held only once
     """
-    metrics = {}
+    index = TransactionIndex(sort_transactions(df))
+    starts = index.edge_starts()
     
-    for node in G.nodes():
-        in_degree = G.in_degree(node)
-        out_degree = G.out_degree(node)
+    nx.set_edge_attributes(G, dict(zip(
+        zip(index.senders[starts].tolist(), index.receivers[starts].tolist()),
+        starts.tolist()
+    )), "txn_start")
+    G.graph["transactions"] = index
+    invalidate_features(G)
+    
+    return index.frame
+
+
+def build_csr_graph(df):
+    """
+    Build the transaction graph as an array-backed CSRGraph.
+    
+    Same nodes and edge aggregates as build_transaction_graph, without the
+    per-edge Python dicts; use it for graphs with millions of accounts.
+    
+    Args:
+        df (pd.DataFrame): Transaction data with sender_id, receiver_id, amount, timestamp
         
-        # Total transactions
-        total_in = sum(G[u][node]["amount"] for u in G.predecessors(node))
-        total_out = sum(G[node][v]["amount"] for v in G.successors(node))
+    Returns:
+        CSRGraph: Directed graph with amount/count/first/last edge arrays
+            and the TransactionIndex in G.graph["transactions"]
+    """
+    if not is_encoded(df):
+        df = encode_accounts(df, AccountIndex())
+    
+    # Sorting by (sender, receiver, timestamp) already yields CSR edge order,
+    # so the edge aggregates are segment reductions over the sorted columns
+    index = TransactionIndex(sort_transactions(df))
+    starts = index.edge_starts()
+    ends = np.append(starts[1:], len(index))
+    
+    G = CSRGraph(
+        len(df["sender_id"].cat.categories),
+        index.senders[starts],
+        index.receivers[starts],
+        np.add.reduceat(index.amounts, starts) if len(starts) else np.zeros(0),
+        ends - starts,
+        index.timestamps[starts],
+        index.timestamps[ends - 1],
+        account_ids=df["sender_id"].cat.categories,
+        txn_start=starts
+    )
+    G.graph["transactions"] = index
+    
+    return G
+
+
+def aggregate_edges(senders, receivers, amounts, timestamps):
+    """
+    Aggregate transactions into one row per (sender, receiver) edge.
+    
+    Args:
+        senders (np.ndarray): Sender account codes
+        receivers (np.ndarray): Receiver account codes
+        amounts (pd.Series): Transaction amounts
+        timestamps (pd.Series): Transaction timestamps
+        
+    Returns:
+        pd.DataFrame: sender, receiver, amount (sum), count, timestamp_first
+            and timestamp_last per edge, in order of first appearance
+    """
+    frame = pd.DataFrame({
+        "sender": senders,
+        "receiver": receivers,
+        "amount": np.asarray(amounts, dtype=np.float64),
+        "timestamp": np.asarray(timestamps)
+    })
+    
+    return frame.groupby(["sender", "receiver"], sort=False).agg(
+        amount=("amount", "sum"),
+        count=("amount", "size"),
+        timestamp_first=("timestamp", "min"),
+        timestamp_last=("timestamp", "max")
+    ).reset_index()
+
+
+def account_metrics_table(G, windows_hours=DEFAULT_WINDOWS_HOURS):
+    """
+    Calculate per-account metrics for every account at once.
+    
+    Degrees and flow totals are np.bincount reductions over the edge
+    arrays, so the cost is a few vectorized passes regardless of how many
+    accounts there are. Both they and the windowed columns are read from
+    the shared feature cache (graph_features), so detectors asking for the
+    same aggregates later get them for free.
+    
+    Args:
+        G (nx.DiGraph or CSRGraph): Transaction graph
+        windows_hours (iterable): Horizons for the windowed columns
         
-        # Count unique counterparties
-        unique_senders = len(list(G.predecessors(node)))
-        unique_receivers = len(list(G.successors(node)))
+    Returns:
+        pd.DataFrame: One row per account code with in_degree, out_degree,
+            unique_senders, unique_receivers, total_received, total_sent,
+            net_flow and, per window (e.g. 24h), fan_in_24h, fan_out_24h,
+            in_volume_24h and out_volume_24h
+    """
+    features = graph_features(G)
+    nodes = features.nodes
+    
+    in_degree = nodes["in_degree"]
+    out_degree = nodes["out_degree"]
+    total_in = nodes["in_volume"]
+    total_out = nodes["out_volume"]
+    
+    # Edges are aggregated per (sender, receiver), so degree == unique
+    # counterparties in each direction
+    table = pd.DataFrame({
+        "in_degree": in_degree,
+        "out_degree": out_degree,
+        "unique_senders": in_degree,
+        "unique_receivers": out_degree,
+        "total_received": np.round(total_in, 2),
+        "total_sent": np.round(total_out, 2),
+        "net_flow": np.round(total_out - total_in, 2)
+    })
+    
+    if windows_hours and "transactions" in G.graph:
+        for hours, columns in features.window_activity(windows_hours).items():
+            label = window_label(hours)
+            for name, values in columns.items():
+                table[f"{name}_{label}"] = np.round(values, 2) if "volume" in name else values
+    
+    return table
+
+
+class AccountMetrics(Mapping):
+    """
+    Read-only dict view over account_metrics_table.
+    
+    metrics[code] returns the same dict per account that get_account_metrics
+    has always returned; the columnar table is available as .table.
+    """
+    
+    def __init__(self, table):
+        self.table = table
+        self._columns = {col: table[col].to_numpy() for col in table.columns}
+        self._accounts = np.flatnonzero(
+            (self._columns["in_degree"] + self._columns["out_degree"]) > 0
+        )
+    
+    def __getitem__(self, account):
+        if account not in self:
+            raise KeyError(account)
+        return {col: values[account].item() for col, values in self._columns.items()}
+    
+    def __contains__(self, account):
+        try:
+            return bool(
+                0 <= account < len(self.table)
+                and (self._columns["in_degree"][account] or self._columns["out_degree"][account])
+            )
+        except TypeError:
+            return False
+    
+    def __iter__(self):
+        return iter(self._accounts.tolist())
+    
+    def __len__(self):
+        return len(self._accounts)
+
+
+def get_account_metrics(G, df):
+    """
+    Calculate in-degree, out-degree, and other metrics for each account.
+    
+    Args:
+        G (nx.DiGraph or CSRGraph): Transaction graph
+        df (pd.DataFrame): Original transaction data
         
-        metrics[node] = {
-            "in_degree": in_degree,
-            "out_degree": out_degree,
-            "unique_senders": unique_senders,
-            "unique_receivers": unique_receivers,
-            "total_received": round(total_in, 2),
-            "total_sent": round(total_out, 2),
-            "net_flow": round(total_out - total_in, 2)
-        }
-    
-    return metrics
+    Returns:
+        AccountMetrics: Dict-like account metrics keyed by account code,
+            backed by the columnar table from account_metrics_table
+    """
+    return AccountMetrics(account_metrics_table(G))
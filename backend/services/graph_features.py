@@ -0,0 +1,204 @@
+"""
+Shared per-edge and per-account feature cache.
+
+Metrics, detectors and the scorer all need the same aggregates over the
+transaction graph: degrees, flow volumes, per-edge amounts, windowed
+activity and shell dwell times. GraphFeatures
+computes each of them at most once per graph, on first use, and
+graph_features(G) hands out the instance kept in G.graph["features"],
+rebuilding it when the graph has been rebuilt or re-indexed since. Code
+that mutates a graph in place calls invalidate_features(G), as
+build_transaction_graph and attach_transaction_index do.
+
+Both graph engines keep their edges sorted by (source, target) - the CSR
+order, or the TransactionIndex order for networkx graphs - so edges are
+identified by their position in those arrays and edge lookups are one
+np.searchsorted over packed (source, target) keys.
+"""
+
+import numpy as np
+from services.csr_graph import CSRGraph
+from services.window_activity import DEFAULT_WINDOWS_HOURS, transaction_window_activity
+
+
+def graph_features(G):
+    """
+    Feature cache of a transaction graph.
+    
+    Args:
+        G (nx.DiGraph or CSRGraph): Transaction graph with a TransactionIndex
+    
+    Returns:
+        GraphFeatures: The cached instance, rebuilt if G changed since
+    """
+    features = G.graph.get("features")
+    if features is None or features.signature != graph_signature(G):
+        features = GraphFeatures(G)
+        G.graph["features"] = features
+    return features
+
+
+def invalidate_features(G):
+    """Drop the feature cache of G (call after mutating the graph)."""
+    G.graph.pop("features", None)
+
+
+def graph_signature(G):
+    """
+    Fingerprint of the node and edge counts and the transaction index.
+    
+    Adding an edge between existing accounts changes the edge count, so
+    the cache is rebuilt even though the node set stayed the same.
+    """
+    return (G.number_of_nodes(), G.number_of_edges(), id(G.graph.get("transactions")))
+
+
+def edge_arrays(G):
+    """
+    Edge list of a transaction graph as arrays.
+    
+    Read straight from the CSR arrays, or for networkx graphs from the
+    sorted TransactionIndex, so no per-edge Python work is needed.
+    
+    Args:
+        G (nx.DiGraph or CSRGraph): Transaction graph
+    
+    Returns:
+        tuple: (sources, targets, amounts) arrays, one entry per edge
+    """
+    if isinstance(G, CSRGraph):
+        return G.sources, G.indices, G.amount
+    
+    index = G.graph["transactions"]
+    starts = index.edge_starts()
+    amounts = np.add.reduceat(index.amounts, starts) if len(starts) else np.zeros(0)
+    
+    return index.senders[starts], index.receivers[starts], amounts
+
+
+class GraphFeatures:
+    """
+    Lazily computed, memoized features of one transaction graph.
+    
+    Node features are arrays indexed by account code and edge features are
+    arrays indexed by edge position (see edge_ids). Detectors can keep their
+    own derived results here too through memo().
+    """
+    
+    def __init__(self, G):
+        """
+        Args:
+            G (nx.DiGraph or CSRGraph): Transaction graph with a TransactionIndex
+        """
+        self.G = G
+        self.signature = graph_signature(G)
+        self.n_accounts = G.number_of_nodes()
+        self._memo = {}
+        self._windows = {}
+    
+    def memo(self, key, compute):
+        """
+        Cached result for key, calling compute() the first time.
+        
+        Args:
+            key (hashable): Cache key, e.g. ("pass_through", 24)
+            compute (callable): Builds the value from nothing
+        
+        Returns:
+            object: The cached value
+        """
+        if key not in self._memo:
+            self._memo[key] = compute()
+        return self._memo[key]
+    
+    # ------------------------------------------------------------------
+    # Edges
+    # ------------------------------------------------------------------
+    
+    @property
+    def edges(self):
+        """(sources, targets, amounts) edge arrays, sorted by (source, target)."""
+        return self.memo("edges", lambda: edge_arrays(self.G))
+    
+    def edge_ids(self, sources, targets):
+        """
+        Edge positions of (source, target) pairs.
+        
+        Args:
+            sources (array-like): Source account codes
+            targets (array-like): Target account codes, same length
+        
+        Returns:
+            np.ndarray: Position of each edge in the edge arrays, -1 if absent
+        """
+        keys = self.memo("edge_keys", self._edge_keys)
+        wanted = (np.asarray(sources, dtype=np.int64) * self.n_accounts
+                  + np.asarray(targets, dtype=np.int64))
+        positions = np.searchsorted(keys, wanted)
+        found = positions < len(keys)
+        found[found] = keys[positions[found]] == wanted[found]
+        return np.where(found, positions, -1)
+    
+    def _edge_keys(self):
+        sources, targets, _ = self.edges
+        return sources.astype(np.int64) * self.n_accounts + targets
+    
+    def path_amounts(self, path):
+        """Total amount on each existing edge along a path of account codes."""
+        edges = self.edge_ids(path[:-1], path[1:])
+        return self.edges[2][edges[edges >= 0]]
+    
+    # ------------------------------------------------------------------
+    # Accounts
+    # ------------------------------------------------------------------
+    
+    @property
+    def nodes(self):
+        """
+        Per-account degree and flow totals.
+        
+        Returns:
+            dict: in_degree, out_degree, degree, in_volume, out_volume,
+                in_count and out_count (transactions) per account code
+        """
+        return self.memo("nodes", self._nodes)
+    
+    def _nodes(self):
+        n = self.n_accounts
+        sources, targets, amounts = self.edges
+        index = self.G.graph["transactions"]
+        
+        in_degree = np.bincount(targets, minlength=n)
+        out_degree = np.bincount(sources, minlength=n)
+        return {
+            "in_degree": in_degree,
+            "out_degree": out_degree,
+            "degree": in_degree + out_degree,
+            "in_volume": np.bincount(targets, weights=amounts, minlength=n),
+            "out_volume": np.bincount(sources, weights=amounts, minlength=n),
+            "in_count": np.bincount(index.receivers, minlength=n),
+            "out_count": np.bincount(index.senders, minlength=n)
+        }
+    
+    def window_activity(self, windows_hours=DEFAULT_WINDOWS_HOURS):
+        """
+        window_activity for the given horizons, computing only uncached ones.
+        
+        Args:
+            windows_hours (iterable): Window lengths in hours
+        
+        Returns:
+            dict: hours -> {"fan_in", "in_volume", "fan_out", "out_volume"}
+                (see transaction_window_activity)
+        """
+        windows_hours = list(dict.fromkeys(windows_hours))
+        missing = [hours for hours in windows_hours if hours not in self._windows]
+        
+        if missing:
+            index = self.G.graph["transactions"]
+            self._windows.update(transaction_window_activity(
+                index.senders, index.receivers, index.timestamps, index.amounts,
+                self.n_accounts, missing, presorted=True
+            ))
+        
+        return {hours: self._windows[hours] for hours in windows_hours}
@@ -56,7 +56,7 @@ def generate_final_json(G, df, rings, suspicious_accounts, start_time):
     formatted_accounts = []
     for account in suspicious_accounts:
         formatted_accounts.append({
-            "account_id": str(account["account_id"]).strip(),
+            "account_id": account["account_id"],
             "suspicion_score": round(account["suspicion_score"], 2),
             "detected_patterns": account.get("detected_patterns", []),
             "ring_ids": account.get("ring_ids", [])
@@ -64,7 +64,7 @@ def generate_final_json(G, df, rings, suspicious_accounts, start_time):
     
     # Summary
     summary = {
-        "total_accounts_analyzed": len(G.nodes()),
+        "total_accounts_analyzed": G.number_of_nodes(),
         "total_transactions_processed": len(df),
         "suspicious_accounts_flagged": len(formatted_accounts),
         "fraud_rings_detected": len(formatted_rings),
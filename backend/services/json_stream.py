@@ -0,0 +1,134 @@
+"""
+Incremental JSON encoding for large responses.
+
+stream_json writes a JSON object field by field and its large arrays
+element by element, yielding byte chunks of about CHUNK_SIZE, so a response
+never exists as one string: only the current chunk is held in memory on top
+of the objects being encoded. Elements are encoded with orjson when it is
+installed (several times faster than the json module) and with json
+otherwise; both produce the same document. gzip_chunks compresses such a
+stream on the fly, and encoded_size measures a document the same way
+without keeping it.
+"""
+
+import json
+import zlib
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+# Bytes collected before a chunk is yielded
+CHUNK_SIZE = 64 * 1024
+
+
+def encode(value, indent=False):
+    """
+    JSON bytes of one value.
+    
+    Args:
+        value: JSON-serializable value (numpy scalars and other objects are
+            converted with str, as by json.dumps(default=str))
+        indent (bool): Pretty-print with two-space indentation
+    
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            return orjson.dumps(value, option=option, default=str)
+        except TypeError:
+            # e.g. integers beyond 64 bits, which json handles
+            pass
+    if indent:
+        return json.dumps(value, indent=2, ensure_ascii=False, default=str).encode("utf-8")
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8")
+
+
+def stream_json(fields, indent=False):
+    """
+    Encode a JSON object incrementally.
+    
+    Args:
+        fields (iterable): (key, value, stream) tuples in output order; with
+            stream=True the value is any iterable, written as a JSON array
+            one element at a time, otherwise it is encoded whole
+        indent (bool): Pretty-print like json.dumps(indent=2)
+    
+    Yields:
+        bytes: Consecutive pieces of the document
+    """
+    buffer = bytearray()
+    newline = b"\n" if indent else b""
+    pad = b"  " if indent else b""
+    colon = b": " if indent else b":"
+    
+    buffer += b"{"
+    for i, (key, value, stream) in enumerate(fields):
+        buffer += (b"," if i else b"") + newline + pad + encode(key) + colon
+        if not stream:
+            buffer += _nest(encode(value, indent), pad)
+            continue
+        
+        buffer += b"["
+        empty = True
+        for element in value:
+            buffer += (b"" if empty else b",") + newline + pad * 2 + _nest(encode(element, indent), pad * 2)
+            empty = False
+            if len(buffer) >= CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        buffer += b"]" if empty else newline + pad + b"]"
+    buffer += newline + b"}"
+    yield bytes(buffer)
+
+
+def encoded_size(value):
+    """
+    Length in bytes of the compact JSON encoding of a value.
+    
+    Objects are walked key by key and arrays encoded one element at a time,
+    so only the encoding of the current element exists at once, never the
+    whole document.
+    
+    Args:
+        value: JSON-serializable value (as for encode)
+    
+    Returns:
+        int: Bytes of the document
+    """
+    if isinstance(value, dict):
+        # Braces, a colon per key and commas between the entries
+        return 1 + 2 * len(value) + sum(
+            len(encode(key if isinstance(key, str) else str(key))) + encoded_size(item)
+            for key, item in value.items()
+        ) + (0 if value else 1)
+    if isinstance(value, (list, tuple)):
+        return 1 + len(value) + sum(len(encode(item)) for item in value) + (0 if value else 1)
+    return len(encode(value))
+
+
+def gzip_chunks(chunks, level=6):
+    """
+    gzip-compress a byte stream on the fly.
+    
+    Args:
+        chunks (iterable): Byte strings
+        level (int): zlib compression level
+    
+    Yields:
+        bytes: Pieces of the gzip stream (empty pieces are skipped)
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _nest(encoded, pad):
+    """Indent the continuation lines of a pretty-printed value by pad."""
+    return encoded.replace(b"\n", b"\n" + pad) if pad else encoded
@@ -0,0 +1,367 @@
+"""
+Declarative analysis pipeline with per-stage result caching.
+
+The analysis is a DAG of named stages. Each stage declares the stages it
+reads from and the parameters it depends on, and its cache key is a content
+hash of those parameters and of its inputs' keys (so the key of the load
+stage, which hashes the file contents, flows down to every later stage).
+Keys are known before anything runs, which lets Pipeline.run skip whole
+subtrees: a stage is only computed when its own output is not cached, and
+its inputs are only computed when it has to run. Changing a smurfing
+threshold therefore reruns smurfing, ring assembly, scoring and output -
+not loading, graph construction or the other detectors.
+
+Stages in the same group (the detectors) whose outputs are missing run
+together through detector_pool.run_detectors, so they can share an executor.
+
+A stage output is only cached when it is complete: an isolated stage that
+failed (and yielded its fallback), an output its stage's complete() check
+rejects (e.g. a search cut short by a deadline), and everything computed
+from either are recomputed on the next run rather than served from the
+cache - their keys cannot tell them apart from a good run's.
+
+A progress callback passed to Pipeline.run is told whenever a stage or group
+starts; raising PipelineCancelled from it stops the run between stages.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from services.detector_pool import run_detectors
+
+# Bytes read at a time when hashing input files
+HASH_BLOCK_SIZE = 1 << 20
+
+# Marks a stage output as not cached (None is a valid output)
+_MISSING = object()
+# StageCache.get called without a default
+_REQUIRED = object()
+
+
+class PipelineCancelled(Exception):
+    """Raised by a progress callback to stop a pipeline run between stages."""
+
+
+class Stage:
+    """
+    One pipeline step.
+    
+    function(params, *inputs) computes the stage output from the full
+    parameter dict and the outputs of the stages named in inputs, in order.
+    Only the parameters named in params are part of the cache key.
+    """
+    
+    def __init__(self, name, function, inputs=(), params=(), title=None, summary=None,
+                 group=None, preferred_executor="thread", cache=True, isolated=False, fallback=None,
+                 complete=None):
+        """
+        Args:
+            name (str): Stage name, unique in the pipeline
+            function (callable): function(params, *inputs) -> output; must be
+                a module-level function if the stage may run in a process pool
+            inputs (tuple): Names of the stages whose outputs are passed in
+            params (tuple): Names of the parameters the output depends on
+            title (str): Progress line printed when the stage starts
+            summary (callable): summary(output, seconds) -> progress line(s)
+                printed when the stage finishes
+            group (str): Stages of one group run side by side (see Pipeline)
+            preferred_executor (str): "thread" or "process", used for a
+                grouped stage when the run's executor is "auto"
+            cache (bool): Keep the output in the stage cache
+            isolated (bool): A failure logs the error and yields fallback
+                instead of failing the whole run
+            fallback: Output of an isolated stage that failed
+            complete (callable): complete(output) -> False for a partial
+                output, which is then not cached (nor are its consumers)
+        """
+        self.name = name
+        self.function = function
+        self.inputs = tuple(inputs)
+        self.params = tuple(params)
+        self.title = title
+        self.summary = summary
+        self.group = group
+        self.preferred_executor = preferred_executor
+        self.cache = cache
+        self.isolated = isolated
+        self.fallback = fallback
+        self.complete = complete
+
+
+class StageCache:
+    """
+    In-memory LRU store of stage outputs keyed by stage cache key.
+    
+    Outputs are shared between runs, so stages must not mutate their
+    inputs. Safe to share between runs on different threads.
+    """
+    
+    def __init__(self, max_entries=16):
+        """
+        Args:
+            max_entries (int): Outputs kept before the least recently used
+                one is evicted
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def __contains__(self, key):
+        return key in self._entries
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key, default=_REQUIRED):
+        """
+        Output stored under key (marks it recently used).
+        
+        Raises KeyError for a missing key unless a default is given, which is
+        then returned instead - use it rather than a separate `in` check when
+        other threads may evict in between.
+        """
+        with self._lock:
+            if key not in self._entries:
+                if default is _REQUIRED:
+                    raise KeyError(key)
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+    
+    def put(self, key, value):
+        """Store an output, evicting the least recently used ones over the limit."""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class Pipeline:
+    """Stages in topological order (every input is declared before its consumer)."""
+    
+    def __init__(self, stages, group_titles=None):
+        """
+        Args:
+            stages (list): Stage objects, inputs before consumers
+            group_titles (dict): Progress line printed before each group runs
+        """
+        self.stages = OrderedDict()
+        for stage in stages:
+            for name in stage.inputs:
+                if name not in self.stages:
+                    raise Exception(f"Stage '{stage.name}' reads '{name}', which is not declared before it")
+            self.stages[stage.name] = stage
+        self.group_titles = group_titles or {}
+    
+    def keys(self, params):
+        """
+        Cache key of every stage for a parameter set.
+        
+        Args:
+            params (dict): Pipeline parameters
+        
+        Returns:
+            dict: stage name -> hex digest of (name, own params, input keys)
+        """
+        keys = {}
+        for stage in self.stages.values():
+            keys[stage.name] = content_hash([
+                stage.name,
+                {name: params.get(name) for name in stage.params},
+                [keys[name] for name in stage.inputs]
+            ])
+        return keys
+    
+    def run(self, params, targets, cache=None, executor="serial", max_workers=None, progress=None):
+        """
+        Compute the target stages, reusing cached outputs.
+        
+        Args:
+            params (dict): Pipeline parameters
+            targets (iterable): Names of the stages whose outputs are wanted
+            cache (StageCache): Output cache (default: no caching)
+            executor (str): run_detectors executor for grouped stages
+            max_workers (int): Workers per pool for grouped stages
+            progress (callable): progress(name, title) called as each stage
+                (or group, by group name) starts; title is the progress line,
+                None for untitled stages. May raise PipelineCancelled.
+        
+        Returns:
+            tuple: (outputs, report) - outputs maps every computed or cached
+                stage to its output; report maps it to {"cached", "seconds",
+                "error", "complete"}, complete being False when the stage
+                or any stage it depends on failed or gave a partial output
+        """
+        keys = self.keys(params)
+        
+        # Walk back from the targets: a stage served from the cache does not
+        # need its inputs. Cached outputs are taken now so a concurrent run
+        # cannot evict them before they are used.
+        needed = set(targets)
+        hits = {}
+        for stage in reversed(self.stages.values()):
+            if stage.name not in needed:
+                continue
+            output = cache.get(keys[stage.name], _MISSING) if cache is not None and stage.cache else _MISSING
+            if output is not _MISSING:
+                hits[stage.name] = output
+            else:
+                needed.update(stage.inputs)
+        
+        outputs = {}
+        report = {}
+        degraded = set()
+        titled_groups = set()
+        batch = []
+        for stage in self.stages.values():
+            if stage.name not in needed:
+                continue
+            if batch and stage.group != batch[0].group:
+                self._run_batch(batch, params, keys, outputs, report, cache, executor, max_workers, progress, degraded)
+                batch = []
+            
+            if stage.group is not None and stage.group not in titled_groups:
+                titled_groups.add(stage.group)
+                _announce(progress, stage.group, self.group_titles.get(stage.group))
+            
+            if stage.name in hits:
+                outputs[stage.name] = hits[stage.name]
+                report[stage.name] = {"cached": True, "seconds": 0.0, "error": None, "complete": True}
+                _announce(progress, stage.name, f"{stage.title} (cached)" if stage.title else None)
+            elif stage.group is None:
+                self._run_batch([stage], params, keys, outputs, report, cache, executor, max_workers, progress, degraded)
+            else:
+                batch.append(stage)
+        
+        if batch:
+            self._run_batch(batch, params, keys, outputs, report, cache, executor, max_workers, progress, degraded)
+        
+        return outputs, report
+    
+    def _run_batch(self, batch, params, keys, outputs, report, cache, executor, max_workers, progress, degraded):
+        """
+        Compute stages whose inputs are all available, then log them in order.
+        
+        A single stage runs in-process; a group batch goes to the executor.
+        Stages that fail, give a partial output or read a degraded input are
+        added to degraded and not cached.
+        """
+        if batch[0].group is None:
+            _announce(progress, batch[0].name, batch[0].title)
+        
+        tasks = [(stage.name, _StageCall(stage, params, [outputs[name] for name in stage.inputs]),
+                  stage.preferred_executor)
+                 for stage in batch]
+        runs = run_detectors(tasks, executor=executor if len(batch) > 1 else "serial",
+                             max_workers=max_workers)
+        
+        for stage in batch:
+            run = runs[stage.name]
+            if stage.group is not None and stage.title:
+                print(stage.title)
+            
+            if any(name in degraded for name in stage.inputs):
+                degraded.add(stage.name)
+            
+            if run["error"] is not None:
+                if not stage.isolated:
+                    raise run["error"]
+                print(f"       ⚠ {stage.name} stage error: {str(run['error'])[:50]}")
+                outputs[stage.name] = stage.fallback
+                degraded.add(stage.name)
+            else:
+                outputs[stage.name] = run["result"]
+                if stage.complete is not None and not stage.complete(run["result"]):
+                    degraded.add(stage.name)
+                if cache is not None and stage.cache and stage.name not in degraded:
+                    cache.put(keys[stage.name], run["result"])
+                if stage.summary:
+                    print(stage.summary(run["result"], run["seconds"]))
+            
+            report[stage.name] = {
+                "cached": False,
+                "seconds": run["seconds"],
+                "error": None if run["error"] is None else str(run["error"]),
+                "complete": stage.name not in degraded
+            }
+
+
+def _announce(progress, name, title):
+    """Print a stage's progress line and pass it to the progress callback."""
+    if title:
+        print(title)
+    if progress is not None:
+        progress(name, title)
+
+
+class _StageCall:
+    """Picklable zero-argument call of a stage function."""
+    
+    def __init__(self, stage, params, inputs):
+        self.function = stage.function
+        self.params = params
+        self.inputs = inputs
+    
+    def __call__(self):
+        return self.function(self.params, *self.inputs)
+
+
+def content_hash(value):
+    """
+    Stable hex digest of a JSON-like value.
+    
+    Args:
+        value: dicts, lists, strings and numbers (anything else is hashed
+            by repr)
+    
+    Returns:
+        str: SHA-256 hex digest
+    """
+    encoded = json.dumps(value, sort_keys=True, default=repr).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def file_digest(file_path):
+    """
+    SHA-256 of a file's contents, read in blocks.
+    
+    Args:
+        file_path (str): File to hash
+    
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def save_and_hash(stream, file_path):
+    """
+    Copy a binary stream to a file, hashing it on the way.
+    
+    Lets uploads be content-addressed without reading them back.
+    
+    Args:
+        stream: Readable binary file object
+        file_path (str): Destination path
+    
+    Returns:
+        tuple: (SHA-256 hex digest, bytes written)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, "wb") as f:
+        for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+            f.write(block)
+            size += len(block)
+    return digest.hexdigest(), size
@@ -0,0 +1,125 @@
+"""
+On-disk cache of finished analyses.
+
+Results are stored as one JSON file per (file hash, parameter set) key, so
+uploading the same extract again and analyzing it with the same parameters
+returns the stored result without running the pipeline. The directory is
+kept under a total size limit by evicting the least recently used entries
+(file modification time, refreshed on every hit).
+"""
+
+import json
+import os
+import threading
+from services.pipeline import content_hash
+
+# Bump when the result format or detection logic changes, so results of
+# older code are not served
+RESULT_CACHE_VERSION = 2
+
+
+class ResultCache:
+    """Size-bounded LRU directory of JSON analysis results."""
+    
+    def __init__(self, directory, max_bytes, defaults=None):
+        """
+        Args:
+            directory (str): Cache directory (created if missing)
+            max_bytes (int): Total size the entries are trimmed to
+            defaults (dict): Parameter defaults filled in before hashing, so
+                an omitted parameter and its explicit default share a key
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.defaults = dict(defaults or {})
+        os.makedirs(directory, exist_ok=True)
+    
+    def key(self, file_hash, params):
+        """
+        Cache key of an analysis.
+        
+        Args:
+            file_hash (str): SHA-256 of the uploaded file
+            params (dict): Analysis parameters; omitted ones take their
+                value from defaults
+        
+        Returns:
+            str: Hex digest
+        """
+        return content_hash([RESULT_CACHE_VERSION, file_hash, dict(self.defaults, **params)])
+    
+    def get(self, key):
+        """
+        Stored result for key, or None on a miss.
+        
+        Returns:
+            dict: The result as it was stored
+        """
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+    
+    def put(self, key, result):
+        """
+        Store a JSON-serializable result and trim the cache to max_bytes.
+        
+        The entry is written to a temporary file and renamed into place, so
+        readers never see a partial file.
+        """
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, default=str)
+        os.replace(tmp_path, path)
+        
+        self.evict(keep=path)
+    
+    def evict(self, keep=None):
+        """
+        Delete least recently used entries until the total size fits.
+        
+        Args:
+            keep (str): Path never evicted (the entry just written)
+        
+        Returns:
+            int: Number of entries removed
+        """
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        
+        return removed
+    
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
@@ -0,0 +1,170 @@
+"""
+Per-analysis session store.
+
+Every upload opens an analysis, identified by a random ID that the client
+passes to /analyze, /results and /download-json, so concurrent users work on
+separate records instead of overwriting one global slot. A record holds the
+upload metadata and, once analyzed, the JSON-serializable results (never
+the graph or the transaction frame).
+
+The store keeps the most recently used records in memory within a byte
+budget (each record is sized by the length of its JSON encoding, measured
+element by element when stored). Records over
+the budget are spilled to disk, least recently used first, and loaded back
+on their next access. Records not accessed for ttl_seconds expire from both
+memory and disk.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from services.json_stream import encoded_size
+
+
+class ResultStore:
+    """Memory-budgeted, disk-spilling LRU store of analysis records with TTL."""
+    
+    def __init__(self, max_bytes, ttl_seconds, spill_directory, on_expire=None):
+        """
+        Args:
+            max_bytes (int): Memory budget for in-memory records
+            ttl_seconds (float): Idle time after which a record expires
+            spill_directory (str): Where records over the budget are written
+                (created if missing; leftovers of earlier processes are
+                removed, their IDs are gone)
+            on_expire (callable): on_expire(analysis_id, record) called for
+                every expired record, e.g. to delete its upload
+        """
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.spill_directory = spill_directory
+        self.on_expire = on_expire
+        self.memory_bytes = 0
+        
+        self._memory = OrderedDict()  # id -> (record, size), LRU first
+        self._spilled = {}  # id -> spill file path
+        self._last_used = {}  # id -> time.time() of last access
+        self._lock = threading.Lock()
+        
+        os.makedirs(spill_directory, exist_ok=True)
+        for name in os.listdir(spill_directory):
+            if name.endswith(".json"):
+                os.remove(os.path.join(spill_directory, name))
+    
+    def new_id(self):
+        """Fresh analysis ID."""
+        return uuid.uuid4().hex
+    
+    def put(self, analysis_id, record):
+        """
+        Store (or replace) the record of an analysis.
+        
+        Args:
+            analysis_id (str): Analysis ID
+            record (dict): JSON-serializable record
+        """
+        size = encoded_size(record)
+        with self._lock:
+            self._expire()
+            self._discard(analysis_id)
+            self._admit(analysis_id, record, size)
+    
+    def get(self, analysis_id):
+        """
+        Record of an analysis (loaded back from disk if it was spilled).
+        
+        Args:
+            analysis_id (str): Analysis ID
+        
+        Returns:
+            dict: The record, or None for unknown or expired IDs
+        """
+        with self._lock:
+            self._expire()
+            
+            if analysis_id in self._memory:
+                self._memory.move_to_end(analysis_id)
+                self._last_used[analysis_id] = time.time()
+                return self._memory[analysis_id][0]
+            
+            if analysis_id not in self._spilled:
+                return None
+            
+            path = self._spilled.pop(analysis_id)
+            with open(path, "r", encoding="utf-8") as f:
+                encoded = f.read()
+            os.remove(path)
+            record = json.loads(encoded)
+            self._admit(analysis_id, record, len(encoded))
+            return record
+    
+    def stats(self):
+        """
+        Store occupancy.
+        
+        Returns:
+            dict: in_memory and spilled record counts, memory_bytes used and
+                max_bytes
+        """
+        with self._lock:
+            self._expire()
+            return {
+                "in_memory": len(self._memory),
+                "spilled": len(self._spilled),
+                "memory_bytes": self.memory_bytes,
+                "max_bytes": self.max_bytes
+            }
+    
+    def _admit(self, analysis_id, record, size):
+        """Insert into memory as most recently used, then spill to fit the budget."""
+        self._memory[analysis_id] = (record, size)
+        self._last_used[analysis_id] = time.time()
+        self.memory_bytes += size
+        
+        # The record just admitted stays in memory even if it alone exceeds
+        # the budget
+        while self.memory_bytes > self.max_bytes and len(self._memory) > 1:
+            oldest = next(iter(self._memory))
+            self._spill(oldest)
+    
+    def _spill(self, analysis_id):
+        record, size = self._memory.pop(analysis_id)
+        self.memory_bytes -= size
+        
+        path = os.path.join(self.spill_directory, f"{analysis_id}.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(record, f, default=str)
+        self._spilled[analysis_id] = path
+    
+    def _discard(self, analysis_id):
+        """Remove an analysis from memory and disk; returns its record (or None)."""
+        record = None
+        if analysis_id in self._memory:
+            record, size = self._memory.pop(analysis_id)
+            self.memory_bytes -= size
+        if analysis_id in self._spilled:
+            path = self._spilled.pop(analysis_id)
+            if record is None:
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        record = json.load(f)
+                except (OSError, ValueError):
+                    pass
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._last_used.pop(analysis_id, None)
+        return record
+    
+    def _expire(self):
+        """Drop every record idle for longer than ttl_seconds."""
+        cutoff = time.time() - self.ttl_seconds
+        expired = [analysis_id for analysis_id, used in self._last_used.items() if used < cutoff]
+        for analysis_id in expired:
+            record = self._discard(analysis_id)
+            if self.on_expire is not None:
+                self.on_expire(analysis_id, record)
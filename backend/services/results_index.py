@@ -0,0 +1,177 @@
+"""
+Query indexes over a finished analysis.
+
+build_results_index runs once when an analysis finishes and is stored with
+its results. It holds, per pattern type (and "all"), the positions of the
+suspicious accounts and of the rings sorted by score, with the sorted
+scores alongside, plus an account -> rings inverted index. A page query is
+then two binary searches for the score range and a slice, so its cost
+depends on the page size, not on the number of accounts or rings.
+
+Everything is plain lists and dicts, so the index survives the JSON round
+trip through the result store and result cache.
+"""
+
+from bisect import bisect_left, bisect_right
+
+# Key of the unfiltered entries in the by-pattern indexes
+ALL_PATTERNS = "all"
+
+SORT_ORDERS = ("desc", "asc")
+
+
+def build_results_index(all_rings, suspicious_accounts):
+    """
+    Build the query indexes of an analysis.
+    
+    An account matches a pattern type when it is a member of a ring of that
+    type.
+    
+    Args:
+        all_rings (list): Detected rings (account IDs)
+        suspicious_accounts (list): Flagged accounts (account IDs)
+    
+    Returns:
+        dict: accounts and rings ({pattern: {"positions", "scores"}}, scores
+            ascending), account_positions and ring_positions (ID ->
+            position), account_rings (account ID -> ring IDs)
+    """
+    account_rings = {}
+    account_patterns = {}
+    for ring in all_rings:
+        for account_id in ring.get("member_accounts", []):
+            account_rings.setdefault(account_id, []).append(ring["ring_id"])
+            account_patterns.setdefault(account_id, set()).add(ring["pattern_type"])
+    
+    account_groups = {ALL_PATTERNS: []}
+    for position, account in enumerate(suspicious_accounts):
+        account_groups[ALL_PATTERNS].append(position)
+        for pattern in account_patterns.get(account["account_id"], ()):
+            account_groups.setdefault(pattern, []).append(position)
+    
+    ring_groups = {ALL_PATTERNS: []}
+    for position, ring in enumerate(all_rings):
+        ring_groups[ALL_PATTERNS].append(position)
+        ring_groups.setdefault(ring["pattern_type"], []).append(position)
+    
+    return {
+        "accounts": _score_sorted(account_groups, [account["suspicion_score"] for account in suspicious_accounts]),
+        "rings": _score_sorted(ring_groups, [ring.get("risk_score", 0) for ring in all_rings]),
+        "account_positions": {account["account_id"]: position for position, account in enumerate(suspicious_accounts)},
+        "ring_positions": {ring["ring_id"]: position for position, ring in enumerate(all_rings)},
+        "account_rings": account_rings
+    }
+
+
+def score_page(entries, items, pattern=ALL_PATTERNS, min_score=None, max_score=None,
+               order="desc", offset=0, limit=50):
+    """
+    One page of items in score order, filtered by pattern and score range.
+    
+    Args:
+        entries (dict): The "accounts" or "rings" part of the index
+        items (list): suspicious_accounts or all_rings
+        pattern (str): Pattern type, or ALL_PATTERNS
+        min_score (float): Lowest score included (default: no bound)
+        max_score (float): Highest score included (default: no bound)
+        order (str): "desc" (highest score first) or "asc"
+        offset (int): Matching items skipped (the cursor)
+        limit (int): Page size
+    
+    Returns:
+        tuple: (page items, total matching items, offset of the next page or
+            None after the last page)
+    """
+    entry = entries.get(pattern)
+    if entry is None:
+        return [], 0, None
+    
+    scores = entry["scores"]
+    low = 0 if min_score is None else bisect_left(scores, min_score)
+    high = len(scores) if max_score is None else bisect_right(scores, max_score)
+    total = max(0, high - low)
+    
+    start = min(offset, total)
+    end = min(offset + limit, total)
+    if order == "desc":
+        positions = entry["positions"][high - end:high - start][::-1]
+    else:
+        positions = entry["positions"][low + start:low + end]
+    
+    return [items[position] for position in positions], total, end if end < total else None
+
+
+def ring_detail(index, all_rings, suspicious_accounts, ring_id):
+    """
+    A ring with its members expanded.
+    
+    Args:
+        index (dict): build_results_index output
+        all_rings (list): Detected rings
+        suspicious_accounts (list): Flagged accounts
+        ring_id (str): Ring to expand
+    
+    Returns:
+        dict: The ring plus "members": per member account its suspicious
+            account record (suspicion_score None if not flagged) and all
+            ring_ids it belongs to; None for an unknown ring
+    """
+    position = index["ring_positions"].get(ring_id)
+    if position is None:
+        return None
+    
+    ring = all_rings[position]
+    return dict(ring, members=[
+        account_detail(index, suspicious_accounts, account_id, rings=False)
+        for account_id in ring.get("member_accounts", [])
+    ])
+
+
+def account_detail(index, suspicious_accounts, account_id, rings=True, all_rings=None):
+    """
+    An account's suspicious-account record and ring memberships.
+    
+    Args:
+        index (dict): build_results_index output
+        suspicious_accounts (list): Flagged accounts
+        account_id (str): Account to look up
+        rings (bool): Include the full ring records (needs all_rings)
+        all_rings (list): Detected rings
+    
+    Returns:
+        dict: account_id, flagged, suspicion_score (None if not flagged),
+            the account's other fields, ring_ids and, with rings=True, rings;
+            None if the account is neither flagged nor in any ring
+    """
+    position = index["account_positions"].get(account_id)
+    ring_ids = index["account_rings"].get(account_id, [])
+    if position is None and not ring_ids:
+        return None
+    
+    if position is None:
+        detail = {"account_id": account_id, "suspicion_score": None}
+    else:
+        detail = dict(suspicious_accounts[position])
+    detail["flagged"] = position is not None
+    detail["ring_ids"] = ring_ids
+    
+    if rings:
+        detail["rings"] = [all_rings[index["ring_positions"][ring_id]] for ring_id in ring_ids]
+    return detail
+
+
+def _score_sorted(groups, scores):
+    """
+    Sort each group's positions by ascending score.
+    
+    Ties go by descending position, so reading a group backwards (highest
+    score first) keeps the original order of equal scores.
+    """
+    sorted_groups = {}
+    for pattern, positions in groups.items():
+        positions = sorted(positions, key=lambda position: (scores[position], -position))
+        sorted_groups[pattern] = {
+            "positions": positions,
+            "scores": [scores[position] for position in positions]
+        }
+    return sorted_groups
@@ -1,7 +1,11 @@
-import networkx as nx
-from collections import defaultdict
+import numpy as np
+import pandas as pd
+from services.graph_features import graph_features
 
-def detect_shell_networks(G, shell_threshold=3, hop_limit=5):
+# Inflow forwarded within this many hours counts as passed through
+DEFAULT_PASS_THROUGH_HOURS = 24
+
+def detect_shell_networks(G, shell_threshold=3, hop_limit=5, pass_through_hours=DEFAULT_PASS_THROUGH_HOURS):
     """
     Detect layered shell networks: money passing through intermediate "shell" accounts.
     
@@ -14,15 +18,30 @@ def detect_shell_networks(G, shell_threshold=3, hop_limit=5):
     - Create distance between money source and destination
     - Used to obscure audit trails
     
-    DETECTION METHOD:
-    1. Identify low-degree intermediate accounts
-    2. Find direct paths through these intermediaries
-    3. Calculate risk based on structural characteristics
+    DETECTION METHOD (chain compression, linear in the number of edges):
+    1. Identify low-degree pass-through accounts (potential shells) from
+       the degree arrays in one vectorized pass
+    2. Start a walk at every shell that is entered from a non-shell
+       account, and follow runs of consecutive shells (at most
+       hop_limit - 1 of them, no repeats)
+    3. Every non-shell source feeding the first shell and every non-shell
+       destination leaving the current shell closes a chain
+       source → shells → destination; chains with 2+ shells are reported
+    4. Verify pass-through timing: every shell's inbound transactions are
+       merge-joined with its next outbound transaction (pass_through_profile)
+       to get dwell time and the share of inflow forwarded within
+       pass_through_hours
+    5. Calculate risk based on structural characteristics and timing
+    
+    Shells have total degree <= 4, so each walk branches at most 3 ways
+    per step and stops after hop_limit hops: the work per shell is bounded
+    by a constant and the whole pass is O(V + E).
     
     Args:
-        G (networkx.DiGraph): Transaction graph
+        G (networkx.DiGraph or CSRGraph): Transaction graph
         shell_threshold (int): Max transactions for account to be considered "shell"
-        hop_limit (int): Maximum path length to explore
+        hop_limit (int): Maximum chain length in hops (source to destination)
+        pass_through_hours (float): Forwarding window for pass-through verification
         
     Returns:
         list: Detected shell networks with structure:
@@ -34,84 +53,211 @@ def detect_shell_networks(G, shell_threshold=3, hop_limit=5):
                 "source_account": str (originator),
                 "destination_account": str (receiver),
                 "path_length": int,
-                "risk_score": float
+                "risk_score": float,
+                "forwarded_fraction": float (weakest shell's forwarded share of inflow),
+                "dwell_hours": float or None (sum of the shells' median dwell)
             }
     """
     shell_networks = []
     ring_id_counter = 1
-    processed_paths = set()
-    
-    # First, identify potential shell accounts
-    potential_shells = set()
-    for node in G.nodes():
-        in_degree = G.in_degree(node)
-        out_degree = G.out_degree(node)
-        total_degree = in_degree + out_degree
+    
+    features = graph_features(G)
+    potential_shells = find_potential_shells(G)
+    pass_through = features.memo(
+        ("pass_through", pass_through_hours),
+        lambda: pass_through_profile(G, potential_shells, pass_through_hours)
+    )
+    
+    chains = [list(chain) for chain in dict.fromkeys(
+        tuple(chain) for chain in shell_chains(G, potential_shells, hop_limit)
+    )]
+    
+    for chain, amounts in zip(chains, chain_amounts(G, chains)):
+        intermediates = chain[1:-1]
+        risk_score = calculate_shell_network_risk(
+            G, chain, intermediates, potential_shells, pass_through, amounts, features
+        )
+        forwarded = pass_through["forwarded_fraction"][intermediates]
+        dwell = pass_through["dwell_hours"][intermediates]
+        
+        shell_networks.append({
+            "ring_id": f"SHELL_{ring_id_counter:03d}",
+            "pattern_type": "shell",
+            "member_accounts": chain,
+            "shell_accounts": intermediates,
+            "source_account": chain[0],
+            "destination_account": chain[-1],
+            "path_length": len(chain),
+            "intermediary_count": len(intermediates),
+            "risk_score": risk_score,
+            "forwarded_fraction": round(float(forwarded.min()), 3),
+            "dwell_hours": round(float(dwell.sum()), 2) if not np.isnan(dwell).any() else None
+        })
+        ring_id_counter += 1
+    
+    return shell_networks
+
+
+def find_potential_shells(G):
+    """
+    Low-degree pass-through accounts.
+    
+    Shell accounts have minimal connections - usually 1 incoming + 1
+    outgoing (or a similar low pattern): total degree 2-4 with at least one
+    edge each way.
+    
+    Args:
+        G (networkx.DiGraph or CSRGraph): Transaction graph
+        
+    Returns:
+        set: Account codes of potential shells
+    """
+    return graph_features(G).memo("potential_shells", lambda: _potential_shells(G))
+
+
+def _potential_shells(G):
+    """Shell candidates from the cached degree arrays."""
+    nodes = graph_features(G).nodes
+    in_degree, out_degree, total_degree = nodes["in_degree"], nodes["out_degree"], nodes["degree"]
+    
+    shells = (total_degree >= 2) & (total_degree <= 4) & (in_degree > 0) & (out_degree > 0)
+    return set(np.flatnonzero(shells).tolist())
+
+
+def shell_chains(G, potential_shells, hop_limit=5, min_shells=2):
+    """
+    Yield source → shells → destination chains through runs of shells.
+    
+    Args:
+        G (networkx.DiGraph or CSRGraph): Transaction graph
+        potential_shells (set): Shell account codes (find_potential_shells)
+        hop_limit (int): Maximum chain length in hops
+        min_shells (int): Minimum shells in a chain
+        
+    Yields:
+        list: Chain of accounts, source and destination are not shells
+    """
+    max_shells = hop_limit - 1
+    
+    for entry in sorted(potential_shells):
+        sources = [pred for pred in G.predecessors(entry) if pred not in potential_shells]
+        if not sources:
+            continue
+        
+        run = [entry]
+        on_run = {entry}
+        stack = [iter(G.successors(entry))]
         
-        # Shell accounts have minimal connections
-        # Usually: 1 incoming + 1 outgoing (or similar low pattern)
-        if 2 <= total_degree <= 4 and in_degree > 0 and out_degree > 0:
-            # Further filter: very low transaction volume
-            total_volume = 0.0
-            for pred in G.predecessors(node):
-                total_volume += G[pred][node]["amount"]
-            for succ in G.successors(node):
-                total_volume += G[node][succ]["amount"]
+        while stack:
+            succ = next(stack[-1], None)
+            if succ is None:
+                stack.pop()
+                on_run.discard(run.pop())
+                continue
             
-            # Shells typically have modest volumes passing through
-            potential_shells.add(node)
-    
-    # Use efficient BFS-based approach instead of all_simple_paths
-    # to avoid exponential complexity
-    for shell_account in potential_shells:
-        # For each potential shell, find direct paths through it
-        predecessors = list(G.predecessors(shell_account))
-        successors = list(G.successors(shell_account))
+            if succ not in potential_shells:
+                # Run ends here: close it with every source
+                if len(run) >= min_shells:
+                    for source in sources:
+                        if source != succ:
+                            yield [source] + run + [succ]
+            elif succ not in on_run and len(run) < max_shells:
+                run.append(succ)
+                on_run.add(succ)
+                stack.append(iter(G.successors(succ)))
+
+
+def chain_amounts(G, chains):
+    """
+    Edge amounts along every chain, from one batched edge lookup.
+    
+    Args:
+        G (networkx.DiGraph or CSRGraph): Transaction graph
+        chains (list): Account paths
         
-        for source in predecessors:
-            for target in successors:
-                if source == target:
-                    continue
-                
-                # Check if there's a short path from source to target
-                try:
-                    # Use shortest path to limit complexity
-                    path = nx.shortest_path(G, source, target, weight=None)
-                    
-                    if len(path) >= 4 and shell_account in path:
-                        # Verify the path actually goes through this shell
-                        intermediates = path[1:-1]
-                        shell_count = sum(1 for acc in intermediates 
-                                        if acc in potential_shells)
-                        
-                        if shell_count >= 1:
-                            path_key = tuple(path)
-                            if path_key not in processed_paths:
-                                # Calculate risk
-                                risk_score = calculate_shell_network_risk(
-                                    G, path, intermediates, potential_shells
-                                )
-                                
-                                shell_networks.append({
-                                    "ring_id": f"SHELL_{ring_id_counter:03d}",
-                                    "pattern_type": "shell",
-                                    "member_accounts": path,
-                                    "shell_accounts": intermediates,
-                                    "source_account": path[0],
-                                    "destination_account": path[-1],
-                                    "path_length": len(path),
-                                    "intermediary_count": len(intermediates),
-                                    "risk_score": risk_score
-                                })
-                                ring_id_counter += 1
-                                processed_paths.add(path_key)
-                except (nx.NetworkXNoPath, nx.NodeNotFound):
-                    continue
+    Returns:
+        list: One float array of hop amounts per chain
+    """
+    if not chains:
+        return []
     
-    return shell_networks
+    hops = np.array([len(chain) - 1 for chain in chains])
+    sources = np.concatenate([chain[:-1] for chain in chains])
+    targets = np.concatenate([chain[1:] for chain in chains])
+    
+    features = graph_features(G)
+    edges = features.edge_ids(sources, targets)
+    return np.split(features.edges[2][edges], np.cumsum(hops)[:-1])
 
 
-def calculate_shell_network_risk(G, path, intermediates, potential_shells):
+def pass_through_profile(G, shells, window_hours=DEFAULT_PASS_THROUGH_HOURS):
+    """
+    Dwell time and forwarded share of inflow for candidate shells.
+    
+    All candidates are handled at once: their inbound transactions are
+    merge-joined (pd.merge_asof by shell, forward in time) with the shell's
+    next outbound transaction at or after each inflow. The gap is the
+    inflow's dwell time, and it counts as forwarded when the gap is at most
+    window_hours. Forwarded inflow is capped by the shell's total outflow.
+    
+    Args:
+        G (networkx.DiGraph or CSRGraph): Transaction graph with a TransactionIndex
+        shells (set): Candidate shell account codes
+        window_hours (float): Forwarding window
+        
+    Returns:
+        dict: Arrays indexed by account code (NaN / 0 outside shells):
+            - dwell_hours: median dwell of the shell's inflows that were
+              forwarded at all, NaN if none were
+            - forwarded_fraction: share of inflow volume forwarded within
+              window_hours (0-1)
+    """
+    index = G.graph["transactions"]
+    n_accounts = G.number_of_nodes()
+    
+    is_shell = np.zeros(n_accounts, dtype=bool)
+    is_shell[list(shells)] = True
+    inbound = is_shell[index.receivers]
+    outbound = is_shell[index.senders]
+    
+    inflow = pd.DataFrame({
+        "shell": index.receivers[inbound],
+        "timestamp": index.timestamps[inbound],
+        "amount": index.amounts[inbound]
+    }).sort_values("timestamp", kind="stable")
+    outflow = pd.DataFrame({
+        "shell": index.senders[outbound],
+        "timestamp": index.timestamps[outbound]
+    }).sort_values("timestamp", kind="stable")
+    outflow["forwarded_at"] = outflow["timestamp"]
+    
+    joined = pd.merge_asof(inflow, outflow, on="timestamp", by="shell", direction="forward")
+    shell = joined["shell"].to_numpy()
+    amount = joined["amount"].to_numpy()
+    dwell = ((joined["forwarded_at"] - joined["timestamp"]).to_numpy()
+             / np.timedelta64(1, "h"))
+    forwarded = dwell <= window_hours  # NaN (never forwarded) compares False
+    
+    in_volume = np.bincount(shell, weights=amount, minlength=n_accounts)
+    out_volume = np.bincount(index.senders[outbound], weights=index.amounts[outbound],
+                             minlength=n_accounts)
+    forwarded_volume = np.bincount(shell[forwarded], weights=amount[forwarded],
+                                   minlength=n_accounts)
+    
+    forwarded_fraction = np.zeros(n_accounts)
+    has_inflow = in_volume > 0
+    forwarded_fraction[has_inflow] = np.minimum(
+        forwarded_volume[has_inflow], out_volume[has_inflow]) / in_volume[has_inflow]
+    
+    dwell_hours = np.full(n_accounts, np.nan)
+    median_dwell = pd.Series(dwell).groupby(shell).median()
+    dwell_hours[median_dwell.index.to_numpy()] = median_dwell.to_numpy()
+    
+    return {"dwell_hours": dwell_hours, "forwarded_fraction": np.clip(forwarded_fraction, 0.0, 1.0)}
+
+
+def calculate_shell_network_risk(G, path, intermediates, potential_shells, pass_through=None,
+                                 amounts=None, features=None):
     """
     Calculate risk score for a suspected shell network.
     
@@ -119,13 +265,19 @@ def calculate_shell_network_risk(G, path, intermediates, potential_shells):
     - Path length (longer = more obfuscation)
     - Number of shells (more shells = more layers)
     - Shell account characteristics (low transaction counts)
-    - Transaction timing (rapid pass-through = suspicious)
+    - Transaction timing (rapid pass-through = suspicious): share of the
+      weakest shell's inflow forwarded within the pass-through window
     
     Args:
         G (networkx.DiGraph): Transaction graph
         path (list): Account path
         intermediates (list): Intermediate accounts
         potential_shells (set): Potential shell accounts
+        pass_through (dict): Optional pass_through_profile output
+        amounts (array-like): Optional hop amounts (chain_amounts), looked
+            up from the feature cache when omitted
+        features (GraphFeatures): Optional feature cache of G, so per-chain
+            callers skip the graph_features lookup
         
     Returns:
         float: Risk score (0-100)
@@ -140,28 +292,29 @@ def calculate_shell_network_risk(G, path, intermediates, potential_shells):
     shell_risk = min(15.0, shell_count * 5.0)
     
     # Intermediary characteristics risk
-    intermediary_risk = 0.0
-    for acc in intermediates:
-        in_d = G.in_degree(acc)
-        out_d = G.out_degree(acc)
-        
-        # If account has very low degree, it's likely a shell
-        if in_d + out_d <= 4:
-            intermediary_risk += 5.0
-    intermediary_risk = min(15.0, intermediary_risk)
+    # If account has very low degree, it's likely a shell
+    if features is None:
+        features = graph_features(G)
+    degree = features.nodes["degree"][intermediates]
+    intermediary_risk = min(15.0, 5.0 * int((degree <= 4).sum()))
     
     # Transaction volume consistency (shells pass through similar amounts)
-    volume_consistency = check_volume_consistency(G, path)
+    volume_consistency = check_volume_consistency(G, path, amounts)
     volume_risk = 10.0 * volume_consistency
     
+    # Pass-through timing risk (money leaves shortly after it arrives)
+    timing_risk = 0.0
+    if pass_through is not None:
+        timing_risk = 10.0 * float(pass_through["forwarded_fraction"][intermediates].min())
+    
     risk_score = min(95.0, 
-        base_risk + path_length_risk + shell_risk + intermediary_risk + volume_risk
+        base_risk + path_length_risk + shell_risk + intermediary_risk + volume_risk + timing_risk
     )
     
     return round(risk_score, 2)
 
 
-def check_volume_consistency(G, path):
+def check_volume_consistency(G, path, amounts=None):
     """
     Check if money flows through intermediaries with consistent amounts.
     High consistency = suspicious (indicates pre-planned transfer).
@@ -169,6 +322,7 @@ def check_volume_consistency(G, path):
     Args:
         G (networkx.DiGraph): Transaction graph
         path (list): Account path
+        amounts (array-like): Optional amounts of the path's edges
         
     Returns:
         float: Consistency score (0-1)
@@ -176,32 +330,29 @@ def check_volume_consistency(G, path):
     if len(path) < 3:
         return 0.0
     
-    amounts = []
-    for i in range(len(path) - 1):
-        u, v = path[i], path[i + 1]
-        if G.has_edge(u, v):
-            amounts.append(G[u][v]["amount"])
+    if amounts is None:
+        amounts = graph_features(G).path_amounts(path)
+    amounts = np.asarray(amounts, dtype=np.float64).tolist()
     
-    if not amounts:
+    if len(amounts) < 2:
         return 0.0
     
-    # Calculate coefficient of variation
-    import statistics
-    try:
-        mean = statistics.mean(amounts)
-        if mean == 0:
-            return 0.0
-        std_dev = statistics.stdev(amounts)
-        cv = std_dev / mean
-        
-        # Low CV (< 0.2) = suspicious consistency
-        if cv < 0.2:
-            return 1.0
-        elif cv < 0.5:
-            return 0.7
-        elif cv < 1.0:
-            return 0.3
-        else:
-            return 0.0
-    except:
+    # Calculate coefficient of variation (plain float math: this runs once
+    # per chain, and statistics' exact Fraction arithmetic dominated the
+    # whole detector on large graphs)
+    mean = sum(amounts) / len(amounts)
+    if mean == 0:
         return 0.0
+    variance = sum((a - mean) ** 2 for a in amounts) / (len(amounts) - 1)
+    cv = variance ** 0.5 / mean
+    
+    # Low CV (< 0.2) = suspicious consistency
+    if cv < 0.2:
+        return 1.0
+    elif cv < 0.5:
+        return 0.7
+    elif cv < 1.0:
+        return 0.3
+    else:
+        return 0.0
+
@@ -1,6 +1,13 @@
+import numpy as np
 from datetime import timedelta
+from services.graph_features import graph_features
+from services.transaction_index import edge_transactions
+from services.window_activity import DEFAULT_WINDOWS_HOURS, window_label
 
-def detect_smurfing(G, df, fan_threshold=10, time_window_hours=72):
+# temporal_features reported on each smurfing ring
+TIMING_RING_FIELDS = ("time_span_hours", "min_interarrival_seconds", "burstiness", "peak_rate_per_hour")
+
+def detect_smurfing(G, fan_threshold=10, time_window_hours=72, windows_hours=DEFAULT_WINDOWS_HOURS):
     """
     Detect smurfing patterns: aggregation of small amounts or dispersal.
     
@@ -12,13 +19,20 @@ def detect_smurfing(G, df, fan_threshold=10, time_window_hours=72):
         Example: Account X sends $1,000 to 50 different accounts
         Purpose: Break down large amounts to avoid detection
     
-    TEMPORAL ANALYSIS: Transactions within time_window are more suspicious
+    TEMPORAL ANALYSIS: A hub is flagged when at least fan_threshold distinct
+    counterparties trade with it inside one time_window_hours window (see
+    window_activity); transactions within the window are also scored as
+    more suspicious
+    
+    MULTI-WINDOW: every ring also carries the hub's windowed
+    counterparties/volume for each of windows_hours, computed in the same
+    sweep, e.g. counterparties_1h, volume_1h, ..., counterparties_7d
     
     Args:
         G (networkx.DiGraph): Transaction graph
-        df (pd.DataFrame): Original transaction data
         fan_threshold (int): Minimum unique counterparties for fan pattern
         time_window_hours (int): Time window for aggregation analysis
+        windows_hours (iterable): Extra horizons reported on each ring
         
     Returns:
         list: Detected smurfing rings with structure:
@@ -30,43 +44,42 @@ def detect_smurfing(G, df, fan_threshold=10, time_window_hours=72):
                 "hub_account": str (central aggregator/disperser),
                 "risk_score": float,
                 "counterparty_count": int,
+                "window_counterparty_count": int (max distinct in one window),
                 "total_volume": float,
-                "transaction_count": int
+                "transaction_count": int,
+                "time_span_hours", "min_interarrival_seconds", "burstiness",
+                "peak_rate_per_hour": hub timing (see temporal_features),
+                "counterparties_<window>": int, "volume_<window>": float
             }
     """
     smurfing_rings = []
     ring_id_counter = 1
     processed_hubs = set()
     
-    for node in G.nodes():
-        in_degree = G.in_degree(node)
-        out_degree = G.out_degree(node)
+    features = graph_features(G)
+    nodes = features.nodes
+    activity = features.window_activity([time_window_hours, *windows_hours])
+    fan_in_window = activity[time_window_hours]["fan_in"]
+    fan_out_window = activity[time_window_hours]["fan_out"]
+    hubs = np.flatnonzero((fan_in_window >= fan_threshold) | (fan_out_window >= fan_threshold))
+    
+    for node in hubs.tolist():
+        in_degree = int(nodes["in_degree"][node])
+        out_degree = int(nodes["out_degree"][node])
         
         # FAN-IN: Many senders → One receiver (aggregation)
-        if in_degree >= fan_threshold:
+        if fan_in_window[node] >= fan_threshold:
             predecessors = list(G.predecessors(node))
             
             if node not in processed_hubs:
                 # Calculate temporal clustering
-                edge_timestamps = []
-                total_amount_in = 0.0
-                tx_count = 0
-                
-                for sender in predecessors:
-                    edge_data = G[sender][node]
-                    total_amount_in += edge_data["amount"]
-                    tx_count += edge_data["count"]
-                    
-                    for txn in edge_data.get("transactions", []):
-                        try:
-                            edge_timestamps.append(txn["timestamp"])
-                        except:
-                            pass
+                total_amount_in = float(nodes["in_volume"][node])
+                tx_count = int(nodes["in_count"][node])
+                edge_timestamps = [edge_transactions(G, sender, node)[0] for sender in predecessors]
                 
                 # Check if transactions cluster within time window
-                temporal_risk = check_temporal_clustering(
-                    edge_timestamps, time_window_hours
-                )
+                timing = temporal_features(np.concatenate(edge_timestamps), time_window_hours)
+                temporal_risk = timing["temporal_risk"]
                 
                 # Risk score for fan-in (aggregation)
                 # Higher when: many counterparties, large volume, tight timeframe
@@ -88,37 +101,28 @@ def detect_smurfing(G, df, fan_threshold=10, time_window_hours=72):
                     "hub_role": "aggregator",
                     "risk_score": round(risk_score, 2),
                     "counterparty_count": in_degree,
+                    "window_counterparty_count": int(fan_in_window[node]),
                     "total_volume": round(total_amount_in, 2),
-                    "transaction_count": tx_count
+                    "transaction_count": tx_count,
+                    **_timing_columns(timing),
+                    **_window_columns(activity, windows_hours, node, "in")
                 })
                 ring_id_counter += 1
                 processed_hubs.add(node)
         
         # FAN-OUT: One sender → Many receivers (dispersal)
-        if out_degree >= fan_threshold:
+        if fan_out_window[node] >= fan_threshold:
             successors = list(G.successors(node))
             
             if node not in processed_hubs:
                 # Calculate temporal clustering
-                edge_timestamps = []
-                total_amount_out = 0.0
-                tx_count = 0
-                
-                for receiver in successors:
-                    edge_data = G[node][receiver]
-                    total_amount_out += edge_data["amount"]
-                    tx_count += edge_data["count"]
-                    
-                    for txn in edge_data.get("transactions", []):
-                        try:
-                            edge_timestamps.append(txn["timestamp"])
-                        except:
-                            pass
+                total_amount_out = float(nodes["out_volume"][node])
+                tx_count = int(nodes["out_count"][node])
+                edge_timestamps = [edge_transactions(G, node, receiver)[0] for receiver in successors]
                 
                 # Check temporal clustering
-                temporal_risk = check_temporal_clustering(
-                    edge_timestamps, time_window_hours
-                )
+                timing = temporal_features(np.concatenate(edge_timestamps), time_window_hours)
+                temporal_risk = timing["temporal_risk"]
                 
                 # Risk score for fan-out (dispersal)
                 base_risk = 65.0
@@ -139,8 +143,11 @@ def detect_smurfing(G, df, fan_threshold=10, time_window_hours=72):
                     "hub_role": "disperser",
                     "risk_score": round(risk_score, 2),
                     "counterparty_count": out_degree,
+                    "window_counterparty_count": int(fan_out_window[node]),
                     "total_volume": round(total_amount_out, 2),
-                    "transaction_count": tx_count
+                    "transaction_count": tx_count,
+                    **_timing_columns(timing),
+                    **_window_columns(activity, windows_hours, node, "out")
                 })
                 ring_id_counter += 1
                 processed_hubs.add(node)
@@ -148,49 +155,101 @@ def detect_smurfing(G, df, fan_threshold=10, time_window_hours=72):
     return smurfing_rings
 
 
+def _timing_columns(timing):
+    """Hub timing features as flat ring fields."""
+    return {field: round(timing[field], 4) for field in TIMING_RING_FIELDS}
+
+
+def _window_columns(activity, windows_hours, hub, direction):
+    """Per-window counterparties/volume of one hub as flat ring fields."""
+    columns = {}
+    for hours in windows_hours:
+        label = window_label(hours)
+        columns[f"counterparties_{label}"] = int(activity[hours][f"fan_{direction}"][hub])
+        columns[f"volume_{label}"] = round(float(activity[hours][f"{direction}_volume"][hub]), 2)
+    return columns
+
+
 def check_temporal_clustering(timestamps, time_window_hours):
     """
     Check if transactions cluster within a time window.
     Tightly clustered = higher risk (coordinated fraud).
     
     Args:
-        timestamps (list): List of timestamp strings
+        timestamps (np.ndarray): datetime64 transaction times (any order),
+            e.g. edge slices from the graph's TransactionIndex
         time_window_hours (int): Time window threshold
         
     Returns:
         float: Temporal risk score (0-1)
     """
-    if not timestamps or len(timestamps) < 2:
+    timestamps = np.asarray(timestamps, dtype="datetime64[ns]")
+    
+    if len(timestamps) < 2:
         return 0.0
     
-    try:
-        from datetime import datetime
-        
-        # Parse timestamps
-        parsed = []
-        for ts in timestamps:
-            try:
-                parsed.append(datetime.fromisoformat(ts.replace('Z', '+00:00')))
-            except:
-                try:
-                    parsed.append(datetime.fromisoformat(ts))
-                except:
-                    pass
-        
-        if len(parsed) < 2:
-            return 0.0
-        
-        # Sort by time
-        parsed.sort()
-        
-        # Calculate time spans of transactions
-        time_span = parsed[-1] - parsed[0]
-        time_span_hours = time_span.total_seconds() / 3600.0
-        
-        # If all transactions happen within time window, risk is high
-        if time_span_hours <= time_window_hours:
-            return min(1.0, 1.0 - (time_span_hours / time_window_hours))
+    # Calculate time spans of transactions
+    time_span = timestamps.max() - timestamps.min()
+    time_span_hours = time_span / np.timedelta64(1, "h")
+    
+    # If all transactions happen within time window, risk is high
+    if time_span_hours <= time_window_hours:
+        return min(1.0, 1.0 - (time_span_hours / time_window_hours))
+    
+    return 0.0
+
+
+def temporal_features(timestamps, time_window_hours, peak_window_hours=1):
+    """
+    Timing statistics of a set of transactions, all on datetime64 arrays.
+    
+    Args:
+        timestamps (np.ndarray): datetime64 transaction times (any order)
+        time_window_hours (int): Window for the clustering risk
+        peak_window_hours (float): Window for peak_rate_per_hour (default 1)
         
-        return 0.0
-    except:
-        return 0.0
+    Returns:
+        dict:
+            - transaction_count (int)
+            - time_span_hours (float): Last minus first transaction
+            - mean_gap_hours / median_gap_hours (float): Inter-arrival times
+            - min_interarrival_seconds (float): Shortest gap between two
+              transactions
+            - burstiness (float): (sigma - mu) / (sigma + mu) of the gaps;
+              -1 = perfectly regular, 0 = random (Poisson), -> 1 = bursty
+            - peak_rate_per_hour (float): Most transactions inside one
+              peak_window_hours window, per hour
+            - temporal_risk (float): check_temporal_clustering score (0-1)
+    """
+    timestamps = np.sort(np.asarray(timestamps, dtype="datetime64[ns]"))
+    features = {
+        "transaction_count": len(timestamps),
+        "time_span_hours": 0.0,
+        "mean_gap_hours": 0.0,
+        "median_gap_hours": 0.0,
+        "min_interarrival_seconds": 0.0,
+        "burstiness": 0.0,
+        "peak_rate_per_hour": float(len(timestamps)) / peak_window_hours,
+        "temporal_risk": 0.0
+    }
+    
+    if len(timestamps) < 2:
+        return features
+    
+    gaps = np.diff(timestamps) / np.timedelta64(1, "s")
+    mean_gap, std_gap = gaps.mean(), gaps.std()
+    
+    # Transactions in [t, t + peak window] for every t: one searchsorted
+    peak_window = np.timedelta64(int(peak_window_hours * 3600 * 1e9), "ns")
+    in_window = np.searchsorted(timestamps, timestamps + peak_window, side="right") - np.arange(len(timestamps))
+    
+    features.update({
+        "time_span_hours": float((timestamps[-1] - timestamps[0]) / np.timedelta64(1, "h")),
+        "mean_gap_hours": float(mean_gap / 3600),
+        "median_gap_hours": float(np.median(gaps) / 3600),
+        "min_interarrival_seconds": float(gaps.min()),
+        "burstiness": float((std_gap - mean_gap) / (std_gap + mean_gap)) if std_gap + mean_gap > 0 else 0.0,
+        "peak_rate_per_hour": float(in_window.max()) / peak_window_hours,
+        "temporal_risk": check_temporal_clustering(timestamps, time_window_hours)
+    })
+    return features
@@ -0,0 +1,130 @@
+"""
+Structuring detection: amounts kept just under reporting thresholds.
+
+Every account's transaction amounts are bucketed into bands just below each
+threshold (e.g. $9,000-$10,000 in four $250 bands under the $10k CTR
+threshold) with one np.digitize + np.bincount pass over the whole
+transaction index, and accounts whose activity is concentrated in those
+bands are flagged.
+"""
+
+import numpy as np
+
+# Reporting thresholds to look under (US CTR)
+DEFAULT_THRESHOLDS = (10000,)
+
+
+def detect_structuring(G, thresholds=DEFAULT_THRESHOLDS, band_fraction=0.1, n_bands=4,
+                       min_transactions=3, min_concentration=0.5):
+    """
+    Detect structuring: repeated transactions just under a reporting threshold.
+    
+    PATTERN: An account splits funds into many transfers sized just below a
+    threshold so none of them is reported
+    EXAMPLE: 6 transfers of $9,400-$9,900 instead of one of $57,000
+    
+    For each threshold T the band [T * (1 - band_fraction), T) is split into
+    n_bands equal bands. Accounts are checked as senders and as receivers;
+    one is flagged when at least min_transactions of its transactions fall
+    in the bands and they make up at least min_concentration of all its
+    transactions in that direction.
+    
+    Args:
+        G (nx.DiGraph or CSRGraph): Transaction graph with a TransactionIndex
+        thresholds (iterable): Reporting thresholds
+        band_fraction (float): Width of the watched range below each threshold
+        n_bands (int): Number of bands the range is split into
+        min_transactions (int): Minimum near-threshold transactions
+        min_concentration (float): Minimum share of near-threshold transactions
+    
+    Returns:
+        list: Detected structuring rings with structure:
+            {
+                "ring_id": "STRUCT_001",
+                "pattern_type": "structuring",
+                "structuring_type": "sender" or "receiver",
+                "member_accounts": [account, counterparties of near-threshold transactions],
+                "hub_account": account,
+                "risk_score": float,
+                "threshold": float,
+                "near_threshold_count": int,
+                "transaction_count": int,
+                "concentration": float,
+                "band_edges": [float], "band_histogram": [int]
+            }
+    """
+    index = G.graph["transactions"]
+    n_accounts = G.number_of_nodes()
+    amounts = index.amounts
+    
+    rings = []
+    for threshold in thresholds:
+        edges = np.linspace(threshold * (1 - band_fraction), threshold, n_bands + 1)
+        band = np.digitize(amounts, edges) - 1
+        near = (band >= 0) & (band < n_bands)
+        
+        for role, accounts, counterparties in (("sender", index.senders, index.receivers),
+                                               ("receiver", index.receivers, index.senders)):
+            histograms = np.bincount(
+                accounts[near].astype(np.int64) * n_bands + band[near],
+                minlength=n_accounts * n_bands
+            ).reshape(n_accounts, n_bands)
+            near_count = histograms.sum(axis=1)
+            total = np.bincount(accounts, minlength=n_accounts)
+            concentration = near_count / np.maximum(total, 1)
+            
+            flagged = np.flatnonzero((near_count >= min_transactions)
+                                     & (concentration >= min_concentration))
+            if len(flagged) == 0:
+                continue
+            
+            partners = _near_counterparties(accounts, counterparties, near, flagged)
+            for account in flagged.tolist():
+                rings.append(_structuring_ring(
+                    role, account, partners[account], threshold, edges,
+                    histograms[account], int(total[account]), float(concentration[account])
+                ))
+    
+    for number, ring in enumerate(rings, start=1):
+        ring["ring_id"] = f"STRUCT_{number:03d}"
+    
+    return rings
+
+
+def _near_counterparties(accounts, counterparties, near, flagged):
+    """Distinct counterparties of each flagged account's near-threshold transactions."""
+    selected = near & np.isin(accounts, flagged)
+    pairs = np.unique(np.column_stack([accounts[selected], counterparties[selected]]), axis=0)
+    
+    partners = {account: [] for account in flagged.tolist()}
+    for account, counterparty in pairs.tolist():
+        partners[account].append(counterparty)
+    return partners
+
+
+def _structuring_ring(role, account, partners, threshold, edges, histogram, total, concentration):
+    """
+    Build one structuring ring.
+    
+    Risk grows with the share of near-threshold activity and with how many
+    such transactions there are.
+    """
+    near_count = int(histogram.sum())
+    base_risk = 60.0
+    volume_factor = min(1.0, near_count / 50.0)
+    risk_score = min(95.0, base_risk + (concentration * 20) + (volume_factor * 10))
+    
+    return {
+        "ring_id": None,
+        "pattern_type": "structuring",
+        "structuring_type": role,
+        "member_accounts": [account] + partners,
+        "hub_account": account,
+        "risk_score": round(risk_score, 2),
+        "threshold": float(threshold),
+        "near_threshold_count": near_count,
+        "transaction_count": total,
+        "concentration": round(concentration, 4),
+        "band_edges": [round(edge, 2) for edge in edges.tolist()],
+        "band_histogram": histogram.tolist()
+    }
@@ -0,0 +1,106 @@
+"""
+Columnar per-edge transaction index.
+
+The transaction frame is sorted once by (sender, receiver, timestamp), which
+makes every edge's transactions a contiguous, time-ordered run. Edges keep
+only the offset of their run ("txn_start") next to their transaction
+"count", and detectors read datetime64/float64 slices of the shared columns
+instead of per-edge lists of dicts.
+"""
+
+import numpy as np
+from services.account_index import account_codes
+
+
+class TransactionIndex:
+    """
+    Transactions sorted by (sender, receiver, timestamp) as NumPy columns.
+    
+    The arrays are views of the sorted frame's columns where pandas allows
+    it, so the index adds little beyond the sorted frame itself.
+    """
+    
+    def __init__(self, frame):
+        """
+        Args:
+            frame (pd.DataFrame): Encoded transactions already sorted by
+                (sender, receiver, timestamp), see sort_transactions
+        """
+        self.frame = frame
+        self.senders = account_codes(frame, "sender_id")
+        self.receivers = account_codes(frame, "receiver_id")
+        self.timestamps = _datetime64(frame["timestamp"])
+        self.amounts = frame["amount"].to_numpy(dtype=np.float64)
+    
+    def __len__(self):
+        return len(self.amounts)
+    
+    def edge_starts(self):
+        """
+        Offsets of each (sender, receiver) run.
+        
+        Returns:
+            np.ndarray: Start position of every edge's run, in sorted order
+        """
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.int64)
+        
+        boundary = np.empty(len(self), dtype=bool)
+        boundary[0] = True
+        boundary[1:] = ((self.senders[1:] != self.senders[:-1])
+                        | (self.receivers[1:] != self.receivers[:-1]))
+        return np.flatnonzero(boundary)
+
+
+def sort_transactions(df):
+    """
+    Sort encoded transactions by (sender, receiver, timestamp).
+    
+    Args:
+        df (pd.DataFrame): Transactions with categorical account columns
+    
+    Returns:
+        pd.DataFrame: Sorted frame with a fresh RangeIndex
+    """
+    order = np.lexsort((
+        _datetime64(df["timestamp"]),
+        account_codes(df, "receiver_id"),
+        account_codes(df, "sender_id")
+    ))
+    
+    if np.array_equal(order, np.arange(len(df))):
+        return df.reset_index(drop=True)
+    
+    return df.take(order).reset_index(drop=True)
+
+
+def edge_transactions(G, u, v):
+    """
+    Timestamps and amounts of the transactions on edge u -> v.
+    
+    Args:
+        G: Transaction graph with a TransactionIndex in G.graph["transactions"]
+        u: Sender account code
+        v: Receiver account code
+    
+    Returns:
+        tuple: (datetime64 array, float64 array), time-ordered views
+    """
+    index = G.graph["transactions"]
+    
+    if hasattr(G, "edge_index"):
+        edge = G.edge_index(u, v)
+        start, count = G.txn_start[edge], G.count[edge]
+    else:
+        data = G[u][v]
+        start, count = data["txn_start"], data["count"]
+    
+    run = slice(start, start + count)
+    return index.timestamps[run], index.amounts[run]
+
+
+def _datetime64(timestamps):
+    """Timestamp column as a datetime64 array (timezone-aware -> UTC)."""
+    if getattr(timestamps.dt, "tz", None) is not None:
+        timestamps = timestamps.dt.tz_convert(None)
+    return timestamps.to_numpy()
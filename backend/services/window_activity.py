@@ -0,0 +1,180 @@
+"""
+Windowed per-account activity.
+
+For a list of time windows, computes for every account the most distinct
+counterparties and the largest transaction volume seen inside any single
+window, in each direction. Transactions are sorted once per direction and
+the sorted arrays are reused for every window, so adding a horizon costs a
+few vectorized passes rather than another walk over the graph.
+"""
+
+import numpy as np
+
+# Default analysis horizons: 1 hour, 1 day, 3 days, 1 week
+DEFAULT_WINDOWS_HOURS = (1, 24, 72, 168)
+
+
+def window_label(hours):
+    """Column suffix for a window: 1 -> '1h', 72 -> '72h', 168 -> '7d'."""
+    if hours >= 168 and hours % 24 == 0:
+        return f"{int(hours // 24)}d"
+    return f"{hours:g}h"
+
+
+def transaction_window_activity(senders, receivers, timestamps, amounts, n_accounts,
+                                windows_hours=DEFAULT_WINDOWS_HOURS, presorted=False):
+    """
+    Max windowed fan-in/fan-out and volume for every account.
+    
+    Sorting happens once per direction; each window then only needs
+    masks, cumsums and binary searches over the shared sorted arrays.
+    
+    Args:
+        senders (np.ndarray): Sender account code per transaction
+        receivers (np.ndarray): Receiver account code per transaction
+        timestamps (np.ndarray): datetime64 transaction times
+        amounts (np.ndarray): Transaction amounts
+        n_accounts (int): Number of accounts (length of the results)
+        windows_hours (iterable): Window lengths in hours
+        presorted (bool): Arrays are already sorted by (sender, receiver,
+            time), as in a TransactionIndex
+    
+    Returns:
+        dict: hours -> {"fan_in", "in_volume", "fan_out", "out_volume"}, each
+            an array indexed by account code: the most distinct senders /
+            receivers, and the largest amount received / sent, inside one
+            window of that length
+    """
+    times = np.asarray(timestamps).astype("datetime64[ns]").view(np.int64)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    time_values, time_rank = _rank_times(times)
+    
+    windows_hours = list(windows_hours)
+    activity = {hours: {} for hours in windows_hours}
+    
+    if presorted:
+        out_pairs = np.arange(len(times))
+    else:
+        out_pairs = np.lexsort((times, receivers, senders))
+    # Stable sort by receiver keeps the (sender, time) order inside each receiver
+    in_pairs = out_pairs[np.argsort(receivers[out_pairs], kind="stable")]
+    
+    for direction, hubs, counterparties, pairs in (("in", receivers, senders, in_pairs),
+                                                   ("out", senders, receivers, out_pairs)):
+        timeline = _Timeline(hubs, counterparties, times, amounts, time_rank, len(time_values), pairs)
+        for hours in windows_hours:
+            window = int(hours * 3600 * 1e9)
+            activity[hours][f"fan_{direction}"] = timeline.max_distinct(time_values, window, n_accounts)
+            activity[hours][f"{direction}_volume"] = timeline.max_volume(time_values, window, n_accounts)
+    
+    return activity
+
+
+def _rank_times(times):
+    """Distinct sorted timestamps and each transaction's index among them."""
+    order = np.argsort(times, kind="stable")
+    sorted_times = times[order]
+    distinct = np.r_[True, sorted_times[1:] != sorted_times[:-1]] if len(times) else np.zeros(0, dtype=bool)
+    rank = np.empty(len(times), dtype=np.int64)
+    rank[order] = np.cumsum(distinct) - 1
+    return sorted_times[distinct], rank
+
+
+class _Timeline:
+    """
+    One direction's transactions sorted by (hub, time), with packed keys.
+    
+    Times are replaced by their rank among all distinct timestamps, so
+    (hub, time) packs into one int64 key and "same hub, time in range"
+    lookups become a single np.searchsorted over the whole array. Shifting a
+    time by a window is done on the distinct values (a sorted, cache
+    friendly search) and gathered back by rank.
+    """
+    
+    def __init__(self, hubs, counterparties, times, amounts, time_rank, n_times, pairs):
+        """
+        Args:
+            hubs, counterparties, times, amounts, time_rank (np.ndarray):
+                Per-transaction arrays in any order
+            n_times (int): Number of distinct timestamps
+            pairs (np.ndarray): Order sorting transactions by (hub,
+                counterparty, time)
+        """
+        self.stride = n_times + 1
+        keys = hubs.astype(np.int64) * self.stride + time_rank
+        order = np.argsort(keys, kind="stable")
+        
+        self.hubs = hubs[order]
+        self.keys = keys[order]
+        self.rank = time_rank[order]
+        self.cumulative = np.concatenate([[0.0], np.cumsum(amounts[order])])
+        self.hub_starts = np.flatnonzero(np.r_[True, self.hubs[1:] != self.hubs[:-1]])
+        self.hub_run = np.repeat(np.arange(len(self.hub_starts)),
+                                 np.diff(np.r_[self.hub_starts, len(order)]))
+        
+        # Time since the previous / until the next transaction of the same
+        # (hub, counterparty) pair, computed in pair order then moved to
+        # timeline order (int64 max when there is none)
+        same = np.zeros(len(pairs), dtype=bool)
+        same[1:] = ((hubs[pairs][1:] == hubs[pairs][:-1])
+                    & (counterparties[pairs][1:] == counterparties[pairs][:-1]))
+        pair_times = times[pairs]
+        gaps = np.full(len(pairs), np.iinfo(np.int64).max)
+        gaps[1:][same[1:]] = np.diff(pair_times)[same[1:]]
+        gap_prev = np.empty_like(gaps)
+        gap_prev[pairs] = gaps
+        gap_next = np.empty_like(gaps)
+        gap_next[pairs] = np.r_[gaps[1:], np.iinfo(np.int64).max]
+        self.gap_prev = gap_prev[order]
+        self.gap_next = gap_next[order]
+    
+    def max_distinct(self, time_values, window, n_accounts):
+        """
+        Most distinct counterparties of each hub inside one window.
+        
+        Each pair's transactions form merged intervals [first, last + window]
+        of window end times they count towards: an interval opens at a
+        transaction more than window after the pair's previous one and
+        closes window after one more than window before the pair's next.
+        At each transaction time T the distinct count is the opens at or
+        before T minus the closes before T, both found within the hub.
+        """
+        result = np.zeros(n_accounts, dtype=np.int64)
+        if len(self.rank) == 0:
+            return result
+        
+        opens = self.gap_prev > window
+        closes = self.gap_next > window
+        
+        open_count = np.concatenate([[0], np.cumsum(opens)])
+        opened = open_count[1:] - open_count[self.hub_starts][self.hub_run]
+        
+        close_rank = np.searchsorted(time_values, time_values + window, side="right")
+        close_keys = self.hubs[closes].astype(np.int64) * self.stride + close_rank[self.rank[closes]]
+        hub_base = self.hubs[self.hub_starts].astype(np.int64) * self.stride
+        closed = (np.searchsorted(close_keys, self.keys, side="right")
+                  - np.searchsorted(close_keys, hub_base, side="left")[self.hub_run])
+        
+        return self._max_per_hub(result, opened - closed)
+    
+    def max_volume(self, time_values, window, n_accounts):
+        """
+        Largest amount total of each hub inside one window.
+        
+        The best window ends at some transaction i; its first transaction
+        is one searchsorted away and the total is a cumsum difference.
+        """
+        result = np.zeros(n_accounts, dtype=np.float64)
+        if len(self.rank) == 0:
+            return result
+        
+        start_rank = np.searchsorted(time_values, time_values - window, side="left")
+        start_keys = self.hubs.astype(np.int64) * self.stride + start_rank[self.rank]
+        first = np.searchsorted(self.keys, start_keys, side="left")
+        totals = self.cumulative[1:] - self.cumulative[first]
+        return self._max_per_hub(result, totals)
+    
+    def _max_per_hub(self, result, values):
+        """Scatter the maximum of values over each hub's run into result."""
+        result[self.hubs[self.hub_starts]] = np.maximum.reduceat(values, self.hub_starts)
+        return result
@@ -10,6 +10,9 @@ import time
 
 BASE_URL = 'http://localhost:5000'
 
+# analysis_id returned by the upload, passed to the later requests
+session = {'analysis_id': None}
+
 def test_upload():
     """Test CSV upload endpoint"""
     print("\n[TEST 1] Testing /upload endpoint...")
@@ -21,6 +24,7 @@ def test_upload():
         if response.status_code == 200:
             print("✓ Upload successful")
             print(f"  Response: {response.json()}")
+            session['analysis_id'] = response.json()['analysis_id']
             return True
         else:
             print(f"✗ Upload failed: {response.status_code}")
@@ -34,7 +38,7 @@ def test_analyze():
     """Test analysis endpoint"""
     print("\n[TEST 2] Testing /analyze endpoint...")
     try:
-        response = requests.post(f'{BASE_URL}/analyze')
+        response = requests.post(f'{BASE_URL}/analyze', json={'analysis_id': session['analysis_id'], 'wait': True})
         
         if response.status_code == 200:
             data = response.json()
@@ -55,7 +59,7 @@ def test_results():
     """Test results retrieval endpoint"""
     print("\n[TEST 3] Testing /results endpoint...")
     try:
-        response = requests.get(f'{BASE_URL}/results')
+        response = requests.get(f'{BASE_URL}/results', params={'analysis_id': session['analysis_id']})
         
         if response.status_code == 200:
             data = response.json()
@@ -85,7 +89,7 @@ def test_download_json():
     """Test JSON download endpoint"""
     print("\n[TEST 4] Testing /download-json endpoint...")
     try:
-        response = requests.get(f'{BASE_URL}/download-json')
+        response = requests.get(f'{BASE_URL}/download-json', params={'analysis_id': session['analysis_id']})
         
         if response.status_code == 200:
             data = response.json()
@@ -0,0 +1,73 @@
+"""Tests for services.analysis_jobs."""
+
+import threading
+
+from services.analysis_jobs import JobManager
+
+
+def blocking_analysis(started, release, titles=()):
+    """Analysis that reports titles, then waits for release at a stage boundary."""
+    def function(progress):
+        for title in titles:
+            progress("stage", title)
+        started.set()
+        release.wait(10)
+        progress("end", None)
+        return {"ok": True}
+    return function
+
+
+def test_admission_refuses_work_beyond_workers_and_queue():
+    jobs = JobManager(max_workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+    
+    running = jobs.submit("A1", blocking_analysis(started, release))
+    queued = jobs.submit("A2", lambda progress: {"ok": True})
+    assert started.wait(10)
+    
+    assert jobs.submit("A3", lambda progress: {"ok": True}) is None
+    assert jobs.active() == 2
+    
+    release.set()
+    assert running.wait(10) and queued.wait(10)
+    assert (running.state, queued.state) == ("done", "done")
+    assert jobs.active() == 0
+    assert jobs.submit("A4", lambda progress: {"ok": True}).wait(10)
+
+
+def test_cancel_queued_and_running_jobs():
+    jobs = JobManager(max_workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+    
+    running = jobs.submit("A1", blocking_analysis(started, release, ["[1/6] Loading"]))
+    queued = jobs.submit("A2", lambda progress: {"ok": True})
+    assert started.wait(10)
+    
+    assert jobs.cancel(queued.job_id) is queued
+    assert queued.state == "cancelled"
+    
+    jobs.cancel(running.job_id)
+    assert running.state == "running", "a running job stops at its next stage"
+    release.set()
+    assert running.wait(10)
+    assert running.state == "cancelled"
+    assert running.error == "Cancelled during: [1/6] Loading"
+    assert running.result is None
+    assert jobs.cancel("unknown") is None
+
+
+def test_progress_reports_completed_steps():
+    jobs = JobManager(max_workers=1)
+    started, release = threading.Event(), threading.Event()
+    
+    job = jobs.submit("A1", blocking_analysis(started, release, ["[1/6] Loading", "[4/6] Detecting"]))
+    assert started.wait(10)
+    
+    snapshot = job.snapshot()
+    assert (snapshot["status"], snapshot["stage"]) == ("running", "[4/6] Detecting")
+    assert (snapshot["step"], snapshot["total_steps"], snapshot["percent"]) == (4, 6, 50)
+    
+    release.set()
+    assert job.wait(10)
+    snapshot = jobs.get(job.job_id).snapshot()
+    assert (snapshot["status"], snapshot["percent"], snapshot["result"]) == ("done", 100, {"ok": True})
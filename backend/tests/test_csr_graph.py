@@ -0,0 +1,82 @@
+"""Tests for services.csr_graph: CSRGraph must behave like the networkx graph."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.account_index import AccountIndex, encode_accounts
+from services.cycle_detector import detect_cycles
+from services.graph_builder import account_metrics_table, build_csr_graph, build_transaction_graph
+from services.shell_detector import detect_shell_networks
+from services.smurfing_detector import detect_smurfing
+from services.structuring_detector import detect_structuring
+
+
+def mixed_transactions(n_accounts=60, n_transactions=1500, seed=5):
+    """Random transfers plus a fan-in hub, a shell chain and a structuring account."""
+    rng = np.random.default_rng(seed)
+    senders = rng.integers(0, n_accounts, n_transactions)
+    receivers = (senders + rng.integers(1, n_accounts, n_transactions)) % n_accounts
+    amounts = rng.uniform(10, 1000, n_transactions).round(2)
+    rows = [(f"ACC{s:03d}", f"ACC{r:03d}", a) for s, r, a in zip(senders, receivers, amounts)]
+    rows += [(f"MULE{i:02d}", "HUB", 900.0) for i in range(15)]
+    rows += [("SRC", "SH1", 5000.0), ("SH1", "SH2", 4900.0), ("SH2", "DST", 4800.0)]
+    rows += [("SPLIT", f"ACC{i:03d}", 9400.0 + 100 * i) for i in range(5)]
+    
+    times = pd.Timestamp("2026-01-01") + pd.to_timedelta(
+        np.sort(rng.integers(0, 7 * 24 * 3600, len(rows))), unit="s")
+    return encode_accounts(pd.DataFrame({
+        "transaction_id": [f"T{i}" for i in range(len(rows))],
+        "sender_id": [sender for sender, _, _ in rows],
+        "receiver_id": [receiver for _, receiver, _ in rows],
+        "amount": [amount for _, _, amount in rows],
+        "timestamp": times
+    }), AccountIndex())
+
+
+@pytest.fixture(scope="module")
+def graphs():
+    df = mixed_transactions()
+    return build_transaction_graph(df), build_csr_graph(df)
+
+
+def canonical(rings, unordered=()):
+    """
+    Rings without their ring_id, in a fixed order.
+    
+    Fields in unordered are compared as sets: they list graph neighbours,
+    whose order is insertion order in networkx and code order in CSR.
+    """
+    return sorted(repr(sorted((key, sorted(value) if key in unordered else value)
+                              for key, value in ring.items() if key != "ring_id"))
+                  for ring in rings)
+
+
+def test_same_adjacency_and_edge_data(graphs):
+    G, csr = graphs
+    
+    assert csr.number_of_nodes() == G.number_of_nodes()
+    assert csr.number_of_edges() == G.number_of_edges()
+    for node in G.nodes():
+        assert sorted(csr.successors(node)) == sorted(G.successors(node))
+        assert sorted(csr.predecessors(node)) == sorted(G.predecessors(node))
+        assert csr.degree(node) == G.degree(node)
+    for u, v, data in G.edges(data=True):
+        assert v in csr[u]
+        assert csr[u][v] == dict(data, amount=pytest.approx(data["amount"]))
+    assert not csr.has_edge(0, 0)
+
+
+def test_same_metrics_and_detector_output(graphs):
+    G, csr = graphs
+    
+    pd.testing.assert_frame_equal(account_metrics_table(csr), account_metrics_table(G))
+    assert canonical(detect_cycles(csr)) == canonical(detect_cycles(G))
+    assert canonical(detect_cycles(csr, temporal=True)) == canonical(detect_cycles(G, temporal=True))
+    assert (canonical(detect_smurfing(csr), unordered=("member_accounts",))
+            == canonical(detect_smurfing(G), unordered=("member_accounts",)))
+    assert canonical(detect_shell_networks(csr)) == canonical(detect_shell_networks(G))
+    assert canonical(detect_structuring(csr)) == canonical(detect_structuring(G))
+    
+    # Non-trivial: every pattern is present in the data
+    assert detect_cycles(G) and detect_smurfing(G) and detect_shell_networks(G) and detect_structuring(G)
@@ -0,0 +1,47 @@
+"""Tests for services.csv_processor."""
+
+import pandas as pd
+
+from services.csv_processor import load_transactions
+
+
+def write_csv(path, rows=500):
+    lines = ["transaction_id,sender_id,receiver_id,amount,timestamp"]
+    for i in range(rows):
+        sender = f"ACC{i % 37:03d}"
+        receiver = sender if i % 50 == 0 else f"ACC{(i * 7 + 3) % 41:03d}"
+        amount = "" if i % 97 == 0 else f"{100 + i}.5"
+        lines.append(f"T{i},{sender},{receiver},{amount},2024-01-01 {i % 24:02d}:00:00")
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_chunked_load_matches_whole_file(tmp_path):
+    path = tmp_path / "transactions.csv"
+    write_csv(path)
+    
+    whole = load_transactions(str(path))
+    chunked = load_transactions(str(path), chunksize=64)
+    
+    assert isinstance(chunked["sender_id"].dtype, pd.CategoricalDtype)
+    assert list(chunked["sender_id"].cat.categories) == list(whole["sender_id"].cat.categories)
+    pd.testing.assert_frame_equal(chunked, whole)
+
+
+def test_numeric_ids_read_as_text_in_every_chunk(tmp_path):
+    # Mapped column names; a missing sender in the first chunk would make
+    # that chunk's IDs float ("1.0") while the others stay int ("1")
+    lines = ["txn_id,from,to,amount,date"]
+    for i in range(200):
+        sender = "" if i == 5 else str(i % 13 + 1)
+        lines.append(f"{i},{sender},{(i * 5) % 17 + 20},{10 + i},2024-01-01 00:{i % 60:02d}:00")
+    path = tmp_path / "numeric.csv"
+    path.write_text("\n".join(lines) + "\n")
+    
+    whole = load_transactions(str(path))
+    chunked = load_transactions(str(path), chunksize=50)
+    
+    pd.testing.assert_frame_equal(chunked, whole)
+    accounts = set(chunked["sender_id"].cat.categories)
+    assert "1" in accounts and "20" in accounts
+    assert not any("." in account for account in accounts)
+    assert len(chunked) == 199
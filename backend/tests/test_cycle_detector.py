@@ -0,0 +1,77 @@
+"""Tests for services.cycle_detector."""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmark_common import transactions_frame
+from services.account_index import AccountIndex, encode_accounts
+from services.cycle_detector import detect_cycles
+from services.graph_builder import build_transaction_graph
+
+
+def dense_graph(n_accounts=300, n_transactions=30000, seed=7):
+    """Random transactions packed into one day: far too many temporal cycles to enumerate."""
+    rng = np.random.default_rng(seed)
+    senders = rng.integers(0, n_accounts, n_transactions)
+    receivers = (senders + rng.integers(1, n_accounts, n_transactions)) % n_accounts
+    df = transactions_frame(senders, receivers, n_accounts, rng, span_hours=24, max_amount=1000)
+    return build_transaction_graph(encode_accounts(df, AccountIndex()))
+
+
+def test_temporal_search_honours_deadline():
+    G = dense_graph()
+    stats = {}
+    
+    start = time.time()
+    cycles = detect_cycles(G, min_length=3, max_length=5, work_budget=None, stats=stats,
+                           temporal=True, time_window_hours=72, deadline_seconds=1)
+    elapsed = time.time() - start
+    
+    assert stats["timed_out"] is True
+    assert stats["coverage"] < 1.0
+    assert cycles, "partial results found before the deadline are kept"
+    assert elapsed < 10
+
+
+def graph_from_edges(edges):
+    df = pd.DataFrame({
+        "transaction_id": [f"TXN_{i}" for i in range(len(edges))],
+        "sender_id": [sender for sender, _ in edges],
+        "receiver_id": [receiver for _, receiver in edges],
+        "amount": 100.0,
+        "timestamp": pd.Timestamp("2026-01-01") + pd.to_timedelta(range(len(edges)), unit="h")
+    })
+    return build_transaction_graph(encode_accounts(df, AccountIndex()))
+
+
+def test_search_finished_within_deadline_is_not_timed_out():
+    G = graph_from_edges([("A", "B"), ("B", "C"), ("C", "A"), ("C", "D")])
+    stats = {}
+    
+    cycles = detect_cycles(G, stats=stats, deadline_seconds=60)
+    
+    assert len(cycles) == 1
+    assert stats["timed_out"] is False
+    assert stats["coverage"] == 1.0
+
+
+def test_work_budget_stop_is_not_a_timeout():
+    stats = {}
+    detect_cycles(dense_graph(), work_budget=1000, stats=stats, temporal=True, deadline_seconds=60)
+    
+    assert stats["coverage"] < 1.0
+    assert stats["timed_out"] is False
+
+
+def test_deadline_searches_largest_component_first():
+    triangle = [("T1", "T2"), ("T2", "T3"), ("T3", "T1")]
+    big = [(f"B{i}", f"B{j}") for i in range(6) for j in range(6) if i != j]
+    G = graph_from_edges(triangle + big)
+    
+    cycles = detect_cycles(G, deadline_seconds=60)
+    
+    labels = np.asarray(G.graph["account_ids"], dtype=object)
+    assert labels[cycles[0]["member_accounts"][0]].startswith("B")
+    assert labels[cycles[-1]["member_accounts"][0]].startswith("T")
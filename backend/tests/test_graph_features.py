@@ -0,0 +1,24 @@
+"""Tests for services.graph_features."""
+
+import pandas as pd
+
+from services.account_index import AccountIndex, encode_accounts
+from services.graph_builder import build_transaction_graph
+from services.graph_features import graph_features
+
+
+def test_new_edge_between_existing_accounts_rebuilds_features():
+    df = pd.DataFrame({
+        "transaction_id": ["T1", "T2", "T3"],
+        "sender_id": ["A", "B", "C"],
+        "receiver_id": ["B", "C", "A"],
+        "amount": [100.0, 90.0, 80.0],
+        "timestamp": pd.to_datetime(["2026-01-01 00:00", "2026-01-01 01:00", "2026-01-01 02:00"])
+    })
+    G = build_transaction_graph(encode_accounts(df, AccountIndex()))
+    features = graph_features(G)
+    assert graph_features(G) is features
+    
+    G.add_edge(0, 2, amount=50.0)
+    
+    assert graph_features(G) is not features
@@ -0,0 +1,64 @@
+"""Tests for services.json_stream."""
+
+import gzip
+import json
+
+import pytest
+
+from services import json_stream
+from services.json_stream import encoded_size, gzip_chunks, stream_json
+
+DOCUMENT = {
+    "summary": {"total_accounts": 3, "rings": [], "ratio": 0.125, "note": None},
+    "suspicious_accounts": [
+        {"account_id": f"ACC_{i:04d}", "suspicion_score": 50 + i / 4,
+         "detected_patterns": ["cycle_length_3", "fan_in"][:i % 3], "flagged": i % 2 == 0}
+        for i in range(400)
+    ],
+    "fraud_rings": [],
+    "labels": ["Überweisung", "転送", "tab\tquote\""],
+    "empty": {}
+}
+
+
+@pytest.fixture(params=["orjson", "json"])
+def encoder(request, monkeypatch):
+    """Run each test with orjson (when installed) and with the json fallback."""
+    if request.param == "json":
+        monkeypatch.setattr(json_stream, "orjson", None)
+    elif json_stream.orjson is None:
+        pytest.skip("orjson not installed")
+    # Small chunks, so arrays are split across many of them
+    monkeypatch.setattr(json_stream, "CHUNK_SIZE", 256)
+    return request.param
+
+
+def fields(document):
+    return [(key, value, isinstance(value, list)) for key, value in document.items()]
+
+
+def test_stream_matches_json_dumps(encoder):
+    chunks = list(stream_json(fields(DOCUMENT)))
+    
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode("utf-8") == json.dumps(
+        DOCUMENT, separators=(",", ":"), ensure_ascii=False)
+
+
+def test_indented_stream_matches_json_dumps(encoder):
+    streamed = b"".join(stream_json(fields(DOCUMENT), indent=True))
+    
+    assert streamed.decode("utf-8") == json.dumps(DOCUMENT, indent=2, ensure_ascii=False)
+
+
+def test_gzip_stream_decompresses_to_the_document(encoder):
+    compressed = b"".join(gzip_chunks(stream_json(fields(DOCUMENT))))
+    
+    assert gzip.decompress(compressed) == b"".join(stream_json(fields(DOCUMENT)))
+    assert json.loads(gzip.decompress(compressed)) == DOCUMENT
+
+
+def test_encoded_size_matches_compact_encoding(encoder):
+    for value in (DOCUMENT, DOCUMENT["summary"], [], {}, "x", 1.5):
+        assert encoded_size(value) == len(
+            json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8"))
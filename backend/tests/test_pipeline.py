@@ -0,0 +1,66 @@
+"""Tests for services.pipeline."""
+
+from services.pipeline import Pipeline, Stage, StageCache
+
+
+def _source(params):
+    return params["value"]
+
+
+def _flaky(params, value):
+    if params.get("fail"):
+        raise RuntimeError("detector failed")
+    return value * 2
+
+
+def _partial(params, value):
+    return {"value": value, "timed_out": params.get("timed_out", False)}
+
+
+def _consumer(params, doubled, partial):
+    return (doubled, partial["value"])
+
+
+def make_pipeline(calls):
+    def consumer(params, doubled, partial):
+        calls.append("consumer")
+        return _consumer(params, doubled, partial)
+    
+    return Pipeline([
+        Stage("source", _source, params=("value",)),
+        Stage("doubled", _flaky, inputs=("source",), isolated=True, fallback=0),
+        Stage("partial", _partial, inputs=("source",),
+              complete=lambda output: not output["timed_out"]),
+        Stage("consumer", consumer, inputs=("doubled", "partial"))
+    ])
+
+
+def test_consumers_of_a_fallback_are_not_cached():
+    calls = []
+    pipeline = make_pipeline(calls)
+    cache = StageCache()
+    
+    outputs, report = pipeline.run({"value": 3, "fail": True}, ["consumer"], cache=cache)
+    assert outputs["consumer"] == (0, 3)
+    assert not report["doubled"]["complete"] and not report["consumer"]["complete"]
+    
+    outputs, report = pipeline.run({"value": 3}, ["consumer"], cache=cache)
+    assert outputs["consumer"] == (6, 3)
+    assert not report["consumer"]["cached"] and report["consumer"]["complete"]
+    assert calls == ["consumer", "consumer"]
+    
+    # A complete output is served from the cache
+    outputs, report = pipeline.run({"value": 3}, ["consumer"], cache=cache)
+    assert report["consumer"]["cached"] and calls == ["consumer", "consumer"]
+
+
+def test_partial_outputs_are_not_cached():
+    calls = []
+    pipeline = make_pipeline(calls)
+    cache = StageCache()
+    
+    for _ in range(2):
+        outputs, report = pipeline.run({"value": 3, "timed_out": True}, ["consumer"], cache=cache)
+        assert not report["partial"]["cached"] and not report["consumer"]["cached"]
+        assert not report["consumer"]["complete"]
+    assert calls == ["consumer", "consumer"]
@@ -0,0 +1,23 @@
+"""Tests for services.result_cache."""
+
+from services.result_cache import ResultCache
+
+
+def test_omitted_parameters_share_key_with_their_defaults(tmp_path):
+    cache = ResultCache(str(tmp_path), 1024 * 1024, {"fan_threshold": 10, "temporal_cycles": False})
+    
+    key = cache.key("abc", {})
+    
+    assert cache.key("abc", {"fan_threshold": 10}) == key
+    assert cache.key("abc", {"fan_threshold": 10, "temporal_cycles": False}) == key
+    assert cache.key("abc", {"fan_threshold": 11}) != key
+    assert cache.key("def", {}) != key
+
+
+def test_put_get_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path), 1024 * 1024, {"fan_threshold": 10})
+    
+    cache.put(cache.key("abc", {}), {"summary": {"rings": 3}})
+    
+    assert cache.get(cache.key("abc", {"fan_threshold": 10})) == {"summary": {"rings": 3}}
+    assert cache.get(cache.key("abc", {"fan_threshold": 12})) is None
@@ -0,0 +1,117 @@
+"""Tests for services.results_index."""
+
+import json
+
+import pytest
+
+from services.results_index import (
+    ALL_PATTERNS, account_detail, build_results_index, ring_detail, score_page
+)
+
+PATTERNS = ("cycle", "smurfing", "shell")
+
+
+def analysis(n_accounts=60, n_rings=25):
+    """Rings over overlapping accounts, with plenty of tied scores."""
+    rings = [{
+        "ring_id": f"RING_{r:03d}",
+        "pattern_type": PATTERNS[r % 3],
+        "member_accounts": [f"ACC_{(r * 7 + k) % n_accounts:03d}" for k in range(3 + r % 3)],
+        "risk_score": float(60 + (r * 11) % 7 * 5)
+    } for r in range(n_rings)]
+    in_rings = {account for ring in rings for account in ring["member_accounts"]}
+    accounts = [{"account_id": f"ACC_{i:03d}", "suspicion_score": float(40 + (i * 13) % 9 * 5)}
+                for i in range(n_accounts) if f"ACC_{i:03d}" in in_rings and i % 4]
+    return rings, accounts
+
+
+def expected_page_order(items, score_key, keep, order):
+    """Brute force: filter, sort by score (ties keep their order when descending)."""
+    matching = [(position, item) for position, item in enumerate(items) if keep(item)]
+    ordered = sorted(matching, key=lambda pair: (pair[1][score_key], -pair[0]))
+    if order == "desc":
+        ordered.reverse()
+    return [item for _, item in ordered]
+
+
+def all_pages(entries, items, limit, **filters):
+    """Follow the cursor from offset 0 to the last page."""
+    pages, offset = [], 0
+    while offset is not None:
+        page, total, offset = score_page(entries, items, offset=offset, limit=limit, **filters)
+        assert len(page) <= limit
+        pages.append(page)
+    return pages, total
+
+
+@pytest.mark.parametrize("order", ["desc", "asc"])
+@pytest.mark.parametrize("min_score, max_score", [(None, None), (65, 80), (70, None), (None, 62), (90, 80)])
+def test_ring_pages_match_brute_force(order, min_score, max_score):
+    rings, accounts = analysis()
+    # The index is stored as JSON, so query the round-tripped copy
+    index = json.loads(json.dumps(build_results_index(rings, accounts)))
+    
+    for pattern in (ALL_PATTERNS, *PATTERNS):
+        def keep(ring):
+            return ((pattern == ALL_PATTERNS or ring["pattern_type"] == pattern)
+                    and (min_score is None or ring["risk_score"] >= min_score)
+                    and (max_score is None or ring["risk_score"] <= max_score))
+        expected = expected_page_order(rings, "risk_score", keep, order)
+        
+        pages, total = all_pages(index["rings"], rings, limit=4, pattern=pattern,
+                                 min_score=min_score, max_score=max_score, order=order)
+        
+        assert total == len(expected)
+        assert [ring for page in pages for ring in page] == expected
+        assert all(len(page) == 4 for page in pages[:-1])
+
+
+def test_account_pages_filter_by_ring_pattern():
+    rings, accounts = analysis()
+    index = build_results_index(rings, accounts)
+    
+    for pattern in PATTERNS:
+        members = {account for ring in rings if ring["pattern_type"] == pattern
+                   for account in ring["member_accounts"]}
+        expected = expected_page_order(
+            accounts, "suspicion_score",
+            lambda account: account["account_id"] in members and account["suspicion_score"] >= 50,
+            "desc")
+        
+        pages, total = all_pages(index["accounts"], accounts, limit=7, pattern=pattern, min_score=50)
+        
+        assert total == len(expected)
+        assert [account for page in pages for account in page] == expected
+
+
+def test_page_past_the_end_and_unknown_pattern():
+    rings, accounts = analysis()
+    index = build_results_index(rings, accounts)
+    
+    assert score_page(index["rings"], rings, offset=1000) == ([], len(rings), None)
+    assert score_page(index["rings"], rings, pattern="structuring") == ([], 0, None)
+    page, total, next_offset = score_page(index["rings"], rings, limit=10)
+    assert (len(page), total, next_offset) == (10, 25, 10)
+
+
+def test_ring_and_account_detail():
+    rings, accounts = analysis()
+    index = build_results_index(rings, accounts)
+    flagged = {account["account_id"]: account for account in accounts}
+    
+    ring = ring_detail(index, rings, accounts, "RING_004")
+    assert ring["member_accounts"] == rings[4]["member_accounts"]
+    for member in ring["members"]:
+        account_id = member["account_id"]
+        assert member["flagged"] == (account_id in flagged)
+        assert member["suspicion_score"] == flagged.get(account_id, {}).get("suspicion_score")
+        assert "RING_004" in member["ring_ids"] and "rings" not in member
+    
+    member = ring["member_accounts"][0]
+    detail = account_detail(index, accounts, member, all_rings=rings)
+    expected_rings = [r for r in rings if member in r["member_accounts"]]
+    assert detail["ring_ids"] == [r["ring_id"] for r in expected_rings]
+    assert detail["rings"] == expected_rings
+    
+    assert ring_detail(index, rings, accounts, "RING_999") is None
+    assert account_detail(index, accounts, "NOBODY", all_rings=rings) is None
@@ -0,0 +1,20 @@
+"""Tests for services.ring_consolidator."""
+
+import numpy as np
+
+from services.ring_consolidator import consolidate_cycles_to_rings
+
+
+def test_members_sort_by_account_id_not_code():
+    # Codes follow first appearance, so code order differs from ID order
+    labels = np.array(["ZED", "ALPHA", "MIKE", "BRAVO"], dtype=object)
+    cycles = [
+        {"member_accounts": [0, 1, 2], "risk_score": 90},
+        {"member_accounts": [2, 3], "risk_score": 70}
+    ]
+    
+    rings = consolidate_cycles_to_rings(cycles, labels)
+    
+    assert len(rings) == 1
+    assert labels[rings[0]["member_accounts"]].tolist() == ["ALPHA", "BRAVO", "MIKE", "ZED"]
+    assert rings[0]["risk_score"] == 90.0
@@ -0,0 +1,95 @@
+"""Tests for services.shell_detector."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from services.account_index import AccountIndex, encode_accounts, account_labels
+from services.graph_builder import build_transaction_graph
+from services.shell_detector import pass_through_profile, shell_chains
+
+START = pd.Timestamp("2026-01-01")
+
+
+def graph_from_transfers(transfers):
+    """Graph of (sender, receiver, amount, hours after START) transfers."""
+    df = pd.DataFrame({
+        "transaction_id": [f"T{i}" for i in range(len(transfers))],
+        "sender_id": [sender for sender, _, _, _ in transfers],
+        "receiver_id": [receiver for _, receiver, _, _ in transfers],
+        "amount": [amount for _, _, amount, _ in transfers],
+        "timestamp": [START + pd.Timedelta(hours=hours) for _, _, _, hours in transfers]
+    })
+    G = build_transaction_graph(encode_accounts(df, AccountIndex()))
+    codes = {account: code for code, account in enumerate(account_labels(G))}
+    return G, codes
+
+
+CHAIN_TRANSFERS = [
+    # Two shells, the second one fanning out to two destinations
+    ("A", "S1", 100.0, 0), ("S1", "S2", 100.0, 1), ("S2", "B", 50.0, 2), ("S2", "C", 50.0, 2),
+    # One shell only: below min_shells
+    ("X", "T1", 100.0, 0), ("T1", "Y", 100.0, 1),
+    # Four shells in a row: five hops
+    ("P", "U1", 100.0, 0), ("U1", "U2", 100.0, 1), ("U2", "U3", 100.0, 2),
+    ("U3", "U4", 100.0, 3), ("U4", "Q", 100.0, 4),
+    # Shells feeding each other: the loop is not walked twice
+    ("R", "V1", 100.0, 0), ("V1", "V2", 100.0, 1), ("V2", "V1", 100.0, 2), ("V2", "Z", 100.0, 3)
+]
+SHELLS = ["S1", "S2", "T1", "U1", "U2", "U3", "U4", "V1", "V2"]
+
+
+def chains_by_label(G, codes, hop_limit):
+    labels = account_labels(G)
+    shells = {codes[shell] for shell in SHELLS}
+    return sorted(labels[chain].tolist() for chain in shell_chains(G, shells, hop_limit))
+
+
+def test_shell_chains_follow_runs_of_shells():
+    G, codes = graph_from_transfers(CHAIN_TRANSFERS)
+    
+    assert chains_by_label(G, codes, hop_limit=5) == [
+        ["A", "S1", "S2", "B"],
+        ["A", "S1", "S2", "C"],
+        ["P", "U1", "U2", "U3", "U4", "Q"],
+        ["R", "V1", "V2", "Z"]
+    ]
+
+
+def test_shell_chains_respect_hop_limit():
+    G, codes = graph_from_transfers(CHAIN_TRANSFERS)
+    
+    chains = chains_by_label(G, codes, hop_limit=4)
+    
+    assert ["P", "U1", "U2", "U3", "U4", "Q"] not in chains
+    assert ["A", "S1", "S2", "B"] in chains
+    assert chains_by_label(G, codes, hop_limit=2) == []
+
+
+def test_pass_through_profile_joins_inflow_with_next_outflow():
+    G, codes = graph_from_transfers([
+        # FAST forwards its first inflow after 1h, its second only after 28h
+        ("IN", "FAST", 100.0, 0), ("FAST", "OUT", 120.0, 1),
+        ("IN", "FAST", 50.0, 2), ("FAST", "OUT", 30.0, 30),
+        # CAPPED forwards on time but only a quarter of what came in
+        ("IN", "CAPPED", 200.0, 5), ("CAPPED", "OUT", 50.0, 6),
+        # SAME forwards in the same instant: dwell 0
+        ("IN", "SAME", 80.0, 10), ("SAME", "OUT", 80.0, 10),
+        # LATE only sent before money arrived: nothing forwarded
+        ("LATE", "OUT", 40.0, 0), ("IN", "LATE", 40.0, 1)
+    ])
+    shells = {codes[shell] for shell in ("FAST", "CAPPED", "SAME", "LATE")}
+    
+    profile = pass_through_profile(G, shells, window_hours=24)
+    dwell = {name: profile["dwell_hours"][codes[name]] for name in codes}
+    forwarded = {name: profile["forwarded_fraction"][codes[name]] for name in codes}
+    
+    assert dwell["FAST"] == pytest.approx(14.5)  # median of 1h and 28h
+    assert forwarded["FAST"] == pytest.approx(100 / 150)
+    assert (dwell["CAPPED"], forwarded["CAPPED"]) == (pytest.approx(1.0), pytest.approx(0.25))
+    assert (dwell["SAME"], forwarded["SAME"]) == (0.0, 1.0)
+    assert np.isnan(dwell["LATE"]) and forwarded["LATE"] == 0.0
+    assert np.isnan(dwell["IN"]) and forwarded["IN"] == 0.0
+    
+    # A window covering the 28h wait counts both inflows as forwarded
+    assert pass_through_profile(G, shells, window_hours=48)["forwarded_fraction"][codes["FAST"]] == 1.0
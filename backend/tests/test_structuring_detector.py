@@ -0,0 +1,59 @@
+"""Tests for services.structuring_detector."""
+
+import pandas as pd
+
+from services.account_index import AccountIndex, encode_accounts, account_labels
+from services.graph_builder import build_transaction_graph
+from services.structuring_detector import detect_structuring
+
+
+def graph_from_transfers(transfers):
+    df = pd.DataFrame({
+        "transaction_id": [f"T{i}" for i in range(len(transfers))],
+        "sender_id": [sender for sender, _, _ in transfers],
+        "receiver_id": [receiver for _, receiver, _ in transfers],
+        "amount": [amount for _, _, amount in transfers],
+        "timestamp": pd.Timestamp("2026-01-01") + pd.to_timedelta(range(len(transfers)), unit="h")
+    })
+    return build_transaction_graph(encode_accounts(df, AccountIndex()))
+
+
+def flagged_senders(G, **kwargs):
+    labels = account_labels(G)
+    return {labels[ring["hub_account"]]: ring for ring in detect_structuring(G, **kwargs)
+            if ring["structuring_type"] == "sender"}
+
+
+def test_band_includes_lower_edge_and_excludes_threshold():
+    # [9000, 10000) in four bands: 9000 is in the first, 10000 is reported
+    G = graph_from_transfers([
+        ("LOW", "R1", 9000.0), ("LOW", "R2", 9249.99), ("LOW", "R3", 9999.99),
+        ("AT", "R1", 10000.0), ("AT", "R2", 10000.0), ("AT", "R3", 10000.0),
+        ("BELOW", "R1", 8999.99), ("BELOW", "R2", 8999.99), ("BELOW", "R3", 8999.99)
+    ])
+    
+    rings = flagged_senders(G)
+    
+    assert set(rings) == {"LOW"}
+    assert rings["LOW"]["band_edges"] == [9000.0, 9250.0, 9500.0, 9750.0, 10000.0]
+    assert rings["LOW"]["band_histogram"] == [2, 0, 0, 1]
+    assert rings["LOW"]["near_threshold_count"] == 3
+
+
+def test_count_and_concentration_thresholds():
+    G = graph_from_transfers([
+        # Two near-threshold transfers: below min_transactions
+        ("TWO", "R1", 9500.0), ("TWO", "R2", 9600.0),
+        # Three near-threshold out of seven: concentration 0.43
+        ("DILUTED", "R1", 9500.0), ("DILUTED", "R2", 9600.0), ("DILUTED", "R3", 9700.0),
+        ("DILUTED", "R1", 50.0), ("DILUTED", "R2", 60.0), ("DILUTED", "R3", 70.0),
+        ("DILUTED", "R4", 80.0),
+        # Three out of four
+        ("THREE", "R1", 9500.0), ("THREE", "R2", 9600.0), ("THREE", "R3", 9700.0),
+        ("THREE", "R4", 100.0)
+    ])
+    
+    assert set(flagged_senders(G)) == {"THREE"}
+    assert flagged_senders(G)["THREE"]["concentration"] == 0.75
+    assert set(flagged_senders(G, min_transactions=2)) == {"TWO", "THREE"}
+    assert set(flagged_senders(G, min_concentration=0.4)) == {"DILUTED", "THREE"}
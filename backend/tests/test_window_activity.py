@@ -0,0 +1,71 @@
+"""Tests for services.window_activity."""
+
+import numpy as np
+import pandas as pd
+
+from services.account_index import AccountIndex, encode_accounts
+from services.graph_builder import build_transaction_graph
+from services.graph_features import graph_features
+from services.window_activity import transaction_window_activity
+
+
+def random_transactions(n_accounts=12, n_transactions=400, seed=3):
+    """Few accounts over a few days, with repeated timestamps and pairs."""
+    rng = np.random.default_rng(seed)
+    senders = rng.integers(0, n_accounts, n_transactions)
+    receivers = (senders + rng.integers(1, n_accounts, n_transactions)) % n_accounts
+    times = (np.datetime64("2026-01-01T00:00", "ns")
+             + rng.integers(0, 5 * 24 * 4, n_transactions) * np.timedelta64(15, "m"))
+    amounts = rng.uniform(1, 500, n_transactions).round(2)
+    return senders, receivers, times, amounts
+
+
+def brute_force(hubs, counterparties, times, amounts, n_accounts, hours):
+    """Every window [t - hours, t] ending at one of the hub's transactions."""
+    window = np.timedelta64(int(hours * 3600), "s")
+    fan = np.zeros(n_accounts, dtype=np.int64)
+    volume = np.zeros(n_accounts)
+    for hub in range(n_accounts):
+        mine = hubs == hub
+        for end in times[mine]:
+            inside = mine & (times >= end - window) & (times <= end)
+            fan[hub] = max(fan[hub], len(set(counterparties[inside].tolist())))
+            volume[hub] = max(volume[hub], amounts[inside].sum())
+    return fan, volume
+
+
+def test_matches_brute_force():
+    senders, receivers, times, amounts = random_transactions()
+    windows = (0.25, 1, 24, 72)
+    
+    activity = transaction_window_activity(senders, receivers, times, amounts, 12, windows)
+    
+    for hours in windows:
+        fan_in, in_volume = brute_force(receivers, senders, times, amounts, 12, hours)
+        fan_out, out_volume = brute_force(senders, receivers, times, amounts, 12, hours)
+        np.testing.assert_array_equal(activity[hours]["fan_in"], fan_in)
+        np.testing.assert_array_equal(activity[hours]["fan_out"], fan_out)
+        np.testing.assert_allclose(activity[hours]["in_volume"], in_volume)
+        np.testing.assert_allclose(activity[hours]["out_volume"], out_volume)
+
+
+def test_graph_features_matches_unsorted_arrays():
+    senders, receivers, times, amounts = random_transactions(seed=11)
+    account_ids = np.array([f"ACC{i:02d}" for i in range(12)], dtype=object)
+    df = pd.DataFrame({
+        "transaction_id": [f"T{i}" for i in range(len(senders))],
+        "sender_id": account_ids[senders],
+        "receiver_id": account_ids[receivers],
+        "amount": amounts,
+        "timestamp": times
+    })
+    G = build_transaction_graph(encode_accounts(df, AccountIndex()))
+    codes = {account: code for code, account in enumerate(G.graph["account_ids"])}
+    order = [codes[account] for account in account_ids]
+    
+    expected = transaction_window_activity(senders, receivers, times, amounts, 12, (1, 24))
+    activity = graph_features(G).window_activity((1, 24))
+    
+    for hours in (1, 24):
+        for column, values in activity[hours].items():
+            np.testing.assert_allclose(values[order], expected[hours][column])
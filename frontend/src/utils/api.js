@@ -11,6 +11,10 @@ const api = axios.create({
   }
 })
 
+// ID of the analysis opened by the last upload; sent with every later call
+// so concurrent users do not see each other's results
+let currentAnalysisId = null
+
 // API Functions for Backend Integration
 
 /**
@@ -29,6 +33,7 @@ export async function uploadCSV(file) {
       }
     })
     
+    currentAnalysisId = response.data.analysis_id
     return { success: true, data: response.data }
   } catch (error) {
     console.error('Upload error:', error)
@@ -36,14 +41,37 @@ export async function uploadCSV(file) {
   }
 }
 
+// Delay between analysis job status polls
+const JOB_POLL_INTERVAL_MS = 1000
+
 /**
  * Run analysis on uploaded CSV
+ * The backend answers cached analyses at once (200) and otherwise starts a
+ * background job (202), which is polled until it finishes.
+ * @param {Function} onProgress - Optional callback receiving job status
+ *   ({ status, stage, percent, elapsed_seconds }) on every poll
  * @returns {Promise} Analysis results from backend
  */
-export async function runAnalysis() {
+export async function runAnalysis(onProgress) {
   try {
-    const response = await api.post('/analyze')
-    return { success: true, data: response.data }
+    const response = await api.post('/analyze', { analysis_id: currentAnalysisId })
+    if (response.status !== 202) {
+      return { success: true, data: response.data }
+    }
+    
+    const jobId = response.data.job_id
+    for (;;) {
+      await new Promise(resolve => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+      const job = (await api.get(`/jobs/${jobId}`)).data
+      if (onProgress) onProgress(job)
+      
+      if (job.status === 'done') {
+        return { success: true, data: { ...response.data, ...job.result } }
+      }
+      if (job.status === 'failed' || job.status === 'cancelled') {
+        return { success: false, error: job.error || `Analysis ${job.status}` }
+      }
+    }
   } catch (error) {
     console.error('Analysis error:', error)
     return { success: false, error: error.response?.data?.error || error.message }
@@ -56,7 +84,9 @@ export async function runAnalysis() {
  */
 export async function getResults() {
   try {
-    const response = await api.get('/results')
+    const response = await api.get('/results', {
+      params: { analysis_id: currentAnalysisId }
+    })
     return { success: true, data: response.data }
   } catch (error) {
     console.error('Results error:', error)
@@ -71,6 +101,7 @@ export async function getResults() {
 export async function downloadJSON() {
   try {
     const response = await api.get('/download-json', {
+      params: { analysis_id: currentAnalysisId },
       responseType: 'blob'
     })
     
@@ -25,6 +25,9 @@ def test_health():
         print(f"Error: {e}")
         return False
 
+# analysis_id returned by the upload, passed to the later requests
+session = {"analysis_id": None}
+
 def test_upload():
     """Test the file upload endpoint"""
     print("\n" + "="*70)
@@ -36,6 +39,7 @@ def test_upload():
             response = requests.post(f"{BASE_URL}/api/upload", files=files)
         print(f"Status: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
+        session["analysis_id"] = response.json().get("analysis_id")
         return response.status_code == 200
     except Exception as e:
         print(f"Error: {e}")
@@ -47,7 +51,7 @@ def test_analyze():
     print("[TEST 3] Analysis")
     print("="*70)
     try:
-        response = requests.post(f"{BASE_URL}/api/analyze")
+        response = requests.post(f"{BASE_URL}/api/analyze", json={"analysis_id": session["analysis_id"], "wait": True})
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -72,7 +76,7 @@ def test_results():
     print("[TEST 4] Get Results")
     print("="*70)
     try:
-        response = requests.get(f"{BASE_URL}/api/results")
+        response = requests.get(f"{BASE_URL}/api/results", params={"analysis_id": session["analysis_id"]})
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
             data = response.json()
@@ -90,7 +94,7 @@ def test_json_download():
     print("[TEST 5] Download JSON Report")
     print("="*70)
     try:
-        response = requests.get(f"{BASE_URL}/api/download-json")
+        response = requests.get(f"{BASE_URL}/api/download-json", params={"analysis_id": session["analysis_id"]})
         print(f"Status: {response.status_code}")
         print(f"Content-Type: {response.headers.get('Content-Type')}")
         print(f"Content-Length: {response.headers.get('Content-Length')} bytes")
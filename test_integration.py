@@ -65,6 +65,7 @@ print("\n[TEST 4] Complete Workflow Simulation")
 print("-" * 80)
 
 workflow_passed = True
+analysis_id = None
 
 # Step 1: Upload
 print("\n  Step 1: Simulating file upload...")
@@ -74,6 +75,7 @@ try:
         response = requests.post(f"{BASE_URL}/api/upload", files=files)
     if response.status_code == 200:
         print(f"    ✓ File uploaded: {response.json()['filename']}")
+        analysis_id = response.json()['analysis_id']
     else:
         print(f"    ✗ Upload failed: {response.status_code}")
         workflow_passed = False
@@ -86,7 +88,7 @@ time.sleep(1)
 # Step 2: Analyze
 print("\n  Step 2: Simulating analysis request...")
 try:
-    response = requests.post(f"{BASE_URL}/api/analyze")
+    response = requests.post(f"{BASE_URL}/api/analyze", json={"analysis_id": analysis_id, "wait": True})
     if response.status_code == 200:
         data = response.json()
         print(f"    ✓ Analysis complete")
@@ -104,7 +106,7 @@ time.sleep(1)
 # Step 3: Get Results
 print("\n  Step 3: Simulating results retrieval...")
 try:
-    response = requests.get(f"{BASE_URL}/api/results")
+    response = requests.get(f"{BASE_URL}/api/results", params={"analysis_id": analysis_id})
     if response.status_code == 200:
         data = response.json()
         num_nodes = len(data.get('nodes', []))
@@ -128,7 +130,7 @@ except Exception as e:
 # Step 4: Download
 print("\n  Step 4: Simulating JSON download...")
 try:
-    response = requests.get(f"{BASE_URL}/api/download-json")
+    response = requests.get(f"{BASE_URL}/api/download-json", params={"analysis_id": analysis_id})
     if response.status_code == 200:
         content_size = len(response.content)
         print(f"    ✓ JSON report downloaded: {content_size} bytes")
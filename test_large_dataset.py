@@ -33,6 +33,7 @@ print("[TEST 1] Uploading Large Dataset (1200 rows)")
 print("-" * 90)
 upload_time = 0
 upload_ok = False
+analysis_id = None
 start_time = time.time()
 try:
     with open(LARGE_CSV, 'rb') as f:
@@ -46,6 +47,7 @@ try:
     if response.status_code == 200:
         data = response.json()
         print(f"✓ File uploaded: {data.get('filename', 'unknown')}")
+        analysis_id = data.get('analysis_id')
         print(f"  - Size: {data.get('file_size', 'unknown'):,} bytes")
         print(f"  - Timestamp: {data.get('upload_time', 'unknown')}")
         upload_ok = True
@@ -66,14 +68,30 @@ analysis_time = 0
 analysis_ok = False
 start_time = time.time()
 try:
-    response = requests.post(f"{BASE_URL}/api/analyze", timeout=60)
+    response = requests.post(f"{BASE_URL}/api/analyze", json={"analysis_id": analysis_id}, timeout=30)
+    status = response.status_code
+    data = response.json()
+    
+    # The analysis runs as a background job; poll its progress
+    if status == 202:
+        job_url = f"{BASE_URL}/api/jobs/{data['job_id']}"
+        while True:
+            job = requests.get(job_url, timeout=30).json()
+            print(f"  {job['percent']:3d}% {job['stage']} ({job['elapsed_seconds']:.1f}s)")
+            if job["status"] in ("done", "failed", "cancelled"):
+                break
+            time.sleep(1)
+        
+        if job["status"] == "done":
+            status, data = 200, dict(job["result"], message="Analysis completed successfully")
+        else:
+            print(f"  Job {job['status']}: {job['error']}")
     analysis_time = time.time() - start_time
     
-    print(f"Status: {response.status_code}")
+    print(f"Status: {status}")
     print(f"Analysis Time: {analysis_time:.2f}s")
     
-    if response.status_code == 200:
-        data = response.json()
+    if status == 200:
         print(f"✓ Analysis completed")
         print(f"  - Message: {data.get('message', 'N/A')}")
         if 'summary' in data:
@@ -99,7 +117,7 @@ results_time = 0
 results_ok = False
 start_time = time.time()
 try:
-    response = requests.get(f"{BASE_URL}/api/results", timeout=30)
+    response = requests.get(f"{BASE_URL}/api/results", params={"analysis_id": analysis_id}, timeout=30)
     results_time = time.time() - start_time
     
     print(f"Status: {response.status_code}")
@@ -144,7 +162,7 @@ download_time = 0
 download_ok = False
 start_time = time.time()
 try:
-    response = requests.get(f"{BASE_URL}/api/download-json", timeout=30)
+    response = requests.get(f"{BASE_URL}/api/download-json", params={"analysis_id": analysis_id}, timeout=30)
     download_time = time.time() - start_time
     
     print(f"Status: {response.status_code}")